@@ -1,14 +1,27 @@
 # Creación de un Inventario
 #Nota el presente inventario guarda la información en la Ram para que la información permanezca
 #se debe crear en formato JSON
+import os
+import sys  # sys.intern: los nombres repetidos se guardan una sola vez
+
+# Módulos compartidos entre semanas (carpeta Parcial 02/comun)
+_PARCIAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARCIAL not in sys.path:
+    sys.path.insert(0, _PARCIAL)
+from comun.indice_trigramas import IndiceTrigramas  # Búsqueda por subcadena en los nombres
+
 # Clase Producto
 class Producto:
+    __slots__ = ("id", "nombre", "cantidad", "precio")   # Sin __dict__ por producto: menos memoria
+
     def __init__(self, id_producto, nombre, cantidad, precio):
         """
         Constructor de la clase Producto
         """
         self.id = id_producto        # Identificador único del producto
-        self.nombre = nombre         # Denominación del producto
+        # Denominación del producto; los nombres repetidos comparten memoria
+        # (sys.intern solo acepta str: cualquier otro valor se guarda tal cual, como antes)
+        self.nombre = sys.intern(nombre) if type(nombre) is str else nombre
         self.cantidad = cantidad     # Unidades disponibles
         self.precio = precio         # Valor de venta al público (PVP)
 
@@ -24,59 +37,72 @@ class Inventario:
     def __init__(self):
         """
         Constructor de la clase Inventario
-        Atributo: lista de productos
+        Atributos: diccionario id -> producto (conserva el orden de inserción)
+        e índice de trigramas sobre los nombres, también por id
         """
-        self.lista_productos = []
+        self.productos = {}
+        self.indice_nombres = IndiceTrigramas()
 
     def añadir_nuevo_producto(self, producto):
         """
         Añade un nuevo producto al inventario verificando que el ID no esté repetido
+        (búsqueda directa por clave, sin recorrer el inventario)
         """
-        if any(p.id == producto.id for p in self.lista_productos):
+        if producto.id in self.productos:
             print("Error: El producto ya existe.")
             return
-        self.lista_productos.append(producto)
+        self.productos[producto.id] = producto
+        self.indice_nombres.agregar(producto.id, producto.nombre)
         print("Producto agregado correctamente.")
 
     def eliminar_producto(self, id_producto):
         """
-        Elimina un producto por su ID
+        Elimina un producto por su ID en tiempo constante
         """
-        for p in self.lista_productos:
-            if p.id == id_producto:
-                self.lista_productos.remove(p)
-                print("Producto eliminado correctamente.")
-                return
-        print("Producto no encontrado.")
+        if self.productos.pop(id_producto, None) is None:
+            print("Producto no encontrado.")
+            return
+        self.indice_nombres.quitar(id_producto)
+        print("Producto eliminado correctamente.")
 
     def actualizar_producto(self, id_producto, nueva_cantidad=None, nuevo_precio=None):
         """
         Actualiza la cantidad o el precio de un producto
         """
-        for p in self.lista_productos:
-            if p.id == id_producto:
-                if nueva_cantidad is not None:
-                    p.cantidad = nueva_cantidad
-                if nuevo_precio is not None:
-                    p.precio = nuevo_precio
-                print("Producto actualizado correctamente.")
-                return
-        print("Producto no encontrado.")
+        p = self.productos.get(id_producto)
+        if p is None:
+            print("Producto no encontrado.")
+            return
+        if nueva_cantidad is not None:
+            p.cantidad = nueva_cantidad
+        if nuevo_precio is not None:
+            p.precio = nuevo_precio
+        print("Producto actualizado correctamente.")
 
     def buscar_por_nombre(self, nombre):
         """
         Busca productos que contengan el texto en el nombre
+        usando el índice de trigramas
+        """
+        return [self.productos[pid] for pid in self.indice_nombres.buscar(nombre)]
+
+    def listar_productos(self, orden=None):
+        """
+        Devuelve los productos en orden de inserción, o
+        ordenados por "id", "nombre", "cantidad" o "precio"
         """
-        return [p for p in self.lista_productos if nombre.lower() in p.nombre.lower()]
+        if orden is None:
+            return list(self.productos.values())
+        return sorted(self.productos.values(), key=lambda p: getattr(p, orden))
 
-    def mostrar_productos(self):
+    def mostrar_productos(self, orden=None):
         """
         Muestra todos los productos en el inventario
         """
-        if not self.lista_productos:
+        if not self.productos:
             print("El inventario está vacío.")
             return
-        for p in self.lista_productos:
+        for p in self.listar_productos(orden):
             print(p)
 
 
@@ -131,7 +157,11 @@ def menu():
 
         elif opcion == "5":
             # Mostrar inventario
-            inventario.mostrar_productos()
+            orden = input("Ordenar por id, nombre, cantidad o precio (deje vacío para el orden de ingreso): ")
+            if orden and orden not in ("id", "nombre", "cantidad", "precio"):
+                print("Orden no válido.")
+                continue
+            inventario.mostrar_productos(orden or None)
 
         elif opcion == "6":
             # Salir
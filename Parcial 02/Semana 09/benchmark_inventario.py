@@ -0,0 +1,118 @@
+# Benchmark: inventario sobre lista (versión anterior) vs inventario indexado por id
+# Uso: python benchmark_inventario.py [tamaño ...]   (por defecto 1000 10000 100000 1000000)
+# En cada tamaño se mide el mismo número fijo de operaciones, así el tiempo por operación
+# muestra cómo crece el costo con el tamaño del inventario.
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import sys
+import time
+
+# El archivo del inventario tiene espacios en el nombre: se carga por ruta
+_ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), "9.1. Estructura de Datos.py")
+_spec = importlib.util.spec_from_file_location("estructura_datos", _ruta)
+estructura = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(estructura)
+Producto, IndiceTrigramas, Inventario = estructura.Producto, estructura.IndiceTrigramas, estructura.Inventario
+
+OPERACIONES = 200
+
+
+class InventarioLista:
+    """
+    Copia de la versión anterior: productos en una lista e índice por objeto
+    (cada alta, baja y actualización recorre la lista)
+    """
+    def __init__(self):
+        self.lista_productos = []
+        self.indice_nombres = IndiceTrigramas()
+
+    def añadir_nuevo_producto(self, producto):
+        if any(p.id == producto.id for p in self.lista_productos):
+            print("Error: El producto ya existe.")
+            return
+        self.lista_productos.append(producto)
+        self.indice_nombres.agregar(producto, producto.nombre)
+        print("Producto agregado correctamente.")
+
+    def eliminar_producto(self, id_producto):
+        for p in self.lista_productos:
+            if p.id == id_producto:
+                self.lista_productos.remove(p)
+                self.indice_nombres.quitar(p)
+                print("Producto eliminado correctamente.")
+                return
+        print("Producto no encontrado.")
+
+    def actualizar_producto(self, id_producto, nueva_cantidad=None, nuevo_precio=None):
+        for p in self.lista_productos:
+            if p.id == id_producto:
+                if nueva_cantidad is not None:
+                    p.cantidad = nueva_cantidad
+                if nuevo_precio is not None:
+                    p.precio = nuevo_precio
+                print("Producto actualizado correctamente.")
+                return
+        print("Producto no encontrado.")
+
+
+def llenar(inventario, n):
+    """
+    Carga n productos directamente en las estructuras internas
+    (con añadir_nuevo_producto la versión de lista tardaría O(n²) solo en prepararse)
+    """
+    productos = [Producto(str(i), f"Producto {i}", i % 100, 1.5) for i in range(n)]
+    if isinstance(inventario, InventarioLista):
+        inventario.lista_productos = productos
+        for p in productos:
+            inventario.indice_nombres.agregar(p, p.nombre)
+    else:
+        inventario.productos = {p.id: p for p in productos}
+        for p in productos:
+            inventario.indice_nombres.agregar(p.id, p.nombre)
+
+
+def medir(inventario, n, semilla=2525):
+    """
+    Tiempo medio (en microsegundos) de alta, actualización y baja con ids al azar
+    """
+    azar = random.Random(semilla)
+    ids = [str(azar.randrange(n)) for _ in range(OPERACIONES)]
+    tiempos = {}
+    with contextlib.redirect_stdout(io.StringIO()):   # Sin los mensajes de cada operación
+        inicio = time.perf_counter()
+        for i in range(OPERACIONES):
+            inventario.añadir_nuevo_producto(Producto(f"nuevo{i}", f"Nuevo {i}", 1, 1.0))
+        tiempos["alta"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for pid in ids:
+            inventario.actualizar_producto(pid, nueva_cantidad=7)
+        tiempos["actualizar"] = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for pid in ids:
+            inventario.eliminar_producto(pid)
+        tiempos["baja"] = time.perf_counter() - inicio
+    return {op: t / OPERACIONES * 1e6 for op, t in tiempos.items()}
+
+
+def main():
+    tamaños = [int(x) for x in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000]
+    print(f"Microsegundos por operación ({OPERACIONES} operaciones de cada tipo por tamaño)")
+    print(f"{'productos':>10}{'operación':>12}{'lista':>12}{'indexado':>12}{'x':>10}")
+    for n in tamaños:
+        resultados = []
+        for clase in (InventarioLista, Inventario):
+            inventario = clase()
+            llenar(inventario, n)
+            resultados.append(medir(inventario, n))
+        lista, indexado = resultados
+        for op in lista:
+            print(f"{n:>10,}{op:>12}{lista[op]:>12.1f}{indexado[op]:>12.1f}{lista[op] / indexado[op]:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,43 @@
 import json  # Importa el módulo para manejar archivos JSON (lectura y escritura de datos estructurados)
 import os    # Importa el módulo para interactuar con el sistema de archivos (existencia de archivos, permisos, etc.)
+import atexit     # Permite guardar los cambios pendientes al terminar el programa
+import sys        # Permite leer los comandos de conversión desde la línea de comandos
+import threading  # Permite guardar en segundo plano (escritura diferida)
+from collections.abc import MutableMapping  # Base del almacén de carga diferida
+from contextlib import contextmanager  # Permite agrupar varios cambios en un lote
+
+# Módulos compartidos entre semanas (carpeta Parcial 02/comun)
+_PARCIAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARCIAL not in sys.path:
+    sys.path.insert(0, _PARCIAL)
+from comun.indice_trigramas import IndiceTrigramas  # Acelera la búsqueda por subcadena en los nombres
+from comun.json_por_partes import leer_entradas_json  # Lee el JSON entrada por entrada
+from comun.metricas import registro  # Métricas opcionales de carga y guardado
+# Instantánea binaria (el mismo formato que la Semana 11): alternativa al JSON para arrancar rápido
+from comun.snapshot_binario import (SnapshotInvalido, convertir_a_binario, convertir_a_json,
+                                    es_snapshot_binario, escribir_snapshot, registros_snapshot)
+
+# Métricas opcionales de carga y guardado (comun/metricas.py, las mismas que la Semana 11)
+# Se activan con la variable de entorno INVENTARIO_METRICAS=1. Cada llamada a cargar_inventario
+# y guardar_inventario registra su duración, los bytes del archivo, los productos y el tiempo de
+# cada fase (leer/decodificar al cargar; construir/serializar/escribir al guardar).
+# Con INVENTARIO_PERFIL=perfil.prof además se perfilan esas llamadas con cProfile y el perfil
+# se guarda al salir (se revisa con: python -m pstats perfil.prof).
+METRICAS = registro("INVENTARIO")
+
 
 # Clase Producto: representa un producto individual del inventario
 class Producto:
+    # Atributos fijos sin diccionario por instancia: cada producto ocupa bastante menos memoria,
+    # lo que se nota en inventarios de millones de productos
+    __slots__ = ("id", "nombre", "cantidad", "precio")
+
     def __init__(self, id_producto, nombre, cantidad, precio):
         # Constructor que inicializa un producto con ID, nombre, cantidad y precio
         self.id = id_producto
-        self.nombre = nombre
+        # Los nombres repetidos comparten un mismo texto en memoria. sys.intern solo acepta str
+        # (un nombre numérico en el JSON lanzaría TypeError), así que otro valor se guarda tal cual
+        self.nombre = sys.intern(nombre) if type(nombre) is str else nombre
         self.cantidad = cantidad
         self.precio = precio
 
@@ -35,100 +66,420 @@ class Producto:
         return f"ID: {self.id}, Nombre: {self.nombre}, Cantidad: {self.cantidad}, Precio: ${self.precio:.2f}"
 
 
+# Lectura incremental (leer_entradas_json, en comun/json_por_partes.py): recorre el JSON entrada por entrada.
+# Es más lenta que json.load (cerca del doble) pero no necesita el documento completo en memoria:
+# se usa con el almacén diferido, con archivos de más de LIMITE_CARGA_COMPLETA bytes
+# o con leer_por_partes=True.
+LIMITE_CARGA_COMPLETA = 256 * 2**20
+
+
+# Clase ProductosDiferidos: guarda el JSON crudo y solo crea el Producto cuando se usa
+class ProductosDiferidos(MutableMapping):
+    """
+    Diccionario id -> Producto que conserva cada registro como texto JSON
+    y lo convierte en Producto la primera vez que se accede a él.
+    """
+    def __init__(self):
+        self._datos = {}   # id -> texto JSON crudo o Producto ya materializado
+
+    def guardar_crudo(self, id_producto, texto):
+        """
+        Registra un producto a partir de su texto JSON, sin convertirlo todavía.
+        """
+        self._datos[id_producto] = texto
+
+    def __getitem__(self, id_producto):
+        valor = self._datos[id_producto]
+        if isinstance(valor, str):
+            valor = Producto.from_dict(json.loads(valor))
+            self._datos[id_producto] = valor
+        return valor
+
+    def __setitem__(self, id_producto, producto):
+        self._datos[id_producto] = producto
+
+    def __delitem__(self, id_producto):
+        del self._datos[id_producto]
+
+    def __iter__(self):
+        return iter(self._datos)
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, id_producto):
+        return id_producto in self._datos
+
+    def registros(self):
+        """
+        Recorre los productos como pares (id, diccionario)
+        sin crear objetos Producto para los que siguen en crudo.
+        """
+        for pid, valor in self._datos.items():
+            yield pid, json.loads(valor) if isinstance(valor, str) else valor.to_dict()
+
+
 # Clase Inventario: maneja un conjunto de productos
 class Inventario:
-    def __init__(self, archivo_json="inventario.json"):
+    def __init__(self, archivo_json="inventario.json", usar_bitacora=False, limite_bitacora=1024 * 1024,
+                 guardar_cada=None, intervalo_ms=None, almacen="diccionario", formato_snapshot=None,
+                 leer_por_partes=None):
         # Inicializa el inventario con un archivo JSON opcional
         self.archivo_json = archivo_json
+        # Lectura del JSON: None usa json.load salvo en el almacén diferido o con archivos enormes;
+        # True o False obligan a leer por partes o de una vez
+        self.leer_por_partes = leer_por_partes
+        # Formato del archivo al guardar: "json" (intercambio) o "binario" (arranque rápido).
+        # Al cargar se reconoce por la cabecera; con None se guarda en el mismo formato que se leyó.
+        self.formato_snapshot = formato_snapshot
+        # Tipo de almacén: "diccionario" (crea todos los Producto al cargar)
+        # o "diferido" (guarda el JSON crudo y crea cada Producto solo cuando se usa)
+        self.almacen = almacen
+        # Modo bitácora: cada cambio se añade como una línea a un log en lugar de reescribir el JSON
+        self.usar_bitacora = usar_bitacora
+        self.archivo_bitacora = archivo_json + ".log"
+        self.limite_bitacora = limite_bitacora  # Tamaño en bytes a partir del cual se compacta el log
+
+        # Política de guardado (durabilidad):
+        #   guardar_cada=1        -> se guarda en cada operación (comportamiento por defecto)
+        #   guardar_cada=N        -> se guarda cada N cambios
+        #   intervalo_ms=T        -> un hilo en segundo plano guarda lo pendiente cada T milisegundos
+        # Con intervalo_ms y sin guardar_cada, solo se guarda por tiempo, con flush() o al cerrar.
+        if guardar_cada is None:
+            guardar_cada = 1 if intervalo_ms is None else 0
+        self.guardar_cada = guardar_cada
+        self.intervalo_ms = intervalo_ms
+        self._candado = threading.RLock()  # Protege los productos frente al hilo de guardado
+        self._pendientes = []              # Registros de bitácora aún no escritos
+        self._cambios_sin_guardar = 0
+        self._en_lote = 0
+
         self.productos = {}  # Diccionario con id_producto como clave y Producto como valor
         self.cargar_inventario()  # Carga los productos existentes del archivo al iniciar
 
+        self._hilo_guardado = None
+        self._detener_guardado = threading.Event()
+        if intervalo_ms is not None:
+            self._hilo_guardado = threading.Thread(target=self._ciclo_guardado, daemon=True)
+            self._hilo_guardado.start()
+        if guardar_cada != 1:
+            # Si el guardado es diferido, nada debe quedar pendiente al terminar el programa
+            atexit.register(self.cerrar)
+
     def cargar_inventario(self):
         """
         Carga los productos desde el archivo JSON.
         Si el archivo no existe, inicia un inventario vacío.
         Maneja errores como archivo corrupto o problemas de permisos.
+        Una instantánea binaria dañada o de una versión desconocida no se reemplaza por un
+        inventario vacío: se lanza SnapshotInvalido y el archivo queda intacto, porque el
+        próximo guardado lo sobrescribiría y se perderían todos los productos.
+        En modo bitácora, aplica además los cambios registrados en el log.
+        El archivo se lee con json.load; en el almacén diferido o con archivos enormes se lee
+        entrada por entrada, sin tener todo el documento en memoria.
+        Con las métricas activas se miden las fases "leer", "decodificar" y "bitacora".
         """
-        if not os.path.exists(self.archivo_json):
-            self.productos = {}
-            return
+        with METRICAS.medir("cargar_inventario") as medicion:
+            self.productos = self._nuevo_almacen()
+            if os.path.exists(self.archivo_json):
+                try:
+                    medicion.tamaño_de(self.archivo_json)
+                    if es_snapshot_binario(self.archivo_json):
+                        # Instantánea binaria: columnas leídas de una vez, sin analizar JSON
+                        for pid, datos in registros_snapshot(self.archivo_json):
+                            self.productos[pid] = Producto.from_dict(datos)
+                        if self.formato_snapshot is None:
+                            self.formato_snapshot = "binario"
+                    else:
+                        with medicion.abrir(self.archivo_json, "r") as f:
+                            if self.almacen == "diferido":
+                                # Guarda cada producto como texto; se convertirá al usarlo
+                                for pid, texto in leer_entradas_json(f, crudo=True):
+                                    self.productos.guardar_crudo(pid, texto)
+                            elif self._leer_por_partes():
+                                # Convierte cada producto en un objeto Producto a medida que se lee
+                                for pid, prod in leer_entradas_json(f):
+                                    self.productos[pid] = Producto.from_dict(prod)
+                            else:
+                                # Lectura completa con json.load: la más rápida si el archivo cabe en memoria
+                                for pid, prod in json.load(f).items():
+                                    self.productos[pid] = Producto.from_dict(prod)
+                        medicion.completar("decodificar")
+                except SnapshotInvalido as e:
+                    print(f"Error: {e} No se carga el inventario para no sobrescribir el archivo.")
+                    raise
+                except ValueError:  # JSON mal formado
+                    print("Error: El archivo de inventario está corrupto. Se inicializa inventario vacío.")
+                    self.productos = self._nuevo_almacen()
+                except PermissionError:
+                    print("Error: No tiene permisos para leer el archivo de inventario.")
+                    self.productos = self._nuevo_almacen()
+                except Exception as e:
+                    print(f"Error inesperado al cargar inventario: {e}")
+                    self.productos = self._nuevo_almacen()
 
+            if self.usar_bitacora:
+                with medicion.fase("bitacora"):
+                    self._reproducir_bitacora()
+            medicion.registros = len(self.productos)
+        # El índice de nombres se construye en la primera búsqueda,
+        # así la carga diferida no obliga a crear todos los productos
+        self.indice_nombres = None
+
+    def _leer_por_partes(self):
+        """
+        Indica si el JSON se lee entrada por entrada en lugar de con json.load.
+        """
+        if self.leer_por_partes is not None:
+            return self.leer_por_partes
+        return os.path.getsize(self.archivo_json) > LIMITE_CARGA_COMPLETA
+
+    def _nuevo_almacen(self):
+        """
+        Crea el contenedor id -> Producto según el tipo de almacén elegido.
+        """
+        if self.almacen == "diferido":
+            return ProductosDiferidos()
+        return {}
+
+    def _registros(self):
+        """
+        Recorre los productos como pares (id, diccionario).
+        En el almacén diferido no crea objetos Producto para los que siguen en crudo.
+        """
+        if self.almacen == "diferido":
+            return self.productos.registros()
+        return ((pid, prod.to_dict()) for pid, prod in self.productos.items())
+
+    def reconstruir_indices(self):
+        """
+        Construye de nuevo el índice de nombres a partir de todos los productos.
+        Se usa después de cargar el inventario o de reemplazar `self.productos`.
+        """
+        self.indice_nombres = IndiceTrigramas()
+        for pid, datos in self._registros():
+            self.indice_nombres.agregar(pid, datos["nombre"])
+
+    def guardar_inventario(self):
+        """
+        Guarda los productos en el archivo JSON (o en la instantánea binaria).
+        Escribe primero en un archivo temporal y luego lo reemplaza de una sola vez,
+        para que un fallo a mitad de escritura no deje el JSON truncado.
+        Devuelve True si se guardó correctamente.
+        Con las métricas activas se miden las fases "construir", "serializar" y "escribir".
+        """
+        temporal = self.archivo_json + ".tmp"
+        with METRICAS.medir("guardar_inventario") as medicion:
+            try:
+                if self.formato_snapshot == "binario":
+                    escribir_snapshot(temporal, self._registros())
+                else:
+                    with medicion.fase("construir"):
+                        datos = dict(self._registros())
+                    with medicion.abrir(temporal, "w") as f:
+                        json.dump(datos, f, indent=4)
+                    medicion.completar("serializar")
+                with medicion.fase("escribir"):
+                    os.replace(temporal, self.archivo_json)
+                medicion.tamaño_de(self.archivo_json)
+                medicion.registros = len(self.productos)
+                return True
+            except PermissionError:
+                print("Error: No tiene permisos para escribir en el archivo de inventario.")
+            except Exception as e:
+                print(f"Error inesperado al guardar inventario: {e}")
+            return False
+
+    def _reproducir_bitacora(self):
+        """
+        Aplica sobre el inventario cargado los cambios guardados en la bitácora.
+        Una línea incompleta (por un corte a mitad de escritura) se descarta
+        y la bitácora se compacta para no seguir arrastrándola.
+        """
+        if not os.path.exists(self.archivo_bitacora):
+            return
+        linea_rota = False
         try:
-            with open(self.archivo_json, "r") as f:
-                # Lee el archivo JSON y convierte cada producto en un objeto Producto
-                data = json.load(f)
-                self.productos = {pid: Producto.from_dict(prod) for pid, prod in data.items()}
-        except json.JSONDecodeError:
-            print("Error: El archivo de inventario está corrupto. Se inicializa inventario vacío.")
-            self.productos = {}
+            with open(self.archivo_bitacora, "r") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except json.JSONDecodeError:
+                        linea_rota = True
+                        continue
+                    if registro["op"] == "guardar":
+                        producto = Producto.from_dict(registro["producto"])
+                        self.productos[producto.id] = producto
+                    elif registro["op"] == "eliminar":
+                        self.productos.pop(registro["id"], None)
         except PermissionError:
-            print("Error: No tiene permisos para leer el archivo de inventario.")
-            self.productos = {}
-        except Exception as e:
-            print(f"Error inesperado al cargar inventario: {e}")
-            self.productos = {}
+            print("Error: No tiene permisos para leer la bitácora del inventario.")
+            return
+        if linea_rota:
+            print("Aviso: La bitácora tenía una línea incompleta; se descarta y se compacta.")
+            self.compactar_bitacora()
 
-    def guardar_inventario(self):
+    def _registrar_cambio(self, op, id_producto):
         """
-        Guarda los productos en el archivo JSON.
-        Maneja errores de permisos o cualquier error inesperado.
+        Actualiza el índice de nombres, anota el cambio pendiente y lo persiste según la política de guardado:
+        en cada operación, cada N operaciones (guardar_cada) o, con el hilo
+        de fondo, cada intervalo_ms milisegundos.
+        Dentro de un bloque `lote()` no se escribe nada hasta que el bloque termina.
+        """
+        with self._candado:
+            if self.indice_nombres is not None:
+                if op == "eliminar":
+                    self.indice_nombres.quitar(id_producto)
+                else:
+                    self.indice_nombres.agregar(id_producto, self.productos[id_producto].nombre)
+
+            if self.usar_bitacora:
+                if op == "eliminar":
+                    registro = {"op": "eliminar", "id": id_producto}
+                else:
+                    registro = {"op": "guardar", "producto": self.productos[id_producto].to_dict()}
+                self._pendientes.append(registro)
+            self._cambios_sin_guardar += 1
+            if not self._en_lote and self.guardar_cada and self._cambios_sin_guardar >= self.guardar_cada:
+                self.flush()
+
+    def _escribir_bitacora(self, registros):
+        """
+        Añade a la bitácora todos los registros recibidos con una sola escritura
+        y la compacta cuando supera el límite de tamaño.
+        Devuelve True si se escribió correctamente.
         """
         try:
-            with open(self.archivo_json, "w") as f:
-                json.dump({pid: prod.to_dict() for pid, prod in self.productos.items()}, f, indent=4)
+            with open(self.archivo_bitacora, "a") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in registros))
+                tamaño = f.tell()
         except PermissionError:
-            print("Error: No tiene permisos para escribir en el archivo de inventario.")
+            print("Error: No tiene permisos para escribir en la bitácora del inventario.")
+            return False
         except Exception as e:
-            print(f"Error inesperado al guardar inventario: {e}")
+            print(f"Error inesperado al escribir la bitácora: {e}")
+            return False
+
+        if tamaño >= self.limite_bitacora:
+            self.compactar_bitacora()
+        return True
+
+    def flush(self):
+        """
+        Persiste inmediatamente todos los cambios pendientes
+        (reescribiendo el JSON o añadiéndolos a la bitácora).
+        Devuelve True si no quedó ningún cambio sin guardar.
+        """
+        with self._candado:
+            if not self._cambios_sin_guardar:
+                return True
+            if self.usar_bitacora:
+                guardado = self._escribir_bitacora(self._pendientes)
+            else:
+                guardado = self.guardar_inventario()
+            if guardado:
+                self._pendientes = []
+                self._cambios_sin_guardar = 0
+            return guardado
+
+    @contextmanager
+    def lote(self):
+        """
+        Agrupa todos los cambios hechos dentro del bloque `with` en una sola escritura:
+            with inventario.lote():
+                for producto in productos:
+                    inventario.añadir_nuevo_producto(producto)
+        """
+        with self._candado:
+            self._en_lote += 1
+        try:
+            yield self
+        finally:
+            with self._candado:
+                self._en_lote -= 1
+                if not self._en_lote:
+                    self.flush()
+
+    def _ciclo_guardado(self):
+        # Hilo de fondo: guarda lo pendiente cada intervalo_ms, salvo en medio de un lote
+        while not self._detener_guardado.wait(self.intervalo_ms / 1000):
+            with self._candado:
+                if not self._en_lote:
+                    self.flush()
+
+    def cerrar(self):
+        """
+        Detiene el hilo de guardado en segundo plano (si existe)
+        y guarda los cambios que estén pendientes.
+        """
+        if self._hilo_guardado is not None:
+            self._detener_guardado.set()
+            self._hilo_guardado.join()
+            self._hilo_guardado = None
+        self.flush()
+
+    def compactar_bitacora(self):
+        """
+        Vuelca el estado actual del inventario en el archivo JSON y vacía la bitácora.
+        Si el JSON no se pudo escribir, la bitácora se conserva para no perder cambios.
+        """
+        if self.guardar_inventario():
+            open(self.archivo_bitacora, "w").close()
 
     def añadir_nuevo_producto(self, producto):
         """
         Agrega un nuevo producto al inventario.
         Si el producto ya existe, muestra un error.
-        Guarda automáticamente los cambios en el archivo JSON.
+        Guarda los cambios según la política de guardado (JSON completo o bitácora).
         """
-        if producto.id in self.productos:
-            print("Error: El producto ya existe.")
-            return
-        self.productos[producto.id] = producto
-        self.guardar_inventario()
+        with self._candado:
+            if producto.id in self.productos:
+                print("Error: El producto ya existe.")
+                return
+            self.productos[producto.id] = producto
+            self._registrar_cambio("guardar", producto.id)
         print("Producto agregado correctamente y guardado en el archivo.")
 
     def eliminar_producto(self, id_producto):
         """
         Elimina un producto del inventario por su ID.
         Si no existe, muestra un mensaje de error.
-        Guarda automáticamente los cambios en el archivo JSON.
+        Guarda los cambios según la política de guardado (JSON completo o bitácora).
         """
-        if id_producto in self.productos:
+        with self._candado:
+            if id_producto not in self.productos:
+                print("Producto no encontrado.")
+                return
             del self.productos[id_producto]
-            self.guardar_inventario()
-            print("Producto eliminado correctamente y cambios guardados en el archivo.")
-        else:
-            print("Producto no encontrado.")
+            self._registrar_cambio("eliminar", id_producto)
+        print("Producto eliminado correctamente y cambios guardados en el archivo.")
 
     def actualizar_producto(self, id_producto, nueva_cantidad=None, nuevo_precio=None):
         """
         Actualiza la cantidad y/o precio de un producto.
         Si el producto no existe, muestra un mensaje de error.
-        Guarda automáticamente los cambios en el archivo JSON.
+        Guarda los cambios según la política de guardado (JSON completo o bitácora).
         """
-        if id_producto in self.productos:
+        with self._candado:
+            if id_producto not in self.productos:
+                print("Producto no encontrado.")
+                return
             if nueva_cantidad is not None:
                 self.productos[id_producto].cantidad = nueva_cantidad
             if nuevo_precio is not None:
                 self.productos[id_producto].precio = nuevo_precio
-            self.guardar_inventario()
-            print("Producto actualizado correctamente y cambios guardados en el archivo.")
-        else:
-            print("Producto no encontrado.")
+            self._registrar_cambio("guardar", id_producto)
+        print("Producto actualizado correctamente y cambios guardados en el archivo.")
 
     def buscar_por_nombre(self, nombre):
         """
         Busca productos cuyo nombre contenga la cadena ingresada (no distingue mayúsculas/minúsculas).
         Devuelve una lista de productos coincidentes.
+        Usa el índice de trigramas para revisar solo los candidatos en lugar de todo el inventario.
         """
-        return [p for p in self.productos.values() if nombre.lower() in p.nombre.lower()]
+        if self.indice_nombres is None:
+            self.reconstruir_indices()
+        return [self.productos[pid] for pid in self.indice_nombres.buscar(nombre)]
 
     def mostrar_productos(self):
         """
@@ -144,7 +495,10 @@ class Inventario:
 
 # Menú interactivo: permite al usuario gestionar el inventario desde consola
 def menu():
-    inventario = Inventario()  # Crea un inventario al iniciar
+    try:
+        inventario = Inventario()  # Crea un inventario al iniciar
+    except SnapshotInvalido:
+        return  # El motivo ya se mostró; el archivo queda como estaba
 
     while True:
         # Muestra las opciones del menú
@@ -155,6 +509,7 @@ def menu():
         print("4. Buscar producto por nombre")
         print("5. Mostrar todos los productos")
         print("6. Salir del menú")
+        print("7. Ver métricas de carga y guardado")
 
         opcion = input("Ingrese la opción: ")
 
@@ -204,16 +559,45 @@ def menu():
             inventario.mostrar_productos()
 
         elif opcion == "6":
-            # Salir del menú
+            # Salir del menú guardando cualquier cambio pendiente
+            inventario.cerrar()
             print("Saliendo del sistema. ¡Hasta pronto!")
             break
 
+        elif opcion == "7":
+            # Mostrar las métricas de carga y guardado (si se activaron al iniciar)
+            if METRICAS.activo:
+                print(METRICAS.texto())
+            else:
+                print("Las métricas están apagadas. Inicie el programa con INVENTARIO_METRICAS=1 "
+                      "(y con INVENTARIO_PERFIL=perfil.prof para perfilar con cProfile).")
+
         else:
             # Opción no válida
             print("Opción no válida. Intente de nuevo.")
 
 
-# Ejecuta el menú si se corre este script directamente
+# Conversión de formato desde la línea de comandos:
+#   python Gestor_Inventario.py a-binario Inventario.json inventario.bin
+#   python Gestor_Inventario.py a-json inventario.bin Inventario.json
+def ejecutar_conversion(argumentos):
+    if len(argumentos) != 3 or argumentos[0] not in ("a-binario", "a-json"):
+        print("Uso: python Gestor_Inventario.py a-binario|a-json <origen> <destino>")
+        sys.exit(1)
+    comando, origen, destino = argumentos
+    try:
+        convertir = convertir_a_binario if comando == "a-binario" else convertir_a_json
+        total = convertir(origen, destino)
+    except (OSError, ValueError) as e:
+        print(f"Error: no se pudo convertir el inventario: {e}")
+        sys.exit(1)
+    print(f"{total} producto(s) convertidos a {destino}.")
+
+
+# Ejecuta el menú si se corre este script directamente (o la conversión si se pasan argumentos)
 if __name__ == "__main__":
-    menu()
+    if len(sys.argv) > 1:
+        ejecutar_conversion(sys.argv[1:])
+    else:
+        menu()
 
@@ -1,98 +1,959 @@
+import argparse       # ⌨️ Para los comandos de línea (importar/exportar CSV)
+import atexit         # 🚪 Para guardar lo pendiente al terminar el programa
+import csv            # 📑 Para importar y exportar catálogos en CSV
 import json           # 📄 Para leer y escribir archivos JSON
+import math           # ♾️ Para rechazar precios NaN o infinitos
 import os             # 📁 Para verificar existencia de archivos, permisos, etc.
-from datetime import datetime  # 🕒 Para registrar fecha y hora de creación de productos
-
-# 🎯 Clase Producto: representa un producto individual del inventario
-class Producto:
-    def __init__(self, id_producto, nombre, cantidad, precio, fecha=None):
-        self.id = id_producto
-        self.nombre = nombre
-        self.cantidad = cantidad
-        self.precio = precio
-        self.fecha = fecha or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    def to_dict(self):
-        return {
-            "id": self.id,
-            "nombre": self.nombre,
-            "cantidad": self.cantidad,
-            "precio": self.precio,
-            "fecha": self.fecha
-        }
-
-    @staticmethod
-    def from_dict(data):
-        return Producto(
-            data['id'],
-            data['nombre'],
-            data['cantidad'],
-            data['precio'],
-            data.get('fecha')
-        )
-
-    def __str__(self):
-        return f"🆔 {self.id} | 🛒 {self.nombre} | 📦 {self.cantidad} uds | 💲${self.precio:.2f} | 📅 {self.fecha}"
+import queue          # 📣 Colas acotadas para los suscriptores de cambios
+import sys            # ⌨️ Para leer los argumentos de línea de comandos
+import threading      # 🧵 Para el guardado diferido en segundo plano y los candados entre hilos
+from bisect import bisect_left, bisect_right, insort  # 📈 Para los índices ordenados
+from collections.abc import MutableMapping  # 💤 Para el almacén de carga diferida
+from contextlib import contextmanager  # 📦 Para agrupar cambios en un lote
+from itertools import count, islice  # 📋 Para listar productos por páginas y numerar las copias a guardar
+
+# 🧩 Módulos compartidos entre semanas (carpeta Parcial 02/comun)
+_PARCIAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARCIAL not in sys.path:
+    sys.path.insert(0, _PARCIAL)
+from comun.indice_trigramas import IndiceTrigramas  # 🔎 Búsqueda por subcadena en los nombres
+from comun.json_por_partes import leer_entradas_json  # 🌊 Lectura del JSON entrada por entrada
+from comun.snapshot_binario import (SnapshotInvalido, convertir_a_binario, convertir_a_json,  # 📦 Instantánea
+                                    es_snapshot_binario, escribir_snapshot, leer_snapshot)       # binaria
+from comun.metricas import registro  # 📏 Métricas opcionales de carga y guardado
+
+METRICAS = registro("INVENTARIO")   # INVENTARIO_METRICAS=1 las activa
+
+try:
+    import fcntl      # 🔐 Bloqueo de archivos entre procesos (Linux/macOS)
+except ImportError:
+    fcntl = None
+    import msvcrt     # 🔐 Equivalente en Windows
+
+# 🎯 Producto y fechas (producto.py, compartido con los almacenes columnar, mmap y sqlite)
+from producto import Producto, marca_actual, marca_de_consulta, marca_de_fecha, texto_de_marca
+
+
+# 🌊 Lectura incremental (leer_entradas_json, en comun/json_por_partes.py): entrada por entrada.
+# Es más lenta que json.load (~2x) pero no necesita el documento completo en memoria: se usa con el
+# almacén diferido, con archivos de más de LIMITE_CARGA_COMPLETA bytes o con leer_por_partes=True.
+LIMITE_CARGA_COMPLETA = 256 * 2**20
+
+
+# 💤 Almacén diferido: guarda el JSON crudo y solo crea el Producto cuando se usa
+class ProductosDiferidos(MutableMapping):
+    """
+    Diccionario id -> Producto que conserva cada registro como texto JSON
+    y lo convierte en Producto la primera vez que se accede a él.
+    """
+    def __init__(self):
+        self._datos = {}   # id -> texto JSON crudo o Producto ya materializado
+
+    def guardar_crudo(self, id_producto, texto):
+        self._datos[id_producto] = texto
+
+    def __getitem__(self, id_producto):
+        valor = self._datos[id_producto]
+        if isinstance(valor, str):
+            valor = Producto.from_dict(json.loads(valor))
+            self._datos[id_producto] = valor
+        return valor
+
+    def __setitem__(self, id_producto, producto):
+        self._datos[id_producto] = producto
+
+    def __delitem__(self, id_producto):
+        del self._datos[id_producto]
+
+    def __iter__(self):
+        return iter(self._datos)
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, id_producto):
+        return id_producto in self._datos
+
+    def registros(self):
+        """(id, dict) de cada producto sin materializar los que siguen en crudo."""
+        for pid, valor in self._datos.items():
+            yield pid, json.loads(valor) if isinstance(valor, str) else valor.to_dict()
+
+
+# 📈 Índice ordenado: consultas por rango y top-k sobre un atributo numérico
+class _Tope:
+    # Centinela mayor que cualquier clave: cierra por arriba los rangos inclusivos
+    def __lt__(self, otro):
+        return False
+
+    def __gt__(self, otro):
+        return True
+
+
+_TOPE = _Tope()
+
+
+class IndiceOrdenado:
+    """
+    Lista ordenada de pares (valor, clave) mantenida con bisect.
+    Los rangos y el top-k cuestan O(log n + resultados) en lugar de recorrer todo.
+    """
+    def __init__(self):
+        self.entradas = []     # [(valor, clave)] ordenada por valor
+        self.valores = {}      # clave -> valor indexado
+
+    @classmethod
+    def desde_pares(cls, pares):
+        """Construye el índice de una vez a partir de pares (clave, valor): un solo sort, O(n log n)."""
+        indice = cls()
+        indice.valores = dict(pares)
+        indice.entradas = sorted((valor, clave) for clave, valor in indice.valores.items())
+        return indice
+
+    def agregar(self, clave, valor):
+        if clave in self.valores:
+            if self.valores[clave] == valor:
+                return
+            self.quitar(clave)
+        self.valores[clave] = valor
+        insort(self.entradas, (valor, clave))
+
+    def quitar(self, clave):
+        if clave not in self.valores:
+            return
+        valor = self.valores.pop(clave)
+        del self.entradas[bisect_left(self.entradas, (valor, clave))]
+
+    def rango(self, minimo=None, maximo=None, incluir_maximo=True):
+        """Claves con minimo <= valor <= maximo (o < maximo), en orden ascendente de valor."""
+        inicio = 0 if minimo is None else bisect_left(self.entradas, (minimo,))
+        if maximo is None:
+            fin = len(self.entradas)
+        elif incluir_maximo:
+            fin = bisect_right(self.entradas, (maximo, _TOPE))
+        else:
+            fin = bisect_left(self.entradas, (maximo,))
+        return [clave for _, clave in self.entradas[inicio:fin]]
+
+    def mayores(self, k):
+        """Las k claves de mayor valor, de mayor a menor."""
+        if k <= 0:
+            return []
+        return [clave for _, clave in reversed(self.entradas[-k:])]
+
+
+CAMPOS_CSV = ["id", "nombre", "cantidad", "precio", "fecha"]
+
+
+def sincronizar_archivo(f):
+    """💽 Vacía los búferes de Python y pide al sistema operativo que lleve el archivo al disco (fsync)."""
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def sincronizar_directorio(ruta):
+    """💽 fsync de la carpeta de `ruta`: así un os.replace ya hecho sobrevive a un corte de luz."""
+    if os.name == "nt":   # Windows no permite abrir carpetas; allí el rename ya es durable
+        return
+    descriptor = os.open(os.path.dirname(os.path.abspath(ruta)), os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+# 📣 Flujo de cambios: una línea JSON por evento en <archivo>.eventos; el offset de cada evento es
+# la posición (en bytes) donde empieza su línea, así se puede retomar la lectura sin recorrer lo anterior
+def leer_eventos(ruta, desde_offset=0):
+    """
+    📜 Recorre los eventos guardados en `ruta` a partir de `desde_offset`, cada uno con su "offset".
+    Para seguir donde se quedó, un consumidor pasa el offset del último evento procesado + 1.
+    """
+    try:
+        f = open(ruta, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        if desde_offset > 0:
+            f.seek(desde_offset - 1)
+            if f.read(1) != b"\n":
+                f.readline()   # El offset cae dentro de un evento: se empieza en el siguiente
+        while True:
+            offset = f.tell()
+            linea = f.readline()
+            if not linea.endswith(b"\n"):
+                return   # Fin del archivo (o un evento que todavía se está escribiendo)
+            evento = json.loads(linea)
+            evento["offset"] = offset
+            yield evento
+
+
+# 🚦 Concurrencia: candado lectores/escritor entre hilos y bloqueo de archivo entre procesos
+class CandadoLecturaEscritura:
+    """
+    Varios hilos pueden leer a la vez; escribir requiere exclusividad.
+    El escritor es reentrante y puede leer mientras escribe. Un escritor en espera
+    frena a los lectores nuevos para que un flujo constante de consultas no lo deje sin turno.
+    """
+    def __init__(self):
+        self._condicion = threading.Condition(threading.Lock())
+        self._lectores = {}           # hilo -> profundidad de lectura
+        self._escritor = None
+        self._profundidad = 0
+        self._escritores_en_espera = 0
+
+    @contextmanager
+    def lectura(self):
+        yo = threading.get_ident()
+        with self._condicion:
+            if self._escritor != yo and yo not in self._lectores:
+                while self._escritor is not None or self._escritores_en_espera:
+                    self._condicion.wait()
+            self._lectores[yo] = self._lectores.get(yo, 0) + 1
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._lectores[yo] -= 1
+                if not self._lectores[yo]:
+                    del self._lectores[yo]
+                    self._condicion.notify_all()
+
+    @contextmanager
+    def escritura(self):
+        yo = threading.get_ident()
+        with self._condicion:
+            if self._escritor != yo:
+                if yo in self._lectores:
+                    raise RuntimeError("No se puede pasar de lectura a escritura en el mismo hilo.")
+                self._escritores_en_espera += 1
+                while self._escritor is not None or self._lectores:
+                    self._condicion.wait()
+                self._escritores_en_espera -= 1
+                self._escritor = yo
+            self._profundidad += 1
+        try:
+            yield
+        finally:
+            with self._condicion:
+                self._profundidad -= 1
+                if not self._profundidad:
+                    self._escritor = None
+                    self._condicion.notify_all()
+
+
+class BloqueoArchivo:
+    """
+    🔐 Bloqueo consultivo exclusivo sobre `<inventario>.lock` (flock en Unix, msvcrt en Windows).
+    El archivo guarda además un número de versión que cada proceso incrementa al guardar,
+    así los demás saben si su copia en memoria quedó vieja.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = open(ruta, "a+b")
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self._archivo.fileno(), fcntl.LOCK_EX)
+        else:
+            self._archivo.seek(0)
+            msvcrt.locking(self._archivo.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *_):
+        if fcntl is not None:
+            fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+        else:
+            self._archivo.seek(0)
+            msvcrt.locking(self._archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def leer_version(self):
+        self._archivo.seek(0)
+        return int(self._archivo.read() or 0)
+
+    def escribir_version(self, version):
+        self._archivo.seek(0)
+        self._archivo.truncate()
+        self._archivo.write(str(version).encode())
+        self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
 
 
 # 🧠 Clase Inventario: gestiona todos los productos usando un diccionario
 class Inventario:
-    def __init__(self, archivo_json="inventario.json"):
+    def __init__(self, archivo_json="inventario.json", usar_bitacora=False, limite_bitacora=1024 * 1024,
+                 guardar_cada=None, intervalo_ms=None, almacen="diccionario", concurrente=False,
+                 formato_snapshot=None, registrar_eventos=False, leer_por_partes=None):
         self.archivo_json = archivo_json
+        # 🌊 None = json.load salvo en el almacén diferido o con archivos enormes; True/False lo fuerzan
+        self.leer_por_partes = leer_por_partes
+        # 📦 Formato al guardar: "json" (intercambio, legible) o "binario" (arranque rápido, ver comun/snapshot_binario.py).
+        # Al cargar, el formato se reconoce por la cabecera; con None se guarda en el mismo formato que se leyó.
+        self.formato_snapshot = formato_snapshot
+        # 🧱 "diccionario", "columnar", "diferido" (carga perezosa), "sqlite" (archivo_json es entonces la base .db)
+        # o "mmap" (archivo_json es el archivo de registros .dat, ver almacen_mmap.py)
+        self.almacen = almacen
+        # 📝 Cada cambio se añade a un log en vez de reescribir el JSON (SQLite y mmap ya escriben solo lo que cambia)
+        self.usar_bitacora = usar_bitacora and almacen not in ("sqlite", "mmap")
+        self.archivo_bitacora = archivo_json + ".log"
+        self.limite_bitacora = limite_bitacora        # 📏 Bytes de log a partir de los cuales se compacta
+
+        # ⏳ Política de guardado: cada operación (por defecto), cada N cambios y/o cada T milisegundos
+        if guardar_cada is None:
+            guardar_cada = 1 if intervalo_ms is None else 0
+        self.guardar_cada = guardar_cada              # 0 = solo por tiempo, flush() o al cerrar
+        self.intervalo_ms = intervalo_ms
+        self._candado = CandadoLecturaEscritura()    # 🚦 Consultas en paralelo, cambios de a uno
+        self._candado_indices = threading.Lock()      # Para que solo un lector construya los índices
+        self._pendientes = []                         # Registros de bitácora aún no escritos
+        self._cambios_sin_guardar = 0
+        self._en_lote = 0
+        # 📸 Las copias se numeran al tomarlas: solo reemplaza el archivo una copia más nueva que la última escrita
+        self._numero_copia = count(1)
+        self._ultima_copia = 0
+        self._candado_archivo = threading.Lock()
+
+        # 📣 Eventos de cambio: colas de los suscriptores y, si se pide, el flujo en disco <archivo>.eventos
+        self._suscriptores = []
+        self.archivo_eventos = archivo_json + ".eventos" if registrar_eventos else None
+        self._eventos_pendientes = []                 # Líneas aún no escritas (se escriben con cada flush)
+        self._fin_eventos = self._tamaño_eventos()    # Offset que tendrá el próximo evento
+
+        # 🔐 Modo concurrente: varios procesos sobre el mismo archivo sin perder cambios.
+        # Cada escritura bloquea el archivo, recarga si otro proceso guardó y guarda antes de soltarlo.
+        self._bloqueo = None
+        self._nivel_escritura = 0
+        self._modificado = False
+        if concurrente and almacen != "sqlite":       # SQLite ya coordina los procesos con sus propios bloqueos
+            if guardar_cada != 1:
+                raise ValueError("El modo concurrente guarda en cada operación: no admite guardar_cada ni intervalo_ms.")
+            self._bloqueo = BloqueoArchivo(archivo_json + ".lock")
+
         self.productos = {}
-        self.cargar_inventario()
+        if self._bloqueo is not None:
+            with self._bloqueo:
+                self._version = self._bloqueo.leer_version()
+                self.cargar_inventario()
+        else:
+            self.cargar_inventario()
+
+        self._hilo_guardado = None
+        self._detener_guardado = threading.Event()
+        if intervalo_ms is not None:
+            self._hilo_guardado = threading.Thread(target=self._ciclo_guardado, daemon=True)
+            self._hilo_guardado.start()
+        if guardar_cada != 1:
+            atexit.register(self.cerrar)              # 🚪 Que nada quede pendiente al salir del programa
+
+    def _nuevo_almacen(self):
+        # 🧱 Contenedor id -> Producto según el modo elegido
+        if self.almacen == "columnar":
+            from almacen_columnar import AlmacenColumnar
+            return AlmacenColumnar()
+        if self.almacen == "diferido":
+            return ProductosDiferidos()
+        if self.almacen == "sqlite":
+            from almacen_sqlite import AlmacenSQLite
+            return AlmacenSQLite(self.archivo_json)
+        if self.almacen == "mmap":
+            from almacen_mmap import AlmacenMmap
+            return AlmacenMmap(self.archivo_json)
+        return {}
 
     def cargar_inventario(self):
-        if not os.path.exists(self.archivo_json):
-            self.productos = {}
+        # 🔎 Los índices se construyen en la primera consulta, así la carga diferida sigue siendo barata
+        self.indice_nombres = self.indice_cantidad = self.indice_precio = self.indice_fecha = None
+        if self.almacen in ("sqlite", "mmap"):
+            # 🗄️ Los datos se leen bajo demanda desde el archivo: no hay nada que cargar al iniciar
+            if hasattr(self.productos, "cerrar"):
+                self.productos.cerrar()   # Al recargar (modo concurrente) se suelta el archivo anterior
+            self.productos = self._nuevo_almacen()
+            return
+
+        # 📏 Fases medidas: "leer" (disco), "decodificar" (JSON → productos) y "bitacora"
+        with METRICAS.medir("cargar_inventario") as medicion:
+            self.productos = self._nuevo_almacen()
+            if os.path.exists(self.archivo_json):
+                try:
+                    medicion.tamaño_de(self.archivo_json)
+                    if es_snapshot_binario(self.archivo_json):
+                        self._cargar_binario()
+                        if self.formato_snapshot is None:
+                            self.formato_snapshot = "binario"
+                    else:
+                        with medicion.abrir(self.archivo_json, "r") as f:
+                            if self.almacen == "diferido":
+                                # 💤 Cada producto queda como texto; se convierte al usarlo
+                                for pid, texto in leer_entradas_json(f, crudo=True):
+                                    self.productos.guardar_crudo(pid, texto)
+                            elif self._leer_por_partes():
+                                # 🌊 Entrada por entrada: nunca está todo el documento en memoria
+                                for pid, prod in leer_entradas_json(f):
+                                    self.productos[pid] = Producto.from_dict(prod)
+                            else:
+                                for pid, prod in json.load(f).items():
+                                    self.productos[pid] = Producto.from_dict(prod)
+                        medicion.completar("decodificar")
+                except SnapshotInvalido as e:
+                    # 🛑 No se empieza vacío: el próximo guardado reemplazaría la instantánea y se perdería todo
+                    print(f"🛑 Error: {e} No se carga el inventario para no sobrescribir el archivo.")
+                    raise
+                except ValueError:   # JSON mal formado
+                    print("⚠️ Error: El archivo está corrupto. Inventario vacío.")
+                    self.productos = self._nuevo_almacen()
+                except PermissionError:
+                    print("⛔ Error: No tienes permisos para leer el archivo.")
+                    self.productos = self._nuevo_almacen()
+                except Exception as e:
+                    print(f"❗ Error inesperado: {e}")
+                    self.productos = self._nuevo_almacen()
+
+            if self.usar_bitacora:
+                with medicion.fase("bitacora"):
+                    self._reproducir_bitacora()
+            medicion.registros = len(self.productos)
+
+    def _leer_por_partes(self):
+        if self.leer_por_partes is not None:
+            return self.leer_por_partes
+        return os.path.getsize(self.archivo_json) > LIMITE_CARGA_COMPLETA
+
+    def _cargar_binario(self):
+        # ⚡ Una sola lectura del archivo; el almacén columnar recibe las columnas tal cual
+        ids, nombres, fechas, cantidades, precios = leer_snapshot(self.archivo_json)
+        if self.almacen == "columnar":
+            from almacen_columnar import AlmacenColumnar
+            self.productos = AlmacenColumnar.desde_columnas(ids, nombres, fechas, cantidades, precios)
             return
+        for pid, nombre, cantidad, precio, fecha in zip(ids, nombres, cantidades, precios, fechas):
+            self.productos[pid] = Producto(pid, nombre, cantidad, precio, fecha)
+
+    def _registros(self):
+        # 📤 (id, dict) de cada producto; los almacenes diferido y mmap no crean un Producto por entrada
+        if self.almacen in ("diferido", "mmap"):
+            return self.productos.registros()
+        return ((pid, prod.to_dict()) for pid, prod in self.productos.items())
+
+    def reconstruir_indices(self):
+        """🔎 Vuelve a indexar todos los productos (tras cargar o reemplazar `self.productos`)."""
+        # Los índices ordenados se arman con un solo sort al final (insertar uno a uno con insort es O(n²))
+        nombres, cantidades, precios, fechas = IndiceTrigramas(), [], [], []
+        for pid, datos in self._registros():
+            nombres.agregar(pid, datos["nombre"])
+            cantidades.append((pid, datos["cantidad"]))
+            precios.append((pid, datos["precio"]))
+            marca = marca_de_fecha(datos.get("fecha"))
+            if isinstance(marca, int):   # Una fecha en otro formato no se puede ubicar en el tiempo
+                fechas.append((pid, marca))
+        self.indice_cantidad = IndiceOrdenado.desde_pares(cantidades)
+        self.indice_precio = IndiceOrdenado.desde_pares(precios)
+        self.indice_fecha = IndiceOrdenado.desde_pares(fechas)
+        self.indice_nombres = nombres   # Se publica al final: otro lector nunca ve un índice a medias
+
+    def _asegurar_indices(self):
+        if self.indice_nombres is None:
+            with self._candado_indices:
+                if self.indice_nombres is None:
+                    self.reconstruir_indices()
+
+    def _indexar(self, pid, prod):
+        self.indice_nombres.agregar(pid, prod.nombre)
+        self.indice_cantidad.agregar(pid, prod.cantidad)
+        self.indice_precio.agregar(pid, prod.precio)
+        marca = marca_de_fecha(prod.fecha)
+        if isinstance(marca, int):
+            self.indice_fecha.agregar(pid, marca)
+        else:
+            self.indice_fecha.quitar(pid)
+
+    def _desindexar(self, pid):
+        self.indice_nombres.quitar(pid)
+        self.indice_cantidad.quitar(pid)
+        self.indice_precio.quitar(pid)
+        self.indice_fecha.quitar(pid)
 
+    def guardar_inventario(self, sincronizar=False):
+        """
+        💾 Escribe el inventario completo (JSON o binario) en un archivo temporal y lo reemplaza
+        de golpe, así un fallo a mitad de escritura nunca deja el archivo truncado.
+        Con `sincronizar` además hace fsync del temporal antes del rename y de la carpeta después:
+        lo guardado sobrevive también a un corte de luz (las transacciones lo usan).
+        Con SQLite solo confirma la transacción con las filas ya escritas; con mmap hace el msync.
+        """
+        if self.almacen in ("sqlite", "mmap"):
+            try:
+                self.productos.confirmar()
+                return True
+            except Exception as e:
+                print(f"❗ Error inesperado al guardar: {e}")
+                return False
+
+        # 📏 Fases medidas: "construir" (productos → dicts), "serializar" (JSON) y "escribir" (disco)
+        with METRICAS.medir("guardar_inventario") as medicion:
+            # 📸 Solo la copia de los registros necesita el candado; serializar y escribir van sin él
+            with medicion.fase("construir"), self._candado.lectura():
+                registros = list(self._registros())
+                numero = next(self._numero_copia)
+            # Uno por proceso y copia: nunca se pisan entre sí
+            temporal = f"{self.archivo_json}.{os.getpid()}.{numero}.tmp"
+            try:
+                if self.formato_snapshot == "binario":
+                    escribir_snapshot(temporal, registros, sincronizar)
+                else:
+                    with medicion.abrir(temporal, "w") as f:
+                        json.dump(dict(registros), f, indent=4)
+                        if sincronizar:
+                            with medicion.fase("escribir"):
+                                sincronizar_archivo(f)
+                    medicion.completar("serializar")
+                with medicion.fase("escribir"), self._candado_archivo:
+                    if numero < self._ultima_copia:
+                        os.remove(temporal)   # Otro hilo ya escribió una copia más nueva
+                        return True
+                    os.replace(temporal, self.archivo_json)
+                    self._ultima_copia = numero
+                    if sincronizar:
+                        sincronizar_directorio(self.archivo_json)
+                medicion.tamaño_de(self.archivo_json)
+                medicion.registros = len(registros)
+                return True
+            except PermissionError:
+                print("⛔ Error: No tienes permisos para escribir en el archivo.")
+            except Exception as e:
+                print(f"❗ Error inesperado al guardar: {e}")
+            if os.path.isfile(temporal):
+                os.remove(temporal)
+            return False
+
+    # 📝 Bitácora (log de solo-añadir)
+    def _reproducir_bitacora(self):
+        """
+        📜 Aplica sobre la instantánea cargada los cambios guardados en la bitácora.
+        Una última línea incompleta (corte a mitad de escritura) se descarta y se compacta.
+        """
+        if not os.path.exists(self.archivo_bitacora):
+            return
+        linea_rota = False
         try:
-            with open(self.archivo_json, "r") as f:
-                data = json.load(f)
-                self.productos = {
-                    pid: Producto.from_dict(prod) for pid, prod in data.items()
-                }
-        except json.JSONDecodeError:
-            print("⚠️ Error: El archivo está corrupto. Inventario vacío.")
-            self.productos = {}
+            with open(self.archivo_bitacora, "r") as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except json.JSONDecodeError:
+                        linea_rota = True
+                        continue
+                    # 🧾 Un "lote" (transacción) es una sola línea: o está completa y se aplica entera, o se descarta
+                    for registro in registro["registros"] if registro["op"] == "lote" else (registro,):
+                        if registro["op"] == "guardar":
+                            producto = Producto.from_dict(registro["producto"])
+                            self.productos[producto.id] = producto
+                        elif registro["op"] == "eliminar":
+                            self.productos.pop(registro["id"], None)
         except PermissionError:
-            print("⛔ Error: No tienes permisos para leer el archivo.")
-            self.productos = {}
-        except Exception as e:
-            print(f"❗ Error inesperado: {e}")
-            self.productos = {}
+            print("⛔ Error: No tienes permisos para leer la bitácora.")
+            return
+        if linea_rota:
+            print("⚠️ La bitácora tenía una línea incompleta; se descarta y se compacta.")
+            self.compactar_bitacora()
+
+    def _registrar_cambio(self, op, id_producto, antes=None):
+        """
+        💾 Mantiene al día los índices, anota el cambio pendiente y lo persiste según la política de guardado:
+        en cada operación, cada N operaciones o (con el hilo de fondo) cada T ms.
+        Dentro de un `lote()` nada se escribe hasta que el bloque termina.
+        `antes` es el producto como diccionario antes del cambio (None si es nuevo), para los eventos.
+        """
+        with self._candado.escritura():
+            self._modificado = True
+            if self.indice_nombres is not None:
+                if op == "eliminar":
+                    self._desindexar(id_producto)
+                else:
+                    self._indexar(id_producto, self.productos[id_producto])
+
+            if self.usar_bitacora:
+                if op == "eliminar":
+                    registro = {"op": "eliminar", "id": id_producto}
+                else:
+                    registro = {"op": "guardar", "producto": self.productos[id_producto].to_dict()}
+                self._pendientes.append(registro)
+            if self._hay_eventos():
+                self._emitir_evento(op, id_producto, antes)
+            self._cambios_sin_guardar += 1
+            if not self._en_lote and self.guardar_cada and self._cambios_sin_guardar >= self.guardar_cada:
+                self.flush()
+
+    # 📣 Suscripción a los cambios
+    def suscribir(self, maximo=1000):
+        """
+        📣 Devuelve una cola acotada que recibe un evento por cada cambio hecho por este proceso:
+        {"op": "agregar" | "actualizar" | "eliminar", "id", "antes", "despues", "momento", "offset"}.
+        Si el suscriptor se atrasa y la cola se llena, se descarta el evento más viejo; con
+        registrar_eventos=True el hueco se recupera con leer_eventos(offset) (y "offset" es None sin él).
+        """
+        cola = queue.Queue(maxsize=maximo)
+        with self._candado.escritura():
+            self._suscriptores.append(cola)
+        return cola
+
+    def cancelar_suscripcion(self, cola):
+        with self._candado.escritura():
+            if cola in self._suscriptores:
+                self._suscriptores.remove(cola)
+
+    def leer_eventos(self, desde_offset=0):
+        """📜 Eventos ya escritos en <archivo>.eventos (de todos los procesos) desde `desde_offset`."""
+        if self.archivo_eventos is None:
+            raise ValueError("El inventario no registra eventos en disco (use registrar_eventos=True).")
+        with self._candado.escritura():
+            self._escribir_eventos()   # Que lo pendiente de este proceso también se vea
+        return leer_eventos(self.archivo_eventos, desde_offset)
+
+    def _hay_eventos(self):
+        return bool(self._suscriptores) or self.archivo_eventos is not None
 
-    def guardar_inventario(self):
+    def _emitir_evento(self, op, id_producto, antes):
+        despues = None if op == "eliminar" else self.productos[id_producto].to_dict()
+        evento = {"op": "eliminar" if op == "eliminar" else "agregar" if antes is None else "actualizar",
+                  "id": id_producto, "antes": antes, "despues": despues,
+                  "momento": texto_de_marca(marca_actual())}
+        offset = None
+        if self.archivo_eventos is not None:
+            linea = (json.dumps(evento, ensure_ascii=False) + "\n").encode("utf-8")
+            offset = self._fin_eventos
+            self._fin_eventos += len(linea)
+            self._eventos_pendientes.append(linea)
+        evento["offset"] = offset
+        for cola in self._suscriptores:
+            while True:
+                try:
+                    cola.put_nowait(evento)
+                    break
+                except queue.Full:
+                    try:
+                        cola.get_nowait()   # El suscriptor va atrasado: se pierde el evento más viejo
+                    except queue.Empty:
+                        pass
+
+    def _tamaño_eventos(self):
+        if self.archivo_eventos is None:
+            return 0
+        try:
+            return os.path.getsize(self.archivo_eventos)
+        except OSError:
+            return 0
+
+    def _escribir_eventos(self):
+        """📝 Añade los eventos pendientes a <archivo>.eventos en una sola escritura."""
+        if not self._eventos_pendientes:
+            return
         try:
-            with open(self.archivo_json, "w") as f:
-                json.dump({pid: prod.to_dict() for pid, prod in self.productos.items()}, f, indent=4)
+            with open(self.archivo_eventos, "ab") as f:
+                f.write(b"".join(self._eventos_pendientes))
+        except OSError as e:
+            print(f"❗ Error al escribir los eventos: {e}")
+            self._fin_eventos = self._tamaño_eventos()   # Los offsets siguientes vuelven a coincidir con el archivo
+        self._eventos_pendientes = []
+
+    def _escribir_bitacora(self, registros, sincronizar=False):
+        """📝 Añade los registros pendientes a la bitácora en una sola escritura (con fsync si se pide)."""
+        try:
+            with open(self.archivo_bitacora, "a") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in registros))
+                if sincronizar:
+                    sincronizar_archivo(f)
+                tamaño = f.tell()
         except PermissionError:
-            print("⛔ Error: No tienes permisos para escribir en el archivo.")
+            print("⛔ Error: No tienes permisos para escribir en la bitácora.")
+            return False
         except Exception as e:
-            print(f"❗ Error inesperado al guardar: {e}")
+            print(f"❗ Error inesperado al escribir la bitácora: {e}")
+            return False
 
-    def añadir_nuevo_producto(self, producto):
-        if producto.id in self.productos:
-            print(f"⚠️ Producto con ID {producto.id} ya existe.")
-            try:
-                extra = int(input("🔁 Ingrese cantidad adicional o 0 para cancelar: "))
-                if extra > 0:
-                    self.productos[producto.id].cantidad += extra
-                    self.guardar_inventario()
-                    print("✅ Cantidad actualizada correctamente.")
+        if tamaño >= self.limite_bitacora:
+            self.compactar_bitacora()
+        return True
+
+    def flush(self, sincronizar=False):
+        """
+        🚿 Persiste ya todos los cambios pendientes (JSON completo o bitácora).
+        Con `sincronizar` espera además a que lleguen al disco (fsync).
+        La instantánea completa se copia con el candado tomado, pero se serializa y escribe
+        después de soltarlo: las consultas y los cambios de otros hilos no esperan al disco.
+        Devuelve True si no quedó nada sin guardar.
+        """
+        with self._candado.escritura():
+            self._escribir_eventos()   # Primero los eventos: un consumidor nunca pierde un cambio ya guardado
+            if not self._cambios_sin_guardar:
+                return True
+            if self.usar_bitacora or self.almacen in ("sqlite", "mmap"):
+                if self.usar_bitacora:
+                    guardado = self._escribir_bitacora(self._pendientes, sincronizar)
                 else:
-                    print("🚫 Operación cancelada.")
-            except ValueError:
-                print("❌ Entrada inválida.")
-        else:
+                    guardado = self.guardar_inventario(sincronizar)
+                if guardado:
+                    self._pendientes = []
+                    self._cambios_sin_guardar = 0
+                return guardado
+            cambios, self._cambios_sin_guardar = self._cambios_sin_guardar, 0
+
+        # Si quien llama ya tiene el candado (un lote, una transacción, el modo concurrente), se guarda igual con él
+        if self.guardar_inventario(sincronizar):
+            return True
+        with self._candado.escritura():
+            self._cambios_sin_guardar += cambios   # Quedan pendientes para el próximo intento
+        return False
+
+    @contextmanager
+    def lote(self):
+        """
+        📦 Agrupa todos los cambios del bloque `with` en una única escritura al final.
+        Los demás hilos (y, en modo concurrente, procesos) no ven el lote a medias.
+            with inventario.lote():
+                for p in productos:
+                    inventario.añadir_nuevo_producto(p)
+        """
+        with self._escritura():
+            self._en_lote += 1
+            try:
+                yield self
+            finally:
+                self._en_lote -= 1
+                if not self._en_lote:
+                    self.flush()
+
+    @contextmanager
+    def _escritura(self):
+        """
+        ✍️ Sección de escritura: exclusiva entre hilos y, en modo concurrente, también entre procesos.
+        En el nivel más externo bloquea el archivo, recarga si otro proceso guardó desde
+        nuestra última lectura y, al terminar, guarda y publica la nueva versión.
+        """
+        with self._candado.escritura():
+            self._nivel_escritura += 1
+            try:
+                if self._bloqueo is None or self._nivel_escritura > 1:
+                    yield
+                    return
+                with self._bloqueo:
+                    self._sincronizar()
+                    if self.archivo_eventos is not None:
+                        self._fin_eventos = self._tamaño_eventos()   # Otros procesos también añaden eventos
+                    try:
+                        yield
+                    finally:
+                        self.flush()
+                        if self._modificado:
+                            self._version += 1
+                            self._bloqueo.escribir_version(self._version)
+                            self._modificado = False
+            finally:
+                self._nivel_escritura -= 1
+
+    def _sincronizar(self):
+        # 🔄 Con el archivo ya bloqueado: recarga si la versión en disco no es la que conocemos
+        version = self._bloqueo.leer_version()
+        if version == self._version:
+            return False
+        self.cargar_inventario()
+        self._version = version
+        return True
+
+    def recargar_si_cambio(self):
+        """
+        🔄 En modo concurrente, vuelve a leer el inventario si otro proceso lo modificó.
+        Las escrituras ya lo hacen solas; sirve para que las consultas vean lo último.
+        Devuelve True si hubo que recargar.
+        """
+        if self._bloqueo is None:
+            return False
+        with self._candado.escritura(), self._bloqueo:
+            return self._sincronizar()
+
+    def _ciclo_guardado(self):
+        # ⏱️ Hilo de fondo: guarda lo pendiente cada intervalo_ms.
+        # Un lote tiene el candado de escritura hasta el final, así que flush nunca lo ve a medias.
+        while not self._detener_guardado.wait(self.intervalo_ms / 1000):
+            self.flush()
+
+    def cerrar(self):
+        """🔒 Detiene el hilo de guardado (si lo hay), guarda los cambios pendientes y suelta el archivo .lock."""
+        if self._hilo_guardado is not None:
+            self._detener_guardado.set()
+            self._hilo_guardado.join()
+            self._hilo_guardado = None
+        self.flush()
+        if self._bloqueo is not None:
+            self._bloqueo.cerrar()
+            self._bloqueo = None
+
+    def compactar_bitacora(self):
+        """
+        🗜️ Vuelca el estado actual en el JSON y vacía la bitácora.
+        Si la instantánea no se pudo escribir, la bitácora se conserva intacta; se escribe con fsync
+        porque, una vez vacía la bitácora, la instantánea es la única copia de esos cambios.
+        """
+        if self.guardar_inventario(sincronizar=True):
+            open(self.archivo_bitacora, "w").close()
+
+    # 🧩 Operaciones sin mensajes ni preguntas (para el servidor y otros programas); devuelven si se aplicaron
+    def agregar_producto(self, producto):
+        """➕ Agrega un producto nuevo. Devuelve False si ya existe uno con ese ID."""
+        with self._escritura():
+            if producto.id in self.productos:
+                return False
             self.productos[producto.id] = producto
-            self.guardar_inventario()
+            self._registrar_cambio("guardar", producto.id)
+            return True
+
+    def quitar_producto(self, id_producto):
+        """➖ Elimina un producto. Devuelve False si no existe."""
+        with self._escritura():
+            if id_producto not in self.productos:
+                return False
+            antes = self.productos[id_producto].to_dict() if self._hay_eventos() else None
+            del self.productos[id_producto]
+            self._registrar_cambio("eliminar", id_producto, antes)
+            return True
+
+    def modificar_producto(self, id_producto, nuevo_nombre=None, nueva_cantidad=None, nuevo_precio=None):
+        """✏️ Cambia nombre, cantidad y/o precio y renueva la fecha. Devuelve False si no existe."""
+        with self._escritura():
+            if id_producto not in self.productos:
+                return False
+            producto = self.productos[id_producto]
+            antes = producto.to_dict() if self._hay_eventos() else None
+            if nuevo_nombre is not None:
+                producto.nombre = nuevo_nombre
+            if nueva_cantidad is not None:
+                producto.cantidad = nueva_cantidad
+            if nuevo_precio is not None:
+                producto.precio = nuevo_precio
+            producto.fecha = marca_actual()  # actualizar fecha
+            self._registrar_cambio("guardar", id_producto, antes)
+            return True
+
+    def obtener_producto(self, id_producto):
+        """🆔 El producto con ese ID, o None."""
+        with self._candado.lectura():
+            return self.productos.get(id_producto)
+
+    def listar_productos(self, desde=0, limite=None):
+        """📋 Una página de productos como diccionarios, en orden de inserción."""
+        fin = None if limite is None else desde + limite
+        with self._candado.lectura():
+            if self.almacen in ("diferido", "mmap"):
+                return [datos for _, datos in islice(self._registros(), desde, fin)]
+            # Solo se convierten a diccionario los productos de la página, no los que se saltan
+            return [p.to_dict() for p in islice(self.productos.values(), desde, fin)]
+
+    def añadir_nuevo_producto(self, producto):
+        if self.agregar_producto(producto):
             print("✅ Producto agregado correctamente.")
+            return
+
+        # La pregunta se hace sin candado: otros hilos y procesos siguen trabajando mientras tanto
+        print(f"⚠️ Producto con ID {producto.id} ya existe.")
+        try:
+            extra = int(input("🔁 Ingrese cantidad adicional o 0 para cancelar: "))
+        except ValueError:
+            print("❌ Entrada inválida.")
+            return
+        if extra <= 0:
+            print("🚫 Operación cancelada.")
+        elif self.ajustar_cantidad(producto.id, extra):
+            print("✅ Cantidad actualizada correctamente.")
+        else:
+            print("❌ El producto fue eliminado mientras tanto.")
+
+    def ajustar_cantidad(self, id_producto, delta):
+        """
+        ➕➖ Suma `delta` (negativo para descontar) a la cantidad de un producto en una sola
+        operación atómica, aunque otros hilos o procesos estén modificando el inventario.
+        Devuelve False si el producto no existe o el stock quedaría negativo.
+        """
+        with self._escritura():
+            producto = self.productos.get(id_producto)
+            if producto is None or producto.cantidad + delta < 0:
+                return False
+            antes = producto.to_dict() if self._hay_eventos() else None
+            producto.cantidad += delta
+            producto.fecha = marca_actual()
+            self._registrar_cambio("guardar", id_producto, antes)
+            return True
+
+    def aplicar_transaccion(self, cambios):
+        """
+        🧾 Aplica varios cambios de stock y precio como una sola transacción: todos o ninguno.
+        `cambios` es una lista de {"id", "delta"?, "precio"?}; por ejemplo, una venta:
+            inventario.aplicar_transaccion([{"id": "A1", "delta": -2}, {"id": "B7", "delta": -1, "precio": 3.5}])
+        Primero se valida todo (los deltas de un mismo id se suman y ningún stock puede quedar negativo);
+        si algo falla no se toca nada. Después se guarda en una sola escritura con fsync: la instantánea
+        completa (temporal + rename) o, con bitácora, un único registro "lote".
+        Devuelve {"aplicada": bool, "guardada": bool, "errores": [(posición, motivo), ...]}.
+        """
+        with self._escritura():
+            finales, errores = self._validar_transaccion(cambios)
+            if errores:
+                return {"aplicada": False, "guardada": False, "errores": errores}
+
+            ahora = marca_actual()
+            inicio = len(self._pendientes)
+            self._en_lote += 1   # Los cambios se guardan juntos al final, no uno por uno
+            try:
+                for pid, (cantidad, precio) in finales.items():
+                    producto = self.productos[pid]
+                    antes = producto.to_dict() if self._hay_eventos() else None
+                    producto.cantidad = cantidad
+                    producto.precio = precio
+                    producto.fecha = ahora
+                    self._registrar_cambio("guardar", pid, antes)
+                if self.usar_bitacora:
+                    self._pendientes[inicio:] = [{"op": "lote", "registros": self._pendientes[inicio:]}]
+            finally:
+                self._en_lote -= 1
+            # Dentro de un lote() externo, la transacción se guarda junto con el resto del lote
+            guardada = bool(self._en_lote) or self.flush(sincronizar=True)
+            return {"aplicada": True, "guardada": guardada, "errores": []}
+
+    def _validar_transaccion(self, cambios):
+        # 🔍 Devuelve ({id: (cantidad final, precio final)}, errores) sin modificar ningún producto
+        finales, errores = {}, []
+        if not cambios:
+            errores.append((0, "la transacción no tiene cambios"))
+        for posicion, cambio in enumerate(cambios, 1):
+            pid = cambio.get("id") if isinstance(cambio, dict) else None
+            if pid is None:
+                errores.append((posicion, "cada cambio debe ser un diccionario con 'id'"))
+                continue
+            delta, precio = cambio.get("delta", 0), cambio.get("precio")
+            if "delta" not in cambio and precio is None:
+                errores.append((posicion, f"{pid}: falta 'delta' o 'precio'"))
+                continue
+            if isinstance(delta, bool) or not isinstance(delta, int):
+                errores.append((posicion, f"{pid}: el delta debe ser un entero"))
+                continue
+            if precio is not None and (isinstance(precio, bool) or not isinstance(precio, (int, float))
+                                       or not math.isfinite(precio) or precio < 0):
+                errores.append((posicion, f"{pid}: el precio debe ser un número finito no negativo"))
+                continue
+            if pid not in finales:
+                producto = self.productos.get(pid)
+                if producto is None:
+                    errores.append((posicion, f"{pid}: producto no encontrado"))
+                    continue
+                finales[pid] = (producto.cantidad, producto.precio)
+            cantidad, precio_actual = finales[pid]
+            if cantidad + delta < 0:
+                errores.append((posicion, f"{pid}: stock insuficiente ({cantidad} disponibles, se piden {-delta})"))
+                continue
+            finales[pid] = (cantidad + delta, precio_actual if precio is None else float(precio))
+        return finales, errores
 
     def eliminar_producto(self, id_producto):
-        if id_producto in self.productos:
-            del self.productos[id_producto]
-            self.guardar_inventario()
+        if self.quitar_producto(id_producto):
             print("🗑️ Producto eliminado correctamente.")
         else:
             print("❌ Producto no encontrado.")
@@ -101,36 +962,197 @@ class Inventario:
         """
         ✅ Actualiza el nombre, cantidad y/o precio de un producto existente.
         """
-        if id_producto in self.productos:
-            if nuevo_nombre is not None:
-                self.productos[id_producto].nombre = nuevo_nombre
-            if nueva_cantidad is not None:
-                self.productos[id_producto].cantidad = nueva_cantidad
-            if nuevo_precio is not None:
-                self.productos[id_producto].precio = nuevo_precio
-            self.productos[id_producto].fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # actualizar fecha
-            self.guardar_inventario()
+        if self.modificar_producto(id_producto, nuevo_nombre, nueva_cantidad, nuevo_precio):
             print("🔄 Producto actualizado correctamente.")
         else:
             print("❌ Producto no encontrado.")
 
     def buscar_por_nombre(self, nombre):
-        return [p for p in self.productos.values() if nombre.lower() in p.nombre.lower()]
+        # 🔎 Usa el índice de trigramas (o SQLite) en vez de recorrer todos los productos
+        with self._candado.lectura():
+            if self.almacen == "sqlite":
+                return self.productos.buscar_por_nombre(nombre)
+            self._asegurar_indices()
+            return [self.productos[pid] for pid in self.indice_nombres.buscar(nombre)]
+
+    # 📈 Consultas por rango usando los índices ordenados
+    def buscar_por_cantidad(self, minimo=None, maximo=None):
+        """Productos con minimo <= cantidad <= maximo, de menor a mayor cantidad."""
+        with self._candado.lectura():
+            if self.almacen == "sqlite":
+                return self.productos.buscar_por_rango("cantidad", minimo, maximo)
+            self._asegurar_indices()
+            return [self.productos[pid] for pid in self.indice_cantidad.rango(minimo, maximo)]
+
+    def buscar_por_precio(self, minimo=None, maximo=None):
+        """Productos con minimo <= precio <= maximo, de más barato a más caro."""
+        with self._candado.lectura():
+            if self.almacen == "sqlite":
+                return self.productos.buscar_por_rango("precio", minimo, maximo)
+            self._asegurar_indices()
+            return [self.productos[pid] for pid in self.indice_precio.rango(minimo, maximo)]
+
+    def mas_caros(self, k=5):
+        """Los k productos de mayor precio, del más caro al más barato."""
+        with self._candado.lectura():
+            if self.almacen == "sqlite":
+                return self.productos.mas_caros(k)
+            self._asegurar_indices()
+            return [self.productos[pid] for pid in self.indice_precio.mayores(k)]
+
+    def reporte_stock_bajo(self, umbral=5):
+        """Productos con cantidad < umbral, empezando por los más escasos."""
+        with self._candado.lectura():
+            if self.almacen == "sqlite":
+                return self.productos.buscar_por_rango("cantidad", maximo=umbral, incluir_maximo=False)
+            self._asegurar_indices()
+            return [self.productos[pid] for pid in self.indice_cantidad.rango(maximo=umbral, incluir_maximo=False)]
+
+    # 🕒 Consultas por fecha de última modificación (índice ordenado sobre los segundos epoch)
+    def modificados_entre(self, desde=None, hasta=None):
+        """
+        Productos cuya última modificación está entre desde y hasta (incluidos), del más antiguo
+        al más reciente. Los límites son texto "AAAA-MM-DD HH:MM:SS" o segundos epoch.
+        """
+        desde, hasta = marca_de_consulta(desde), marca_de_consulta(hasta)
+        with self._candado.lectura():
+            if self.almacen == "sqlite":
+                return self.productos.buscar_por_fecha(texto_de_marca(desde), texto_de_marca(hasta))
+            self._asegurar_indices()
+            return [self.productos[pid] for pid in self.indice_fecha.rango(desde, hasta)]
+
+    def recientes(self, n=10):
+        """Los n productos modificados más recientemente, del último hacia atrás."""
+        with self._candado.lectura():
+            if self.almacen == "sqlite":
+                return self.productos.mas_recientes(n)
+            self._asegurar_indices()
+            return [self.productos[pid] for pid in self.indice_fecha.mayores(n)]
+
+    def sin_cambios_desde(self, dias):
+        """Productos que llevan más de `dias` días sin modificarse, empezando por los más antiguos."""
+        limite = marca_actual() - int(dias * 86400)
+        with self._candado.lectura():
+            if self.almacen == "sqlite":
+                return self.productos.buscar_por_fecha(hasta=texto_de_marca(limite), incluir_hasta=False)
+            self._asegurar_indices()
+            return [self.productos[pid] for pid in self.indice_fecha.rango(maximo=limite, incluir_maximo=False)]
+
+    # 📊 Agregados (vectorizados con el almacén columnar, en SQL con SQLite, sobre los registros con mmap)
+    def valor_total(self):
+        """Valor del stock: suma de cantidad × precio."""
+        with self._candado.lectura():
+            if self.almacen in ("columnar", "sqlite", "mmap"):
+                return self.productos.valor_total()
+            return sum(p.cantidad * p.precio for p in self.productos.values())
+
+    def total_unidades(self):
+        """Suma de las unidades de todos los productos."""
+        with self._candado.lectura():
+            if self.almacen in ("columnar", "sqlite", "mmap"):
+                return self.productos.total_unidades()
+            return sum(p.cantidad for p in self.productos.values())
+
+    def estadisticas_precio(self):
+        """Precio mínimo, máximo y promedio (None si el inventario está vacío)."""
+        with self._candado.lectura():
+            if self.almacen in ("columnar", "sqlite", "mmap"):
+                return self.productos.estadisticas_precio()
+            if not self.productos:
+                return None
+            precios = [p.precio for p in self.productos.values()]
+            return {"minimo": min(precios), "maximo": max(precios), "promedio": sum(precios) / len(precios)}
+
+    # 📑 Importación / exportación masiva en CSV
+    def importar_csv(self, ruta):
+        """
+        📥 Importa un CSV con columnas id,nombre,cantidad,precio (fecha opcional) fila por fila.
+        Un id ya existente (en el inventario o antes en el archivo) suma su cantidad, como en
+        añadir_nuevo_producto. Las filas inválidas se reportan y todo se guarda en una sola escritura.
+        Devuelve {"agregados": n, "fusionados": n, "errores": [(línea, motivo), ...]}.
+        """
+        resultado = {"agregados": 0, "fusionados": 0, "errores": []}
+        with open(ruta, "r", newline="", encoding="utf-8-sig") as f, self.lote():
+            lector = csv.DictReader(f)
+            faltantes = {"id", "nombre", "cantidad", "precio"} - set(lector.fieldnames or [])
+            if faltantes:
+                resultado["errores"].append((1, f"faltan columnas: {', '.join(sorted(faltantes))}"))
+                return resultado
+            for fila in lector:
+                linea = lector.line_num
+                pid = (fila["id"] or "").strip()
+                nombre = (fila["nombre"] or "").strip()
+                if not pid or not nombre:
+                    resultado["errores"].append((linea, "id y nombre son obligatorios"))
+                    continue
+                try:
+                    cantidad = int(fila["cantidad"])
+                    precio = float(fila["precio"])
+                except (TypeError, ValueError):
+                    resultado["errores"].append((linea, "cantidad debe ser entera y precio numérico"))
+                    continue
+                if cantidad < 0 or not math.isfinite(precio) or precio < 0:   # "nan", "inf" o "1e999" no son precios
+                    resultado["errores"].append((linea, "cantidad y precio deben ser finitos y no negativos"))
+                    continue
+
+                antes = None
+                if pid in self.productos:
+                    if cantidad == 0:
+                        resultado["errores"].append((linea, f"id {pid} repetido sin cantidad adicional"))
+                        continue
+                    producto = self.productos[pid]
+                    antes = producto.to_dict() if self._hay_eventos() else None
+                    producto.cantidad += cantidad
+                    producto.fecha = marca_actual()   # Igual que la suma de añadir_nuevo_producto
+                    resultado["fusionados"] += 1
+                else:
+                    self.productos[pid] = Producto(pid, nombre, cantidad, precio, fila.get("fecha") or None)
+                    resultado["agregados"] += 1
+                self._registrar_cambio("guardar", pid, antes)
+        return resultado
+
+    def exportar_csv(self, ruta):
+        """📤 Escribe el inventario en CSV producto por producto (sin armar todo el texto en memoria)."""
+        total = 0
+        with open(ruta, "w", newline="", encoding="utf-8") as f, self._candado.lectura():
+            escritor = csv.writer(f)
+            escritor.writerow(CAMPOS_CSV)
+            for _, datos in self._registros():
+                escritor.writerow([datos[campo] for campo in CAMPOS_CSV])
+                total += 1
+        return total
 
     def mostrar_productos(self):
-        if not self.productos:
-            print("📭 El inventario está vacío.")
-            return
-        print("📋 Listado de productos:\n" + "-"*40)
-        for p in self.productos.values():
-            print(p)
+        with self._candado.lectura():
+            if not self.productos:
+                print("📭 El inventario está vacío.")
+                return
+            print("📋 Listado de productos:\n" + "-"*40)
+            for p in self.productos.values():
+                print(p)
+
+
+def mostrar_resultado_importacion(resultado):
+    print(f"✅ {resultado['agregados']} producto(s) nuevos, {resultado['fusionados']} cantidad(es) sumadas.")
+    if resultado["errores"]:
+        print(f"⚠️ {len(resultado['errores'])} fila(s) con errores (no se importaron):")
+        for linea, motivo in resultado["errores"]:
+            print(f"   línea {linea}: {motivo}")
 
 
 # 🧾 Menú de usuario: permite interactuar con el inventario
-def menu():
-    inventario = Inventario()
+# 🔐 Con INVENTARIO_CONCURRENTE=1 (o --concurrente) varias terminales pueden usar el mismo inventario.json
+CONCURRENTE = os.environ.get("INVENTARIO_CONCURRENTE", "") not in ("", "0")
+
+
+def menu(concurrente=CONCURRENTE):
+    try:
+        inventario = Inventario(concurrente=concurrente)
+    except SnapshotInvalido:
+        return   # 🛑 El motivo ya se mostró; el archivo queda como estaba
 
     while True:
+        inventario.recargar_si_cambio()
         print("\n📦📊 Bienvenido al Sistema de Gestión de Inventario 📊📦")
         print("1️⃣  Agregar nuevo producto")
         print("2️⃣  Eliminar producto")
@@ -138,6 +1160,17 @@ def menu():
         print("4️⃣  Buscar producto por nombre")
         print("5️⃣  Mostrar todos los productos")
         print("6️⃣  Salir")
+        print("7️⃣  Buscar productos por rango de precio")
+        print("8️⃣  Reporte de stock bajo")
+        print("9️⃣  Productos más caros")
+        print("🔟 Resumen del inventario")
+        print("1️⃣1️⃣ Importar productos desde CSV")
+        print("1️⃣2️⃣ Exportar inventario a CSV")
+        print("1️⃣3️⃣ Productos modificados entre dos fechas")
+        print("1️⃣4️⃣ Últimos productos modificados")
+        print("1️⃣5️⃣ Productos sin cambios desde hace X días")
+        print("1️⃣6️⃣ Métricas de carga y guardado")
+        print("1️⃣7️⃣ Venta o reposición de varios productos (todo o nada)")
 
         opcion = input("👉 Ingrese una opción: ")
 
@@ -190,13 +1223,237 @@ def menu():
             inventario.mostrar_productos()
 
         elif opcion == "6":
+            inventario.cerrar()
             print("👋 ¡Gracias por usar el sistema! Hasta luego.")
             break
 
+        elif opcion == "7":
+            print("\n💲 Buscar por rango de precio")
+            try:
+                minimo = input("💲 Precio mínimo (enter para omitir): ")
+                maximo = input("💲 Precio máximo (enter para omitir): ")
+                resultados = inventario.buscar_por_precio(
+                    float(minimo) if minimo else None,
+                    float(maximo) if maximo else None
+                )
+            except ValueError:
+                print("❌ Error: Entrada inválida.")
+                continue
+            if resultados:
+                print("✅ Productos encontrados:\n")
+                for r in resultados:
+                    print(r)
+            else:
+                print("❌ No hay productos en ese rango de precio.")
+
+        elif opcion == "8":
+            print("\n📉 Reporte de stock bajo")
+            umbral = input("📦 Mostrar productos con menos de (enter = 5) unidades: ")
+            try:
+                resultados = inventario.reporte_stock_bajo(int(umbral) if umbral else 5)
+            except ValueError:
+                print("❌ Error: Entrada inválida.")
+                continue
+            if resultados:
+                print(f"⚠️ {len(resultados)} producto(s) con stock bajo:\n")
+                for r in resultados:
+                    print(r)
+            else:
+                print("✅ Ningún producto tiene stock bajo.")
+
+        elif opcion == "9":
+            print("\n💎 Productos más caros")
+            k = input("🔢 ¿Cuántos desea ver? (enter = 5): ")
+            try:
+                resultados = inventario.mas_caros(int(k) if k else 5)
+            except ValueError:
+                print("❌ Error: Entrada inválida.")
+                continue
+            if resultados:
+                for r in resultados:
+                    print(r)
+            else:
+                print("📭 El inventario está vacío.")
+
+        elif opcion == "10":
+            print("\n📊 Resumen del inventario")
+            estadisticas = inventario.estadisticas_precio()
+            if estadisticas is None:
+                print("📭 El inventario está vacío.")
+                continue
+            print(f"🛒 Productos: {len(inventario.productos)}")
+            print(f"📦 Unidades en stock: {inventario.total_unidades()}")
+            print(f"💰 Valor total del stock: ${inventario.valor_total():.2f}")
+            print(f"💲 Precio mínimo / promedio / máximo: ${estadisticas['minimo']:.2f} / "
+                  f"${estadisticas['promedio']:.2f} / ${estadisticas['maximo']:.2f}")
+
+        elif opcion == "11":
+            print("\n📥 Importar productos desde CSV (columnas: id,nombre,cantidad,precio)")
+            ruta = input("📄 Ruta del archivo CSV: ")
+            try:
+                mostrar_resultado_importacion(inventario.importar_csv(ruta))
+            except OSError as e:
+                print(f"❌ No se pudo leer el archivo: {e}")
+
+        elif opcion == "12":
+            print("\n📤 Exportar inventario a CSV")
+            ruta = input("📄 Ruta del archivo CSV de salida: ")
+            try:
+                print(f"✅ {inventario.exportar_csv(ruta)} producto(s) exportados a {ruta}.")
+            except OSError as e:
+                print(f"❌ No se pudo escribir el archivo: {e}")
+
+        elif opcion == "13":
+            print("\n🕒 Productos modificados entre dos fechas (AAAA-MM-DD o AAAA-MM-DD HH:MM:SS)")
+            desde = input("📅 Desde (enter para omitir): ").strip()
+            hasta = input("📅 Hasta (enter para omitir): ").strip()
+            try:
+                # Con solo el día, el rango abarca el día completo
+                resultados = inventario.modificados_entre(
+                    (desde if len(desde) > 10 else desde + " 00:00:00") if desde else None,
+                    (hasta if len(hasta) > 10 else hasta + " 23:59:59") if hasta else None
+                )
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+                continue
+            if resultados:
+                print(f"✅ {len(resultados)} producto(s) modificados en ese periodo:\n")
+                for r in resultados:
+                    print(r)
+            else:
+                print("❌ Ningún producto se modificó en ese periodo.")
+
+        elif opcion == "14":
+            print("\n🆕 Últimos productos modificados")
+            n = input("🔢 ¿Cuántos desea ver? (enter = 10): ")
+            try:
+                resultados = inventario.recientes(int(n) if n else 10)
+            except ValueError:
+                print("❌ Error: Entrada inválida.")
+                continue
+            if resultados:
+                for r in resultados:
+                    print(r)
+            else:
+                print("📭 El inventario está vacío.")
+
+        elif opcion == "15":
+            print("\n🕸️ Productos sin cambios")
+            dias = input("📅 Días sin modificarse (enter = 30): ")
+            try:
+                resultados = inventario.sin_cambios_desde(float(dias) if dias else 30)
+            except ValueError:
+                print("❌ Error: Entrada inválida.")
+                continue
+            if resultados:
+                print(f"⚠️ {len(resultados)} producto(s) sin cambios en ese tiempo:\n")
+                for r in resultados:
+                    print(r)
+            else:
+                print("✅ Todos los productos se modificaron en ese tiempo.")
+
+        elif opcion == "16":
+            print("\n📏 Métricas de carga y guardado")
+            if not METRICAS.activo:
+                print("💤 Las métricas están apagadas: inicie con INVENTARIO_METRICAS=1 "
+                      "(y INVENTARIO_PERFIL=perfil.prof para perfilar con cProfile).")
+                continue
+            print(METRICAS.texto())
+            ruta = input("💾 Guardar en JSON (enter = no): ").strip()
+            if ruta:
+                try:
+                    METRICAS.guardar_json(ruta)
+                    print(f"✅ Métricas guardadas en {ruta}.")
+                except OSError as e:
+                    print(f"❌ {e}")
+
+        elif opcion == "17":
+            print("\n🧾 Venta o reposición de varios productos")
+            print("Una línea por producto: ID DELTA [PRECIO] (DELTA negativo para vender). Enter vacío para terminar.")
+            cambios = []
+            while True:
+                linea = input("➕ ").split()
+                if not linea:
+                    break
+                try:
+                    cambio = {"id": linea[0], "delta": int(linea[1]) if len(linea) > 1 else 0}
+                    if len(linea) > 2:
+                        cambio["precio"] = float(linea[2])
+                except ValueError:
+                    print("❌ Error: DELTA debe ser entero y PRECIO numérico; la línea no se agregó.")
+                    continue
+                cambios.append(cambio)
+            if not cambios:
+                print("🚫 Operación cancelada.")
+                continue
+            resultado = inventario.aplicar_transaccion(cambios)
+            if resultado["aplicada"]:
+                print(f"✅ Transacción aplicada a {len({c['id'] for c in cambios})} producto(s).")
+            else:
+                print("❌ Transacción rechazada; no se modificó ningún producto:")
+                for posicion, motivo in resultado["errores"]:
+                    print(f"   línea {posicion}: {motivo}")
+
         else:
             print("❗ Opción no válida. Intente nuevamente.")
 
 
-# ▶️ Ejecuta el menú si se ejecuta este archivo directamente
+# ⌨️ Comandos de línea para tareas masivas (sin pasar por el menú)
+def ejecutar_comando(argumentos):
+    analizador = argparse.ArgumentParser(prog="Gestor_Inventario.py",
+                                         description="Operaciones masivas sobre el inventario.")
+    analizador.add_argument("--inventario", default="inventario.json", help="archivo del inventario")
+    analizador.add_argument("--concurrente", action="store_true", default=CONCURRENTE,
+                            help="bloquea el archivo para compartirlo con otros procesos (o INVENTARIO_CONCURRENTE=1)")
+    analizador.add_argument("--metricas", action="store_true",
+                            help="mide la carga y el guardado y muestra la tabla al terminar")
+    analizador.add_argument("--metricas-json", metavar="ARCHIVO", help="igual que --metricas, pero las guarda en JSON")
+    comandos = analizador.add_subparsers(dest="comando", required=True)
+    comandos.add_parser("importar-csv", help="importa productos desde un CSV").add_argument("csv")
+    comandos.add_parser("exportar-csv", help="exporta el inventario a un CSV").add_argument("csv")
+    for nombre, ayuda in (("a-binario", "convierte un inventario JSON a instantánea binaria"),
+                          ("a-json", "convierte una instantánea binaria a inventario JSON")):
+        conversion = comandos.add_parser(nombre, help=ayuda)
+        conversion.add_argument("origen")
+        conversion.add_argument("destino")
+    args = analizador.parse_args(argumentos)
+    if args.metricas or args.metricas_json:
+        METRICAS.activo = True
+
+    if args.comando in ("a-binario", "a-json"):
+        convertir = convertir_a_binario if args.comando == "a-binario" else convertir_a_json
+        try:
+            print(f"✅ {convertir(args.origen, args.destino)} producto(s) convertidos a {args.destino}.")
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        return
+
+    try:
+        inventario = Inventario(args.inventario, concurrente=args.concurrente)
+    except SnapshotInvalido:
+        sys.exit(1)
+    try:
+        if args.comando == "importar-csv":
+            mostrar_resultado_importacion(inventario.importar_csv(args.csv))
+        elif args.comando == "exportar-csv":
+            print(f"✅ {inventario.exportar_csv(args.csv)} producto(s) exportados a {args.csv}.")
+    except OSError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        inventario.cerrar()
+        if args.metricas:
+            print(f"\n📏 Métricas\n{METRICAS.texto()}")
+        if args.metricas_json:
+            METRICAS.guardar_json(args.metricas_json)
+
+
+# ▶️ Ejecuta el menú si se ejecuta este archivo directamente (o un comando si se pasan argumentos)
 if __name__ == "__main__":
-    menu()
\ No newline at end of file
+    if sys.argv[1:] == ["--concurrente"]:
+        menu(concurrente=True)
+    elif len(sys.argv) > 1:
+        ejecutar_comando(sys.argv[1:])
+    else:
+        menu()
\ No newline at end of file
@@ -0,0 +1,192 @@
+# 🧱 Almacén columnar para Inventario: una columna tipada por atributo en lugar de un objeto por producto
+# Se activa con Inventario(..., almacen="columnar"); si NumPy está instalado, los agregados se vectorizan.
+from array import array
+from collections.abc import MutableMapping
+from operator import mul
+
+from producto import Producto, marca_de_fecha, texto_de_marca
+
+try:
+    import numpy as np   # 🚀 Opcional: solo acelera los agregados
+except ImportError:
+    np = None
+
+
+def cantidad_entera(id_producto, cantidad):
+    # 🔢 La columna de cantidades es un array('q'): solo admite enteros y un float (aunque sea 5.0)
+    # fallaría con un TypeError poco claro; se rechaza aquí diciendo qué producto y qué valor
+    if not isinstance(cantidad, int):
+        raise TypeError(f"La cantidad del producto {id_producto} debe ser un número entero "
+                        f"(se recibió {cantidad!r}, de tipo {type(cantidad).__name__}).")
+    return cantidad
+
+
+class ProductoFila(Producto):
+    """
+    👁️ Vista de un Producto sobre su fila del almacén columnar.
+    Leer o asignar un atributo lee o escribe directamente en la columna, así que
+    el resto del código (Inventario, __str__, to_dict) sigue funcionando igual.
+    """
+    __slots__ = ("_almacen", "_id")
+
+    def __init__(self, almacen, id_producto):
+        self._almacen = almacen
+        self._id = id_producto
+
+    @property
+    def _fila(self):
+        return self._almacen.filas[self._id]
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def nombre(self):
+        return self._almacen.nombres[self._fila]
+
+    @nombre.setter
+    def nombre(self, valor):
+        self._almacen.nombres[self._fila] = valor
+
+    @property
+    def cantidad(self):
+        return self._almacen.cantidades[self._fila]
+
+    @cantidad.setter
+    def cantidad(self, valor):
+        self._almacen.cantidades[self._fila] = cantidad_entera(self._id, valor)
+
+    @property
+    def precio(self):
+        return self._almacen.precios[self._fila]
+
+    @precio.setter
+    def precio(self, valor):
+        self._almacen.precios[self._fila] = valor
+
+    @property
+    def fecha(self):
+        return texto_de_marca(self._almacen.fechas[self._fila])
+
+    @fecha.setter
+    def fecha(self, valor):
+        self._almacen.fechas[self._fila] = marca_de_fecha(valor)
+
+
+class AlmacenColumnar(MutableMapping):
+    """
+    📊 Diccionario id -> Producto guardado en columnas paralelas:
+    ids/nombres/fechas (listas; fechas en segundos epoch), cantidades (array 'q') y precios (array 'd').
+    Las bajas dejan una lápida en `vivos` y se compacta cuando hay demasiadas.
+    El recorrido respeta el orden de inserción, igual que un dict.
+    """
+    def __init__(self):
+        self.ids = []
+        self.nombres = []
+        self.fechas = []
+        self.cantidades = array("q")
+        self.precios = array("d")
+        self.vivos = bytearray()   # 1 = fila en uso, 0 = lápida
+        self.filas = {}            # id -> número de fila
+        self._lapidas = 0
+
+    @classmethod
+    def desde_columnas(cls, ids, nombres, fechas, cantidades, precios):
+        """⚡ Crea el almacén adoptando columnas ya armadas (p. ej. leídas de la instantánea binaria)."""
+        almacen = cls()
+        almacen.ids, almacen.nombres = ids, nombres
+        almacen.fechas = [marca_de_fecha(fecha) for fecha in fechas]
+        almacen.cantidades, almacen.precios = cantidades, precios
+        almacen.vivos = bytearray(b"\x01") * len(ids)
+        almacen.filas = {pid: fila for fila, pid in enumerate(ids)}
+        return almacen
+
+    # 🗂️ Interfaz de diccionario
+    def __getitem__(self, id_producto):
+        if id_producto not in self.filas:
+            raise KeyError(id_producto)
+        return ProductoFila(self, id_producto)
+
+    def __setitem__(self, id_producto, producto):
+        cantidad = cantidad_entera(id_producto, producto.cantidad)   # Antes de tocar ninguna columna
+        fila = self.filas.get(id_producto)
+        if fila is None:
+            self.filas[id_producto] = len(self.ids)
+            self.ids.append(id_producto)
+            self.nombres.append(producto.nombre)
+            self.fechas.append(marca_de_fecha(producto.fecha))
+            self.cantidades.append(cantidad)
+            self.precios.append(producto.precio)
+            self.vivos.append(1)
+        else:
+            self.nombres[fila] = producto.nombre
+            self.fechas[fila] = marca_de_fecha(producto.fecha)
+            self.cantidades[fila] = cantidad
+            self.precios[fila] = producto.precio
+
+    def __delitem__(self, id_producto):
+        fila = self.filas.pop(id_producto)
+        self.vivos[fila] = 0
+        self.nombres[fila] = self.fechas[fila] = None   # Libera los textos de la fila borrada
+        self._lapidas += 1
+        if self._lapidas > 1024 and self._lapidas * 2 > len(self.ids):
+            self.compactar()
+
+    def __iter__(self):
+        vivos = self.vivos
+        return (pid for fila, pid in enumerate(self.ids) if vivos[fila])
+
+    def __len__(self):
+        return len(self.filas)
+
+    def __contains__(self, id_producto):
+        return id_producto in self.filas
+
+    def compactar(self):
+        """🧹 Reescribe las columnas sin las filas borradas (conserva el orden)."""
+        conservar = [fila for fila in range(len(self.ids)) if self.vivos[fila]]
+        self.ids = [self.ids[f] for f in conservar]
+        self.nombres = [self.nombres[f] for f in conservar]
+        self.fechas = [self.fechas[f] for f in conservar]
+        self.cantidades = array("q", (self.cantidades[f] for f in conservar))
+        self.precios = array("d", (self.precios[f] for f in conservar))
+        self.vivos = bytearray(b"\x01") * len(conservar)
+        self.filas = {pid: fila for fila, pid in enumerate(self.ids)}
+        self._lapidas = 0
+
+    # 📈 Agregados sobre columnas completas
+    def _columnas_numpy(self):
+        vivos = np.frombuffer(self.vivos, dtype=np.uint8).astype(bool)
+        cantidades = np.frombuffer(self.cantidades, dtype=np.int64)[vivos]
+        precios = np.frombuffer(self.precios, dtype=np.float64)[vivos]
+        return cantidades, precios
+
+    def valor_total(self):
+        if np is not None:
+            cantidades, precios = self._columnas_numpy()
+            return float(np.dot(cantidades, precios))
+        if not self._lapidas:
+            return sum(map(mul, self.cantidades, self.precios))
+        return sum(c * p for c, p, v in zip(self.cantidades, self.precios, self.vivos) if v)
+
+    def total_unidades(self):
+        if np is not None:
+            cantidades, _ = self._columnas_numpy()
+            return int(cantidades.sum())
+        if not self._lapidas:
+            return sum(self.cantidades)
+        return sum(c for c, v in zip(self.cantidades, self.vivos) if v)
+
+    def estadisticas_precio(self):
+        if not self.filas:
+            return None
+        if np is not None:
+            _, precios = self._columnas_numpy()
+            return {"minimo": float(precios.min()), "maximo": float(precios.max()),
+                    "promedio": float(precios.mean())}
+        if not self._lapidas:
+            precios = self.precios
+        else:
+            precios = [p for p, v in zip(self.precios, self.vivos) if v]
+        return {"minimo": min(precios), "maximo": max(precios), "promedio": sum(precios) / len(precios)}
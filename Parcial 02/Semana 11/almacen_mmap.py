@@ -0,0 +1,485 @@
+# 🗺️ Almacén en archivo mapeado en memoria (mmap): un registro de ancho fijo por producto
+# Se activa con Inventario("inventario.dat", almacen="mmap"); los textos van en "inventario.dat.heap<n>".
+# Cambiar cantidad o precio escribe unos pocos bytes en su lugar; guardar_inventario() hace el msync,
+# así que la política de guardado de Inventario (cada operación, cada N, cada T ms) es la política de msync.
+# El índice id -> fila es una tabla hash en disco ("inventario.dat.idx"): abrir no recorre los registros.
+# Migración desde el JSON:  python almacen_mmap.py Inventario.json inventario.dat
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from collections.abc import MutableMapping
+
+# Módulos compartidos entre semanas (carpeta Parcial 02/comun)
+_PARCIAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARCIAL not in sys.path:
+    sys.path.insert(0, _PARCIAL)
+from comun.json_por_partes import leer_entradas_json
+from producto import Producto, marca_de_fecha, texto_de_marca
+
+MAGICO = b"INVM"
+VERSION = 2   # 2: fechas en segundos epoch, igual que Producto
+# mágico, versión, tamaño de registro, generación del montículo, registros usados, bytes de montículo usados
+CABECERA = struct.Struct("<4sHHIQQ")
+TAM_CABECERA = 64
+# vivo, id (posición, largo), nombre (posición, largo), cantidad, precio, fecha, fecha en texto (posición, largo)
+REGISTRO = struct.Struct("<BQIQIqdqQI3x")
+CAPACIDAD_INICIAL = 1024         # registros
+MONTICULO_INICIAL = 64 * 1024    # bytes
+
+# Posición de cada campo dentro del registro, para leer o escribir solo ese campo
+_ID = struct.Struct("<BQI")
+_TEXTO = struct.Struct("<QI")
+_CANTIDAD = struct.Struct("<q")
+_PRECIO = struct.Struct("<d")
+_FECHA = struct.Struct("<qQI")
+POS_NOMBRE = struct.calcsize("<BQI")
+POS_CANTIDAD = POS_NOMBRE + _TEXTO.size
+POS_PRECIO = POS_CANTIDAD + _CANTIDAD.size
+POS_FECHA = POS_PRECIO + _PRECIO.size
+
+# 🗂️ Índice: tabla hash de direccionamiento abierto (sondeo lineal), potencia de 2 de ranuras
+# mágico, versión, generación, ranuras, ranuras ocupadas (con borradas), registros usados, lápidas
+CABECERA_INDICE = struct.Struct("<4sHxxIQQQQ")
+MAGICO_INDICE = b"INVX"
+VERSION_INDICE = 1
+TAM_CABECERA_INDICE = 64
+RANURA = struct.Struct("<QI")    # hash de 64 bits del id, fila + 1
+RANURA_VACIA = 0
+RANURA_BORRADA = 0xFFFFFFFF
+RANURAS_INICIALES = 2048
+CARGA_MAXIMA = 0.7
+
+
+def hash_id(id_producto):
+    # hash() de Python cambia entre ejecuciones; este es estable para guardarlo en disco
+    return int.from_bytes(hashlib.blake2b(id_producto.encode("utf-8", "surrogatepass"), digest_size=8).digest(),
+                          "little")
+
+
+# 🕒 Las fechas se guardan como segundos epoch (8 bytes, se actualizan en su lugar);
+# un texto con otro formato va al montículo
+FECHA_TEXTO = -2**63
+FECHA_NULA = -2**63 + 1
+
+
+class ProductoMmap(Producto):
+    """
+    👁️ Vista de un Producto sobre su registro en el archivo mapeado.
+    Leer un atributo lee solo ese campo; asignar cantidad o precio escribe 8 bytes en su lugar.
+    """
+    __slots__ = ("_almacen", "_id")
+
+    def __init__(self, almacen, id_producto):
+        self._almacen = almacen
+        self._id = id_producto
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def nombre(self):
+        return self._almacen.leer_campo(self._id, "nombre")
+
+    @nombre.setter
+    def nombre(self, valor):
+        self._almacen.escribir_campo(self._id, "nombre", valor)
+
+    @property
+    def cantidad(self):
+        return self._almacen.leer_campo(self._id, "cantidad")
+
+    @cantidad.setter
+    def cantidad(self, valor):
+        self._almacen.escribir_campo(self._id, "cantidad", valor)
+
+    @property
+    def precio(self):
+        return self._almacen.leer_campo(self._id, "precio")
+
+    @precio.setter
+    def precio(self, valor):
+        self._almacen.escribir_campo(self._id, "precio", valor)
+
+    @property
+    def fecha(self):
+        return self._almacen.leer_campo(self._id, "fecha")
+
+    @fecha.setter
+    def fecha(self, valor):
+        self._almacen.escribir_campo(self._id, "fecha", valor)
+
+
+class AlmacenMmap(MutableMapping):
+    """
+    🗺️ Diccionario id -> Producto sobre dos archivos mapeados en memoria:
+    registros de ancho fijo (números y referencias) y un montículo de solo-añadir con los textos.
+    Abrir no recorre los registros: la fila de cada id se busca en el índice en disco la primera
+    vez que se pide y se recuerda. Si el índice falta o no coincide con los registros (otra
+    generación, un corte a mitad de un cambio) se reconstruye una vez y queda guardado.
+    Las bajas dejan una lápida y se compacta (registros y montículo) cuando hay demasiadas.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        if not os.path.exists(ruta):
+            self._crear_vacio(ruta)
+        self._archivo = open(ruta, "r+b")
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0)
+        magico, version, tamaño, self._generacion, self._usados, self._monticulo_usado = \
+            CABECERA.unpack_from(self._mapa, 0)
+        if magico != MAGICO or version != VERSION or tamaño != REGISTRO.size:
+            self._mapa.close()
+            self._archivo.close()
+            raise ValueError(f"{ruta} no es un almacén mmap de inventario compatible.")
+        self._archivo_monticulo = open(self._ruta_monticulo(self._generacion), "r+b")
+        self._monticulo = mmap.mmap(self._archivo_monticulo.fileno(), 0)
+
+        # 🆔 id -> fila solo de los ids ya consultados; el resto se busca en el índice al pedirlo
+        self._filas = {}
+        self._archivo_indice = self._indice = None
+        if not self._abrir_indice():
+            self._reconstruir_indice()
+
+    # 🗂️ Índice en disco
+    def _ruta_indice(self):
+        return self.ruta + ".idx"
+
+    def _abrir_indice(self):
+        # Usa el índice guardado si corresponde a estos registros; si no, devuelve False
+        try:
+            archivo = open(self._ruta_indice(), "r+b")
+        except FileNotFoundError:
+            return False
+        if os.fstat(archivo.fileno()).st_size < TAM_CABECERA_INDICE:
+            archivo.close()
+            return False
+        indice = mmap.mmap(archivo.fileno(), 0)
+        magico, version, generacion, ranuras, ocupadas, usados, lapidas = CABECERA_INDICE.unpack_from(indice, 0)
+        if (magico, version, generacion, usados) != (MAGICO_INDICE, VERSION_INDICE, self._generacion, self._usados) \
+                or len(indice) != TAM_CABECERA_INDICE + ranuras * RANURA.size:
+            indice.close()
+            archivo.close()
+            return False
+        self._archivo_indice, self._indice = archivo, indice
+        self._ranuras, self._ocupadas, self._lapidas = ranuras, ocupadas, lapidas
+        return True
+
+    def _escribir_cabecera_indice(self):
+        CABECERA_INDICE.pack_into(self._indice, 0, MAGICO_INDICE, VERSION_INDICE, self._generacion,
+                                  self._ranuras, self._ocupadas, self._usados, self._lapidas)
+
+    def _reconstruir_indice(self, pares=None):
+        """
+        🔁 Escribe un índice nuevo con los pares (hash, fila) dados o, si no se dan, recorriendo
+        todos los registros (índice ausente o desactualizado). Lo reemplaza con os.replace.
+        """
+        if pares is None:
+            pares, self._lapidas = [], 0
+            for fila in range(self._usados):
+                vivo, posicion, largo = _ID.unpack_from(self._mapa, self._base(fila))
+                if vivo:
+                    pares.append((hash_id(self._texto(posicion, largo)), fila))
+                else:
+                    self._lapidas += 1
+        ranuras = RANURAS_INICIALES
+        while len(pares) > ranuras * CARGA_MAXIMA / 2:   # Queda espacio para crecer antes del próximo rehash
+            ranuras *= 2
+        tabla = bytearray(TAM_CABECERA_INDICE + ranuras * RANURA.size)
+        for clave, fila in pares:
+            i = clave & (ranuras - 1)
+            while RANURA.unpack_from(tabla, TAM_CABECERA_INDICE + i * RANURA.size)[1] != RANURA_VACIA:
+                i = (i + 1) & (ranuras - 1)
+            RANURA.pack_into(tabla, TAM_CABECERA_INDICE + i * RANURA.size, clave, fila + 1)
+        CABECERA_INDICE.pack_into(tabla, 0, MAGICO_INDICE, VERSION_INDICE, self._generacion,
+                                  ranuras, len(pares), self._usados, self._lapidas)
+        temporal = self._ruta_indice() + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(tabla)
+        self._cerrar_indice()
+        os.replace(temporal, self._ruta_indice())
+        if not self._abrir_indice():
+            raise ValueError(f"No se pudo abrir el índice recién escrito de {self.ruta}.")
+
+    def _pares_indice(self):
+        # (hash, fila) de cada ranura con un id vivo, leídos del índice actual (sin tocar el montículo)
+        fin = TAM_CABECERA_INDICE + self._ranuras * RANURA.size
+        for clave, valor in RANURA.iter_unpack(self._indice[TAM_CABECERA_INDICE:fin]):
+            if valor not in (RANURA_VACIA, RANURA_BORRADA):
+                yield clave, valor - 1
+
+    def _cerrar_indice(self):
+        if self._indice is not None:
+            self._indice.close()
+            self._archivo_indice.close()
+            self._archivo_indice = self._indice = None
+
+    def _buscar(self, id_producto):
+        """
+        🔍 Sondeo lineal desde el hash del id. Devuelve (ranura, fila) si está o (ranura libre, None)
+        si no, donde la ranura libre es la primera borrada del camino o la vacía que lo cierra.
+        A igual hash se compara el id guardado en el registro.
+        """
+        clave = hash_id(id_producto)
+        mascara = self._ranuras - 1
+        i, libre = clave & mascara, None
+        while True:
+            guardada, valor = RANURA.unpack_from(self._indice, TAM_CABECERA_INDICE + i * RANURA.size)
+            if valor == RANURA_VACIA:
+                return (i if libre is None else libre), None
+            if valor == RANURA_BORRADA:
+                if libre is None:
+                    libre = i
+            elif guardada == clave and valor <= self._usados:
+                vivo, posicion, largo = _ID.unpack_from(self._mapa, self._base(valor - 1))
+                if vivo and self._texto(posicion, largo) == id_producto:
+                    return i, valor - 1
+            i = (i + 1) & mascara
+
+    def _fila(self, id_producto):
+        # Fila del id (KeyError si no existe); la primera consulta va al índice y luego queda en memoria
+        fila = self._filas.get(id_producto)
+        if fila is None:
+            fila = self._buscar(id_producto)[1]
+            if fila is None:
+                raise KeyError(id_producto)
+            self._filas[id_producto] = fila
+        return fila
+
+    def _ruta_monticulo(self, generacion):
+        return f"{self.ruta}.heap{generacion}"
+
+    @staticmethod
+    def _crear_vacio(ruta, generacion=0):
+        with open(f"{ruta}.heap{generacion}", "wb") as f:
+            f.truncate(MONTICULO_INICIAL)
+        with open(ruta, "wb") as f:
+            f.write(CABECERA.pack(MAGICO, VERSION, REGISTRO.size, generacion, 0, 0))
+            f.truncate(TAM_CABECERA + CAPACIDAD_INICIAL * REGISTRO.size)
+        if os.path.exists(ruta + ".idx"):
+            os.remove(ruta + ".idx")   # De una compactación interrumpida: no describe estos registros
+
+    @staticmethod
+    def _base(fila):
+        return TAM_CABECERA + fila * REGISTRO.size
+
+    def _texto(self, posicion, largo):
+        return str(self._monticulo[posicion:posicion + largo], "utf-8", "surrogatepass")
+
+    def _escribir_cabecera(self):
+        CABECERA.pack_into(self._mapa, 0, MAGICO, VERSION, REGISTRO.size, self._generacion,
+                           self._usados, self._monticulo_usado)
+
+    @staticmethod
+    def _crecer(archivo, mapa, minimo):
+        # 📏 Duplica el archivo (un mmap no puede crecer mientras está mapeado en todas las plataformas)
+        tamaño = max(minimo, len(mapa) * 2)
+        mapa.flush()
+        mapa.close()
+        archivo.truncate(tamaño)
+        return mmap.mmap(archivo.fileno(), 0)
+
+    def _guardar_texto(self, texto):
+        datos = texto.encode("utf-8", "surrogatepass")
+        posicion, fin = self._monticulo_usado, self._monticulo_usado + len(datos)
+        if fin > len(self._monticulo):
+            self._monticulo = self._crecer(self._archivo_monticulo, self._monticulo, fin)
+        self._monticulo[posicion:fin] = datos
+        self._monticulo_usado = fin
+        return posicion, len(datos)
+
+    def _codificar_fecha(self, fecha):
+        marca = marca_de_fecha(fecha)
+        if marca is None:
+            return FECHA_NULA, 0, 0
+        if isinstance(marca, int):
+            return marca, 0, 0
+        return (FECHA_TEXTO, *self._guardar_texto(marca))
+
+    def _decodificar_fecha(self, segundos, posicion, largo):
+        if segundos == FECHA_NULA:
+            return None
+        if segundos == FECHA_TEXTO:
+            return self._texto(posicion, largo)
+        return texto_de_marca(segundos)
+
+    # 🔬 Lectura y escritura de un solo campo
+    def leer_campo(self, id_producto, campo):
+        base = self._base(self._fila(id_producto))
+        if campo == "cantidad":
+            return _CANTIDAD.unpack_from(self._mapa, base + POS_CANTIDAD)[0]
+        if campo == "precio":
+            return _PRECIO.unpack_from(self._mapa, base + POS_PRECIO)[0]
+        if campo == "nombre":
+            return self._texto(*_TEXTO.unpack_from(self._mapa, base + POS_NOMBRE))
+        return self._decodificar_fecha(*_FECHA.unpack_from(self._mapa, base + POS_FECHA))
+
+    def escribir_campo(self, id_producto, campo, valor):
+        base = self._base(self._fila(id_producto))
+        if campo == "cantidad":
+            _CANTIDAD.pack_into(self._mapa, base + POS_CANTIDAD, valor)
+        elif campo == "precio":
+            _PRECIO.pack_into(self._mapa, base + POS_PRECIO, valor)
+        elif campo == "nombre":
+            _TEXTO.pack_into(self._mapa, base + POS_NOMBRE, *self._guardar_texto(valor))
+            self._escribir_cabecera()
+        else:
+            _FECHA.pack_into(self._mapa, base + POS_FECHA, *self._codificar_fecha(valor))
+            self._escribir_cabecera()
+
+    # 🗂️ Interfaz de diccionario
+    def __getitem__(self, id_producto):
+        self._fila(id_producto)
+        return ProductoMmap(self, id_producto)
+
+    def __setitem__(self, id_producto, producto):
+        if id_producto in self:
+            vista = ProductoMmap(self, id_producto)
+            if vista.nombre != producto.nombre:
+                vista.nombre = producto.nombre
+            vista.cantidad, vista.precio, vista.fecha = producto.cantidad, producto.precio, producto.fecha
+            return
+        if (self._ocupadas + 1) > self._ranuras * CARGA_MAXIMA:
+            self._reconstruir_indice(list(self._pares_indice()))   # Más ranuras y sin las borradas
+        ranura, _ = self._buscar(id_producto)
+        fila = self._usados
+        if self._base(fila + 1) > len(self._mapa):
+            self._mapa = self._crecer(self._archivo, self._mapa, self._base(fila + 1))
+        # Primero los textos, luego el registro y al final la cabecera que lo hace visible
+        id_pos, id_largo = self._guardar_texto(id_producto)
+        nombre_pos, nombre_largo = self._guardar_texto(producto.nombre)
+        REGISTRO.pack_into(self._mapa, self._base(fila), 1, id_pos, id_largo, nombre_pos, nombre_largo,
+                           producto.cantidad, producto.precio, *self._codificar_fecha(producto.fecha))
+        self._usados += 1
+        self._escribir_cabecera()
+        # Después del registro, la ranura del índice y su cabecera (que dice hasta qué registro cubre)
+        if RANURA.unpack_from(self._indice, TAM_CABECERA_INDICE + ranura * RANURA.size)[1] == RANURA_VACIA:
+            self._ocupadas += 1
+        RANURA.pack_into(self._indice, TAM_CABECERA_INDICE + ranura * RANURA.size, hash_id(id_producto), fila + 1)
+        self._escribir_cabecera_indice()
+        self._filas[id_producto] = fila
+
+    def __delitem__(self, id_producto):
+        ranura, fila = self._buscar(id_producto)
+        if fila is None:
+            raise KeyError(id_producto)
+        self._filas.pop(id_producto, None)
+        self._mapa[self._base(fila)] = 0   # 🪦 Lápida: un solo byte
+        RANURA.pack_into(self._indice, TAM_CABECERA_INDICE + ranura * RANURA.size, 0, RANURA_BORRADA)
+        self._lapidas += 1
+        self._escribir_cabecera_indice()
+        if self._lapidas > 1024 and self._lapidas * 2 > self._usados:
+            self.compactar()
+
+    def __iter__(self):
+        # Las filas nuevas siempre van al final: recorrerlas en orden da el orden de inserción
+        for fila in range(self._usados):
+            vivo, posicion, largo = _ID.unpack_from(self._mapa, self._base(fila))
+            if vivo:
+                yield self._texto(posicion, largo)
+
+    def __len__(self):
+        return self._usados - self._lapidas
+
+    def __contains__(self, id_producto):
+        try:
+            self._fila(id_producto)
+        except KeyError:
+            return False
+        return True
+
+    def registros(self):
+        """📤 (id, dict) de cada producto vivo recorriendo los registros en orden, sin crear vistas."""
+        for fila in range(self._usados):
+            (vivo, id_pos, id_largo, nombre_pos, nombre_largo, cantidad, precio,
+             segundos, fecha_pos, fecha_largo) = REGISTRO.unpack_from(self._mapa, self._base(fila))
+            if vivo:
+                pid = self._texto(id_pos, id_largo)
+                yield pid, {"id": pid, "nombre": self._texto(nombre_pos, nombre_largo), "cantidad": cantidad,
+                            "precio": precio, "fecha": self._decodificar_fecha(segundos, fecha_pos, fecha_largo)}
+
+    def _numeros(self):
+        # (cantidad, precio) de las filas vivas, sin tocar el montículo
+        fin = self._base(self._usados)
+        for registro in REGISTRO.iter_unpack(self._mapa[TAM_CABECERA:fin]):
+            if registro[0]:
+                yield registro[5], registro[6]
+
+    def confirmar(self):
+        """💾 msync: lleva al disco las páginas modificadas de ambos archivos."""
+        self._monticulo.flush()
+        self._mapa.flush()
+        self._indice.flush()
+
+    def cerrar(self):
+        self.confirmar()
+        self._cerrar_indice()
+        self._mapa.close()
+        self._monticulo.close()
+        self._archivo.close()
+        self._archivo_monticulo.close()
+
+    def compactar(self):
+        """
+        🧹 Reescribe registros y montículo sin lápidas ni textos viejos, en una nueva generación.
+        El cambio de generación es el os.replace del archivo de registros: si algo falla antes,
+        el almacén anterior queda intacto.
+        """
+        temporal = self.ruta + ".tmp"
+        AlmacenMmap._crear_vacio(temporal, self._generacion + 1)
+        nuevo = AlmacenMmap(temporal)
+        for pid, datos in list(self.registros()):
+            nuevo[pid] = Producto(pid, datos["nombre"], datos["cantidad"], datos["precio"], datos["fecha"])
+        nuevo.cerrar()
+        os.replace(f"{temporal}.heap{self._generacion + 1}", self._ruta_monticulo(self._generacion + 1))
+        viejo = self._ruta_monticulo(self._generacion)
+        self.cerrar()
+        # El índice nuevo ya dice la generación nueva: si algo falla antes del último replace, no coincide
+        # con los registros viejos y se reconstruye al abrir
+        os.replace(f"{temporal}.idx", self._ruta_indice())
+        os.replace(temporal, self.ruta)
+        try:
+            os.remove(viejo)
+        except OSError:
+            pass   # Otro proceso puede tenerlo mapeado todavía (Windows no deja borrarlo)
+        self.__init__(self.ruta)
+
+    # 📊 Agregados recorriendo solo los números
+    def valor_total(self):
+        return sum(cantidad * precio for cantidad, precio in self._numeros())
+
+    def total_unidades(self):
+        return sum(cantidad for cantidad, _ in self._numeros())
+
+    def estadisticas_precio(self):
+        precios = [precio for _, precio in self._numeros()]
+        if not precios:
+            return None
+        return {"minimo": min(precios), "maximo": max(precios), "promedio": sum(precios) / len(precios)}
+
+
+def migrar_desde_json(ruta_json, ruta_dat):
+    """
+    🚚 Copia todos los productos de un Inventario.json a un almacén mmap nuevo
+    leyendo el JSON por partes. Devuelve cuántos productos se migraron.
+    """
+    almacen = AlmacenMmap(ruta_dat)
+    with open(ruta_json, "r") as f:
+        for pid, datos in leer_entradas_json(f):
+            almacen[pid] = Producto.from_dict(datos)
+    total = len(almacen)
+    almacen.cerrar()
+    return total
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python almacen_mmap.py <Inventario.json> <inventario.dat>")
+        sys.exit(1)
+    try:
+        migrados = migrar_desde_json(sys.argv[1], sys.argv[2])
+    except (OSError, ValueError) as e:
+        print(f"❗ No se pudo migrar el inventario: {e}")
+        sys.exit(1)
+    print(f"✅ {migrados} productos migrados a {sys.argv[2]}")
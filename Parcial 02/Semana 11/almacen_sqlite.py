@@ -0,0 +1,195 @@
+# 🗄️ Almacén SQLite para Inventario: cada cambio es un INSERT/UPDATE de una sola fila dentro de una transacción
+# Se activa con Inventario("inventario.db", almacen="sqlite").
+# Migración desde el JSON:  python almacen_sqlite.py Inventario.json inventario.db
+import os
+import sqlite3
+import sys
+from collections.abc import MutableMapping
+
+# Módulos compartidos entre semanas (carpeta Parcial 02/comun)
+_PARCIAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARCIAL not in sys.path:
+    sys.path.insert(0, _PARCIAL)
+from comun.json_por_partes import leer_entradas_json
+from producto import Producto
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS productos (
+    orden      INTEGER PRIMARY KEY,        -- conserva el orden de inserción, como el dict
+    id         TEXT NOT NULL UNIQUE,
+    nombre     TEXT NOT NULL,
+    nombre_min TEXT NOT NULL,              -- nombre.lower() de Python, para buscar igual que antes
+    cantidad   INTEGER NOT NULL,
+    precio     REAL NOT NULL,
+    fecha      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_productos_nombre ON productos(nombre_min);
+CREATE INDEX IF NOT EXISTS idx_productos_precio ON productos(precio);
+CREATE INDEX IF NOT EXISTS idx_productos_cantidad ON productos(cantidad);
+CREATE INDEX IF NOT EXISTS idx_productos_fecha ON productos(fecha);
+"""
+
+COLUMNAS = "id, nombre, cantidad, precio, fecha"
+# Fechas "AAAA-MM-DD HH:MM:SS": su orden alfabético es el cronológico (otros textos quedan fuera de las consultas)
+FECHA_VALIDA = "fecha GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]'"
+CAMPOS_EDITABLES = ("nombre", "cantidad", "precio", "fecha")
+
+INSERTAR = """
+INSERT INTO productos (id, nombre, nombre_min, cantidad, precio, fecha) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET nombre = excluded.nombre, nombre_min = excluded.nombre_min,
+    cantidad = excluded.cantidad, precio = excluded.precio, fecha = excluded.fecha
+"""
+
+
+class ProductoSQLite(Producto):
+    """
+    🗂️ Producto leído de la base: al asignar nombre, cantidad, precio o fecha
+    se ejecuta el UPDATE de esa fila en la transacción abierta.
+    """
+    def __init__(self, almacen, id_producto, nombre, cantidad, precio, fecha):
+        super().__init__(id_producto, nombre, cantidad, precio, fecha)
+        self._almacen = almacen   # Se asigna al final: los valores iniciales no se reescriben
+
+    def __setattr__(self, campo, valor):
+        super().__setattr__(campo, valor)
+        almacen = self.__dict__.get("_almacen")
+        if almacen is not None and campo in CAMPOS_EDITABLES:
+            # La fecha puede llegar como segundos epoch: en la base se guarda siempre el texto
+            almacen.actualizar_campo(self.id, campo, self.fecha if campo == "fecha" else valor)
+
+
+class AlmacenSQLite(MutableMapping):
+    """
+    Diccionario id -> Producto respaldado por una tabla SQLite.
+    Las escrituras quedan en la transacción en curso hasta confirmar();
+    Inventario llama a confirmar() según su política de guardado.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        # El hilo de guardado diferido también confirma; Inventario serializa el acceso con su candado
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.executescript(ESQUEMA)
+
+    def _producto(self, fila):
+        return ProductoSQLite(self, *fila)
+
+    def _consultar(self, donde="", parametros=(), orden="orden", limite=None):
+        return list(self._recorrer(donde, parametros, orden, limite))
+
+    def _recorrer(self, donde="", parametros=(), orden="orden", limite=None):
+        sql = f"SELECT {COLUMNAS} FROM productos {donde} ORDER BY {orden}"
+        if limite is not None:
+            sql += f" LIMIT {int(limite)}"
+        return (self._producto(fila) for fila in self.conexion.execute(sql, parametros))
+
+    # 🗂️ Interfaz de diccionario
+    def __getitem__(self, id_producto):
+        fila = self.conexion.execute(f"SELECT {COLUMNAS} FROM productos WHERE id = ?", (id_producto,)).fetchone()
+        if fila is None:
+            raise KeyError(id_producto)
+        return self._producto(fila)
+
+    def __setitem__(self, id_producto, producto):
+        self.conexion.execute(INSERTAR, (id_producto, producto.nombre, producto.nombre.lower(),
+                                         producto.cantidad, producto.precio, producto.fecha))
+
+    def __delitem__(self, id_producto):
+        if self.conexion.execute("DELETE FROM productos WHERE id = ?", (id_producto,)).rowcount == 0:
+            raise KeyError(id_producto)
+
+    def __iter__(self):
+        return (fila[0] for fila in self.conexion.execute("SELECT id FROM productos ORDER BY orden"))
+
+    def __len__(self):
+        return self.conexion.execute("SELECT COUNT(*) FROM productos").fetchone()[0]
+
+    def __contains__(self, id_producto):
+        return self.conexion.execute("SELECT 1 FROM productos WHERE id = ?", (id_producto,)).fetchone() is not None
+
+    def values(self):
+        # Una sola consulta recorrida fila a fila, en lugar de un SELECT por producto
+        return self._recorrer()
+
+    def items(self):
+        return ((p.id, p) for p in self._recorrer())
+
+    def actualizar_campo(self, id_producto, campo, valor):
+        if campo == "nombre":
+            self.conexion.execute("UPDATE productos SET nombre = ?, nombre_min = ? WHERE id = ?",
+                                  (valor, valor.lower(), id_producto))
+        else:
+            self.conexion.execute(f"UPDATE productos SET {campo} = ? WHERE id = ?", (valor, id_producto))
+
+    def confirmar(self):
+        """💾 Confirma la transacción en curso (todas las filas escritas desde el último commit)."""
+        self.conexion.commit()
+
+    def cerrar(self):
+        self.conexion.commit()
+        self.conexion.close()
+
+    # 🔎 Consultas resueltas por SQLite (sin crear un Producto por fila del inventario)
+    def buscar_por_nombre(self, nombre):
+        return self._consultar("WHERE instr(nombre_min, ?) > 0", (nombre.lower(),))
+
+    def buscar_por_rango(self, campo, minimo=None, maximo=None, incluir_maximo=True, condiciones=None):
+        condiciones, parametros = list(condiciones or []), []
+        if minimo is not None:
+            condiciones.append(f"{campo} >= ?")
+            parametros.append(minimo)
+        if maximo is not None:
+            condiciones.append(f"{campo} {'<=' if incluir_maximo else '<'} ?")
+            parametros.append(maximo)
+        donde = "WHERE " + " AND ".join(condiciones) if condiciones else ""
+        return self._consultar(donde, parametros, orden=f"{campo}, id")
+
+    def mas_caros(self, k):
+        return self._consultar(orden="precio DESC, id DESC", limite=max(k, 0))
+
+    def buscar_por_fecha(self, desde=None, hasta=None, incluir_hasta=True):
+        return self.buscar_por_rango("fecha", desde, hasta, incluir_hasta, condiciones=[FECHA_VALIDA])
+
+    def mas_recientes(self, k):
+        return self._consultar(f"WHERE {FECHA_VALIDA}", orden="fecha DESC, id DESC", limite=max(k, 0))
+
+    def valor_total(self):
+        return self.conexion.execute("SELECT COALESCE(SUM(cantidad * precio), 0) FROM productos").fetchone()[0]
+
+    def total_unidades(self):
+        return self.conexion.execute("SELECT COALESCE(SUM(cantidad), 0) FROM productos").fetchone()[0]
+
+    def estadisticas_precio(self):
+        minimo, maximo, promedio = self.conexion.execute(
+            "SELECT MIN(precio), MAX(precio), AVG(precio) FROM productos").fetchone()
+        if minimo is None:
+            return None
+        return {"minimo": minimo, "maximo": maximo, "promedio": promedio}
+
+
+def migrar_desde_json(ruta_json, ruta_db):
+    """
+    🚚 Copia todos los productos de un Inventario.json a una base SQLite
+    leyendo el JSON por partes y confirmando todo en una sola transacción.
+    Devuelve cuántos productos se migraron.
+    """
+    almacen = AlmacenSQLite(ruta_db)
+    with open(ruta_json, "r") as f:
+        filas = ((pid, d["nombre"], d["nombre"].lower(), d["cantidad"], d["precio"], d.get("fecha"))
+                 for pid, d in leer_entradas_json(f))
+        with almacen.conexion:
+            almacen.conexion.executemany(INSERTAR, filas)
+    total = len(almacen)
+    almacen.cerrar()
+    return total
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python almacen_sqlite.py <Inventario.json> <inventario.db>")
+        sys.exit(1)
+    try:
+        migrados = migrar_desde_json(sys.argv[1], sys.argv[2])
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❗ No se pudo migrar el inventario: {e}")
+        sys.exit(1)
+    print(f"✅ {migrados} productos migrados a {sys.argv[2]}")
@@ -0,0 +1,65 @@
+# ⏱️ Benchmark de buscar_por_nombre: recorrido lineal vs índice de trigramas
+# Uso: python benchmark_busqueda.py [tamaño ...]   (por defecto 10000 100000 1000000)
+import os
+import random
+import sys
+import tempfile
+import time
+
+from Gestor_Inventario import Inventario, Producto
+
+PALABRAS = ["Aguacate", "Manzana", "Leche", "Arroz", "Azúcar", "Café", "Galletas", "Atún",
+            "Aceite", "Harina", "Queso", "Yogur", "Pan", "Jabón", "Detergente", "Agua"]
+MARCAS = ["Vivant", "Monterrey", "Nestlé", "La Favorita", "Toni", "Real", "Supermaxi", "Gustadina"]
+MEDIDAS = ["250g", "500g", "1kg", "2kg", "1L", "2L", "6 uds"]
+
+CONSULTAS = ["a", "le", "leche", "vivant 1l", "favorita", "café real", "#4242", "no existe"]
+
+
+def generar_productos(n, semilla=2525):
+    """🏭 Crea n productos sintéticos con nombres repetitivos, como un catálogo real."""
+    azar = random.Random(semilla)
+    productos = {}
+    for i in range(n):
+        nombre = f"{azar.choice(PALABRAS)} {azar.choice(MARCAS)} {azar.choice(MEDIDAS)} #{i}"
+        pid = str(i)
+        productos[pid] = Producto(pid, nombre, azar.randint(0, 100), round(azar.uniform(0.5, 20), 2),
+                                  "2025-08-31 10:30:00")
+    return productos
+
+
+def busqueda_lineal(inventario, nombre):
+    # 🐢 Implementación original: baja a minúsculas cada nombre en cada consulta
+    return [p for p in inventario.productos.values() if nombre.lower() in p.nombre.lower()]
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) / repeticiones, resultado
+
+
+def main():
+    tamaños = [int(x) for x in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    with tempfile.TemporaryDirectory() as carpeta:
+        for n in tamaños:
+            inventario = Inventario(os.path.join(carpeta, "no_existe.json"))
+            inventario.productos = generar_productos(n)
+            inicio = time.perf_counter()
+            inventario.reconstruir_indices()
+            construccion = time.perf_counter() - inicio
+
+            print(f"\n📦 {n:,} productos (índice construido en {construccion:.2f} s)")
+            print(f"{'consulta':<14}{'resultados':>12}{'lineal ms':>12}{'índice ms':>12}{'x':>8}")
+            repeticiones = max(1, 200_000 // n)
+            for consulta in CONSULTAS:
+                t_lineal, esperado = medir(lambda: busqueda_lineal(inventario, consulta), repeticiones)
+                t_indice, obtenido = medir(lambda: inventario.buscar_por_nombre(consulta), repeticiones)
+                assert obtenido == esperado, f"Resultados distintos para {consulta!r}"
+                print(f"{consulta!r:<14}{len(obtenido):>12,}{t_lineal * 1000:>12.3f}{t_indice * 1000:>12.3f}"
+                      f"{t_lineal / t_indice:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# ⏱️ Benchmark de carga: tiempo de arranque y pico de memoria (RSS) de cada forma de cargar el inventario
+# (Inventario.json o su instantánea binaria, con el tamaño de cada archivo)
+# Uso: python benchmark_carga.py [tamaño ...]   (por defecto 100000 1000000)
+# Cada medición corre en un proceso nuevo para que el pico de memoria no se mezcle entre modos.
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from Gestor_Inventario import convertir_a_binario
+
+MODOS = ["original", "predeterminado", "streaming", "diferido", "columnar", "binario", "binario-columnar"]
+
+
+def generar_archivo(ruta, n, semilla=2525):
+    """🏭 Escribe un Inventario.json sintético con el mismo formato (indent=4) que guardar_inventario."""
+    azar = random.Random(semilla)
+    datos = {}
+    for i in range(n):
+        pid = f"{i:07d}"
+        datos[pid] = {"id": pid, "nombre": f"Producto {azar.randint(1, 50_000)} {azar.choice('ABCDEFG')}",
+                      "cantidad": azar.randint(0, 100), "precio": round(azar.uniform(0.5, 20), 2),
+                      "fecha": "2025-08-31 10:30:00"}
+    with open(ruta, "w") as f:
+        json.dump(datos, f, indent=4)
+
+
+def pico_rss_kb():
+    # En Linux se lee VmHWM (pico de RSS) de /proc; si no existe, ru_maxrss (KB en Linux, bytes en macOS)
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+
+def medir(modo, ruta):
+    """🔬 Se ejecuta en el proceso hijo: carga el archivo con el modo indicado y reporta tiempo y memoria."""
+    from Gestor_Inventario import Inventario, Producto
+    base = pico_rss_kb()
+    inicio = time.perf_counter()
+    if modo == "original":
+        # 🐢 Cargador anterior: json.load de todo el documento y un Producto por entrada
+        with open(ruta, "r") as f:
+            data = json.load(f)
+            productos = {pid: Producto.from_dict(prod) for pid, prod in data.items()}
+        total = len(productos)
+    else:
+        if modo.startswith("binario"):
+            almacen = "columnar" if modo == "binario-columnar" else "diccionario"
+        else:
+            almacen = "diccionario" if modo in ("predeterminado", "streaming") else modo
+        # "predeterminado" es Inventario(ruta) tal cual (json.load); "streaming" fuerza la lectura por partes
+        inventario = Inventario(ruta, almacen=almacen, leer_por_partes=True if modo == "streaming" else None)
+        total = len(inventario.productos)
+    segundos = time.perf_counter() - inicio
+    print(json.dumps({"modo": modo, "productos": total, "segundos": segundos,
+                      "pico_mb": (pico_rss_kb() - base) / 1024}))
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--medir":
+        medir(sys.argv[2], sys.argv[3])
+        return
+
+    tamaños = [int(x) for x in sys.argv[1:]] or [100_000, 1_000_000]
+    with tempfile.TemporaryDirectory() as carpeta:
+        for n in tamaños:
+            ruta = os.path.join(carpeta, f"inventario_{n}.json")
+            ruta_bin = os.path.join(carpeta, f"inventario_{n}.bin")
+            generar_archivo(ruta, n)
+            convertir_a_binario(ruta, ruta_bin)
+            print(f"\n📦 {n:,} productos — JSON de {os.path.getsize(ruta) / 2**20:.1f} MB, "
+                  f"binario de {os.path.getsize(ruta_bin) / 2**20:.1f} MB")
+            print(f"{'modo':<18}{'arranque s':>12}{'pico RSS MB':>14}")
+            for modo in MODOS:
+                archivo = ruta_bin if modo.startswith("binario") else ruta
+                salida = subprocess.run([sys.executable, __file__, "--medir", modo, archivo],
+                                        capture_output=True, text=True, check=True,
+                                        cwd=os.path.dirname(os.path.abspath(__file__)))
+                r = json.loads(salida.stdout.strip().splitlines()[-1])
+                print(f"{modo:<18}{r['segundos']:>12.2f}{r['pico_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
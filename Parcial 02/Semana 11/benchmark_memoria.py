@@ -0,0 +1,89 @@
+# 🧮 Benchmark de memoria: bytes por producto y tiempo de carga del Producto anterior (con __dict__ y
+# fecha en texto) frente al Producto actual (__slots__, fecha en segundos epoch, nombres internados)
+# Uso: python benchmark_memoria.py [tamaño ...]   (por defecto 1000000)
+# La memoria se mide con tracemalloc (solo lo que queda vivo tras cargar); el tiempo, en otra
+# pasada sin tracemalloc porque este hace todo varias veces más lento.
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from Gestor_Inventario import Producto, leer_entradas_json
+
+
+class ProductoAnterior:
+    """📦 Copia del Producto anterior: atributos en __dict__ y la fecha como texto."""
+    def __init__(self, id_producto, nombre, cantidad, precio, fecha=None):
+        self.id = id_producto
+        self.nombre = nombre
+        self.cantidad = cantidad
+        self.precio = precio
+        self.fecha = fecha or time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def generar_archivo(ruta, n, semilla=2525):
+    """🏭 Inventario.json sintético: nombres que se repiten y fechas repartidas en un año."""
+    azar = random.Random(semilla)
+    inicio = int(time.mktime((2025, 1, 1, 0, 0, 0, 0, 0, -1)))
+    datos = {}
+    for i in range(n):
+        pid = f"{i:07d}"
+        fecha = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(inicio + azar.randrange(365 * 86400)))
+        datos[pid] = {"id": pid, "nombre": f"Producto {azar.randint(1, 50_000)} {azar.choice('ABCDEFG')}",
+                      "cantidad": azar.randint(0, 100), "precio": round(azar.uniform(0.5, 20), 2),
+                      "fecha": fecha}
+    with open(ruta, "w") as f:
+        json.dump(datos, f, indent=4)
+
+
+def cargar(clase, ruta):
+    """📥 Carga el archivo como lo hace Inventario: JSON por partes y un objeto por entrada."""
+    with open(ruta, "r") as f:
+        return {pid: clase(pid, d["nombre"], d["cantidad"], d["precio"], d.get("fecha"))
+                for pid, d in leer_entradas_json(f)}
+
+
+def medir(clase, ruta):
+    gc.collect()
+    inicio = time.perf_counter()
+    productos = cargar(clase, ruta)
+    segundos = time.perf_counter() - inicio
+    n = len(productos)
+    del productos
+    gc.collect()
+
+    tracemalloc.start()
+    productos = cargar(clase, ruta)
+    gc.collect()
+    vivos = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del productos
+    return segundos, vivos / n
+
+
+def main():
+    tamaños = [int(x) for x in sys.argv[1:]] or [1_000_000]
+    with tempfile.TemporaryDirectory() as carpeta:
+        for n in tamaños:
+            ruta = os.path.join(carpeta, f"inventario_{n}.json")
+            generar_archivo(ruta, n)
+            print(f"\n📦 {n:,} productos (JSON de {os.path.getsize(ruta) / 2**20:.1f} MB)")
+            print(f"{'producto':<12}{'carga s':>10}{'bytes/producto':>16}{'total MB':>10}")
+            resultados = {}
+            for nombre, clase in (("anterior", ProductoAnterior), ("slots", Producto)):
+                segundos, por_producto = resultados[nombre] = medir(clase, ruta)
+                print(f"{nombre:<12}{segundos:>10.2f}{por_producto:>16.0f}{por_producto * n / 2**20:>10.1f}")
+            ahorro = 1 - resultados["slots"][1] / resultados["anterior"][1]
+            memoria = "menos" if ahorro >= 0 else "más"
+            # ⏱️ El precio del ahorro: convertir cada fecha a segundos e internar el nombre hace más lenta la carga
+            proporcion = resultados["slots"][0] / resultados["anterior"][0]
+            carga = f"{proporcion:.2f}× más lenta" if proporcion >= 1 else f"{1 / proporcion:.2f}× más rápida"
+            print(f"💡 {abs(ahorro):.0%} {memoria} memoria por producto; carga {carga}")
+
+
+if __name__ == "__main__":
+    main()
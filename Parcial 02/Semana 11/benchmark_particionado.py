@@ -0,0 +1,85 @@
+# ⏱️ Benchmark: Inventario de un solo archivo frente a InventarioParticionado (N archivos y N procesos)
+# Uso: python benchmark_particionado.py [tamaño] [particiones]   (por defecto 1000000 4)
+# Se mide el arranque, consultas puntuales, modificaciones (cada una guarda en disco),
+# búsqueda por nombre (la primera construye los índices), un listado por páginas y un total.
+# Las dos versiones devuelven los mismos productos pero no en el mismo orden: el particionado ordena
+# la búsqueda por id y lista partición por partición (un archivo usa el orden de inserción).
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmark_carga import generar_archivo
+from Gestor_Inventario import Inventario
+from inventario_particionado import InventarioParticionado, particionar
+
+CONSULTAS = 1_000
+MODIFICACIONES = 3
+BUSQUEDAS = 20
+
+
+def cronometrar(funcion, *args):
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+
+def medir(crear, n, semilla=2525):
+    """🔬 Tiempos (en segundos, o ms por operación en las puntuales) de una implementación."""
+    azar = random.Random(semilla)
+    ids = [f"{azar.randrange(n):07d}" for _ in range(CONSULTAS)]
+    resultados = {}
+
+    inicio = time.perf_counter()
+    inventario = crear()
+    resultados["arranque s"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for pid in ids:
+        inventario.obtener_producto(pid)
+    resultados["obtener ms"] = (time.perf_counter() - inicio) / CONSULTAS * 1000
+
+    inicio = time.perf_counter()
+    for pid in ids[:MODIFICACIONES]:
+        inventario.modificar_producto(pid, nueva_cantidad=7)
+    resultados["modificar ms"] = (time.perf_counter() - inicio) / MODIFICACIONES * 1000
+
+    resultados["1ª búsqueda s"] = cronometrar(inventario.buscar_por_nombre, "Producto 123")
+    inicio = time.perf_counter()
+    for _ in range(BUSQUEDAS):
+        inventario.buscar_por_nombre(f"Producto {azar.randint(1, 50_000)} ")
+    resultados["buscar ms"] = (time.perf_counter() - inicio) / BUSQUEDAS * 1000
+
+    resultados["listar ms"] = cronometrar(inventario.listar_productos, n // 2, 100) * 1000
+    resultados["valor total s"] = cronometrar(inventario.valor_total)
+
+    inicio = time.perf_counter()
+    inventario.cerrar()
+    resultados["cerrar s"] = time.perf_counter() - inicio
+    return resultados
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    particiones = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "inventario.json")
+        generar_archivo(ruta, n)
+        base = os.path.join(carpeta, "particionado.json")
+        repartidos = particionar(ruta, particiones, base)
+        print(f"\n📦 {n:,} productos — {particiones} particiones de {min(repartidos):,} a {max(repartidos):,} "
+              f"productos ({os.cpu_count()} CPU)")
+
+        un_archivo = medir(lambda: Inventario(ruta), n)
+        particionado = medir(lambda: InventarioParticionado(base, particiones), n)
+
+        print(f"{'medida':<16}{'un archivo':>14}{'particionado':>14}{'x':>8}")
+        for medida in un_archivo:
+            a, b = un_archivo[medida], particionado[medida]
+            print(f"{medida:<16}{a:>14.3f}{b:>14.3f}{a / b if b else 0:>8.1f}")
+        print("⚠️ Mismos productos, distinto orden: el particionado busca por id y lista partición por partición.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# 📈 Prueba de carga del servidor HTTP del inventario: rendimiento (peticiones/s) y latencia p50/p99
+# Uso: python carga_servidor.py [--puerto P] [--conexiones 32] [--peticiones 20000] [--productos 1000]
+# Sin --puerto levanta su propio servidor en localhost sobre un inventario temporal.
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Mezcla de operaciones: (tipo, peso)
+MEZCLA = [("obtener", 50), ("buscar", 20), ("listar", 10), ("actualizar", 20)]
+PALABRAS = ["Leche", "Arroz", "Café", "Queso", "Atún", "Aceite", "Harina", "Yogur"]
+
+
+class Conexion:
+    """🔌 Conexión HTTP/1.1 persistente: una petición a la vez, como un cliente real con keep-alive."""
+    def __init__(self, lector, escritor):
+        self.lector = lector
+        self.escritor = escritor
+
+    @classmethod
+    async def abrir(cls, host, puerto):
+        return cls(*await asyncio.open_connection(host, puerto))
+
+    async def pedir(self, metodo, ruta, datos=None):
+        cuerpo = b"" if datos is None else json.dumps(datos).encode()
+        self.escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\n"
+                            f"Content-Type: application/json\r\nContent-Length: {len(cuerpo)}\r\n\r\n".encode()
+                            + cuerpo)
+        await self.escritor.drain()
+        estado = int((await self.lector.readline()).split()[1])
+        largo = 0
+        while (linea := await self.lector.readline()) not in (b"\r\n", b""):
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            if nombre.lower() == "content-length":
+                largo = int(valor)
+        return estado, json.loads(await self.lector.readexactly(largo))
+
+    def cerrar(self):
+        self.escritor.close()
+
+
+def percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+async def sembrar(host, puerto, productos):
+    conexion = await Conexion.abrir(host, puerto)
+    azar = random.Random(2525)
+    for i in range(productos):
+        estado, _ = await conexion.pedir("POST", "/productos", {
+            "id": f"P{i}", "nombre": f"{azar.choice(PALABRAS)} {i}",
+            "cantidad": azar.randint(0, 100), "precio": round(azar.uniform(0.5, 20), 2)})
+        if estado not in (201, 409):   # 409: ya estaba de una corrida anterior
+            raise RuntimeError(f"No se pudo sembrar el inventario (HTTP {estado}).")
+    conexion.cerrar()
+
+
+async def cliente(host, puerto, cuantas, productos, semilla, latencias, errores):
+    azar = random.Random(semilla)
+    tipos, pesos = zip(*MEZCLA)
+    conexion = await Conexion.abrir(host, puerto)
+    for _ in range(cuantas):
+        tipo = azar.choices(tipos, pesos)[0]
+        pid = f"P{azar.randrange(productos)}"
+        if tipo == "obtener":
+            peticion = ("GET", f"/productos/{pid}", None)
+        elif tipo == "buscar":
+            peticion = ("GET", f"/buscar?nombre={azar.choice(PALABRAS)}%20{azar.randrange(100)}", None)
+        elif tipo == "listar":
+            peticion = ("GET", f"/productos?desde={azar.randrange(productos)}&limite=20", None)
+        else:
+            peticion = ("PATCH", f"/productos/{pid}", {"cantidad": azar.randint(0, 100)})
+        inicio = time.perf_counter()
+        estado, _ = await conexion.pedir(*peticion)
+        latencias[tipo].append(time.perf_counter() - inicio)
+        if estado >= 400:
+            errores.append((tipo, estado))
+    conexion.cerrar()
+
+
+async def medir(host, puerto, conexiones, peticiones, productos):
+    await sembrar(host, puerto, productos)
+    latencias = {tipo: [] for tipo, _ in MEZCLA}
+    errores = []
+    por_conexion = peticiones // conexiones
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(host, puerto, por_conexion, productos, i, latencias, errores)
+                           for i in range(conexiones)))
+    segundos = time.perf_counter() - inicio
+
+    total = sum(len(l) for l in latencias.values())
+    print(f"\n📈 {total:,} peticiones con {conexiones} conexiones en {segundos:.2f} s "
+          f"→ {total / segundos:,.0f} peticiones/s")
+    print(f"{'operación':<12}{'peticiones':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    todas = []
+    for tipo, valores in latencias.items():
+        valores.sort()
+        todas.extend(valores)
+        print(f"{tipo:<12}{len(valores):>12,}{percentil(valores, 50) * 1000:>10.2f}"
+              f"{percentil(valores, 99) * 1000:>10.2f}")
+    todas.sort()
+    print(f"{'total':<12}{len(todas):>12,}{percentil(todas, 50) * 1000:>10.2f}{percentil(todas, 99) * 1000:>10.2f}")
+    if errores:
+        print(f"⚠️ {len(errores)} respuestas con error, p. ej. {errores[:3]}")
+
+
+def main():
+    analizador = argparse.ArgumentParser(description="Prueba de carga del servidor de inventario.")
+    analizador.add_argument("--host", default="127.0.0.1")
+    analizador.add_argument("--puerto", type=int, help="servidor ya en marcha (si se omite, se lanza uno)")
+    analizador.add_argument("--conexiones", type=int, default=32)
+    analizador.add_argument("--peticiones", type=int, default=20_000)
+    analizador.add_argument("--productos", type=int, default=1_000)
+    args = analizador.parse_args()
+
+    if args.puerto is not None:
+        asyncio.run(medir(args.host, args.puerto, args.conexiones, args.peticiones, args.productos))
+        return
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        servidor = subprocess.Popen(
+            [sys.executable, "servidor_inventario.py", "--puerto", "0", "--host", args.host,
+             "--inventario", os.path.join(carpeta, "inventario.json")],
+            stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        try:
+            # La primera línea del servidor anuncia el puerto elegido
+            puerto = int(servidor.stdout.readline().split("http://")[1].split()[0].rsplit(":", 1)[1])
+            asyncio.run(medir(args.host, puerto, args.conexiones, args.peticiones, args.productos))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
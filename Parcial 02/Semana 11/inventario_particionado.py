@@ -0,0 +1,272 @@
+# 🧩 Inventario particionado: los productos se reparten por hash del id en N archivos, cada uno
+# atendido por su propio proceso (con su propio Inventario, índices y guardado)
+# Uso como módulo:
+#     inventario = InventarioParticionado("inventario.json", particiones=4)
+#     inventario.agregar_producto(Producto("A1", "Arroz", 10, 1.25))
+# Partir un Inventario.json existente:  python inventario_particionado.py Inventario.json 4
+#
+# Las operaciones sobre un producto van solo a la partición de su id; buscar, listar y los
+# totales se piden a todas las particiones a la vez y se juntan las respuestas.
+# ⚠️ No hay un orden de inserción global entre particiones: buscar_por_nombre devuelve los productos
+# ordenados por id (Inventario los devuelve en orden de inserción) y listar_productos recorre partición
+# por partición. Los productos son los mismos, pero quien dependa del orden debe ordenarlos.
+import atexit
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import zlib
+
+# Módulos compartidos entre semanas (carpeta Parcial 02/comun)
+_PARCIAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARCIAL not in sys.path:
+    sys.path.insert(0, _PARCIAL)
+from comun.json_por_partes import leer_entradas_json
+from producto import Producto
+
+# Métodos de Inventario que se pueden pedir a un trabajador
+METODOS = {"agregar_producto", "quitar_producto", "modificar_producto", "ajustar_cantidad", "obtener_producto",
+           "listar_productos", "buscar_por_nombre", "buscar_por_precio", "buscar_por_cantidad",
+           "valor_total", "total_unidades", "estadisticas_precio", "flush"}
+
+
+def particion_de(id_producto, particiones):
+    """🔢 Partición de un id: crc32 es estable entre procesos y ejecuciones (hash() de str no lo es)."""
+    return zlib.crc32(id_producto.encode("utf-8", "surrogatepass")) % particiones
+
+
+def ruta_particion(archivo, indice):
+    raiz, extension = os.path.splitext(archivo)
+    return f"{raiz}.{indice:02d}{extension or '.json'}"
+
+
+def _a_diccionarios(valor):
+    # Los productos viajan entre procesos como diccionarios (las vistas de columnar/mmap/sqlite no se pueden enviar)
+    if isinstance(valor, Producto):
+        return valor.to_dict()
+    if isinstance(valor, list):
+        return [p.to_dict() if isinstance(p, Producto) else p for p in valor]
+    return valor
+
+
+def _trabajador(conexion, archivo, opciones):
+    """👷 Proceso de una partición: atiende pedidos (método, argumentos) hasta recibir None."""
+    from Gestor_Inventario import Inventario
+    inventario = Inventario(archivo, **opciones)
+    conexion.send(("ok", len(inventario.productos)))   # Avisa que terminó de cargar
+    while True:
+        pedido = conexion.recv()
+        if pedido is None:
+            break
+        metodo, argumentos = pedido
+        try:
+            if metodo == "agregar_varios":
+                # 📦 Carga masiva: todos los productos de la partición en una sola escritura
+                agregados = 0
+                with inventario.lote():
+                    for datos in argumentos[0]:
+                        agregados += inventario.agregar_producto(Producto.from_dict(datos))
+                resultado = agregados
+            elif metodo == "contar":
+                resultado = len(inventario.productos)
+            elif metodo in METODOS:
+                resultado = _a_diccionarios(getattr(inventario, metodo)(*argumentos))
+            else:
+                raise ValueError(f"Operación desconocida: {metodo}")
+            conexion.send(("ok", resultado))
+        except Exception as e:
+            conexion.send(("error", f"{type(e).__name__}: {e}"))
+    inventario.cerrar()
+    conexion.send(("ok", None))
+    conexion.close()
+
+
+class InventarioParticionado:
+    """
+    🧩 Fachada con la misma interfaz silenciosa de Inventario (agregar_producto, obtener_producto...)
+    sobre N particiones. Los productos se devuelven como diccionarios, igual que listar_productos.
+    `opciones` se pasa tal cual al Inventario de cada partición (usar_bitacora, intervalo_ms, almacen...).
+    """
+    def __init__(self, archivo_json="inventario.json", particiones=4, **opciones):
+        self.archivo_json = archivo_json
+        self.particiones = particiones
+        self._conexiones = []
+        self._procesos = []
+        self._candados = [threading.Lock() for _ in range(particiones)]   # Un pedido a la vez por tubería
+        for i in range(particiones):
+            propia, del_trabajador = multiprocessing.Pipe()
+            proceso = multiprocessing.Process(target=_trabajador, daemon=True,
+                                              args=(del_trabajador, ruta_particion(archivo_json, i), opciones))
+            proceso.start()
+            del_trabajador.close()
+            self._conexiones.append(propia)
+            self._procesos.append(proceso)
+        # ⏳ Las particiones cargan sus archivos en paralelo; aquí solo se espera a que todas terminen
+        for conexion in self._conexiones:
+            self._respuesta(conexion)
+        atexit.register(self.cerrar)
+
+    @staticmethod
+    def _respuesta(conexion):
+        estado, resultado = conexion.recv()
+        if estado == "error":
+            raise RuntimeError(f"Error en la partición: {resultado}")
+        return resultado
+
+    def _pedir(self, indice, metodo, *argumentos):
+        # 🎯 Operación sobre una sola partición
+        with self._candados[indice]:
+            self._conexiones[indice].send((metodo, argumentos))
+            return self._respuesta(self._conexiones[indice])
+
+    def _pedir_a_todas(self, metodo, *argumentos, por_particion=None):
+        """
+        📡 Envía el pedido a todas las particiones antes de esperar respuesta, así trabajan en paralelo.
+        `por_particion` (opcional) da argumentos distintos a cada una: {índice: argumentos}.
+        Devuelve {índice: resultado}.
+        """
+        indices = range(self.particiones) if por_particion is None else sorted(por_particion)
+        for i in indices:   # Siempre en el mismo orden: dos hilos no se bloquean mutuamente
+            self._candados[i].acquire()
+        try:
+            for i in indices:
+                self._conexiones[i].send((metodo, argumentos if por_particion is None else por_particion[i]))
+            # Se leen todas las respuestas antes de revisar errores: ninguna tubería queda con una respuesta vieja
+            respuestas = {i: self._conexiones[i].recv() for i in indices}
+        finally:
+            for i in indices:
+                self._candados[i].release()
+        for estado, resultado in respuestas.values():
+            if estado == "error":
+                raise RuntimeError(f"Error en la partición: {resultado}")
+        return {i: resultado for i, (_, resultado) in respuestas.items()}
+
+    def _particion(self, id_producto):
+        return particion_de(id_producto, self.particiones)
+
+    # 🎯 Operaciones sobre un producto: van solo a su partición
+    def agregar_producto(self, producto):
+        return self._pedir(self._particion(producto.id), "agregar_producto", producto)
+
+    def quitar_producto(self, id_producto):
+        return self._pedir(self._particion(id_producto), "quitar_producto", id_producto)
+
+    def modificar_producto(self, id_producto, nuevo_nombre=None, nueva_cantidad=None, nuevo_precio=None):
+        return self._pedir(self._particion(id_producto), "modificar_producto",
+                           id_producto, nuevo_nombre, nueva_cantidad, nuevo_precio)
+
+    def ajustar_cantidad(self, id_producto, delta):
+        return self._pedir(self._particion(id_producto), "ajustar_cantidad", id_producto, delta)
+
+    def obtener_producto(self, id_producto):
+        return self._pedir(self._particion(id_producto), "obtener_producto", id_producto)
+
+    def agregar_varios(self, productos):
+        """📦 Agrega muchos productos: un solo pedido (y una sola escritura) por partición. Devuelve cuántos entraron."""
+        grupos = {}
+        for producto in productos:
+            grupos.setdefault(self._particion(producto.id), []).append(producto.to_dict())
+        if not grupos:
+            return 0
+        resultados = self._pedir_a_todas("agregar_varios", por_particion={i: (g,) for i, g in grupos.items()})
+        return sum(resultados.values())
+
+    # 📡 Consultas sobre todo el inventario: se reparten y se juntan
+    def __len__(self):
+        return sum(self._pedir_a_todas("contar").values())
+
+    def buscar_por_nombre(self, nombre):
+        """🔎 Productos cuyo nombre contiene el texto, ordenados por id (no en orden de inserción como Inventario)."""
+        resultados = self._pedir_a_todas("buscar_por_nombre", nombre)
+        return sorted((p for lista in resultados.values() for p in lista), key=lambda p: p["id"])
+
+    def buscar_por_precio(self, minimo=None, maximo=None):
+        resultados = self._pedir_a_todas("buscar_por_precio", minimo, maximo)
+        return sorted((p for lista in resultados.values() for p in lista), key=lambda p: (p["precio"], p["id"]))
+
+    def buscar_por_cantidad(self, minimo=None, maximo=None):
+        resultados = self._pedir_a_todas("buscar_por_cantidad", minimo, maximo)
+        return sorted((p for lista in resultados.values() for p in lista), key=lambda p: (p["cantidad"], p["id"]))
+
+    def listar_productos(self, desde=0, limite=None):
+        """
+        📋 Una página de productos: partición por partición y, dentro de cada una, en orden de inserción.
+        Primero se pregunta cuántos tiene cada partición; después solo se piden las que cubren la página.
+        """
+        tamaños = self._pedir_a_todas("contar")
+        fin = None if limite is None else desde + limite
+        pedidos, inicio = {}, 0
+        for i in range(self.particiones):
+            local_desde, local_fin = max(desde - inicio, 0), tamaños[i] if fin is None else min(fin - inicio, tamaños[i])
+            if local_fin > local_desde:
+                pedidos[i] = (local_desde, local_fin - local_desde)
+            inicio += tamaños[i]
+        if not pedidos:
+            return []
+        paginas = self._pedir_a_todas("listar_productos", por_particion=pedidos)
+        return [p for i in sorted(paginas) for p in paginas[i]]
+
+    def valor_total(self):
+        return sum(self._pedir_a_todas("valor_total").values())
+
+    def total_unidades(self):
+        return sum(self._pedir_a_todas("total_unidades").values())
+
+    def estadisticas_precio(self):
+        tamaños = self._pedir_a_todas("contar")
+        parciales = {i: e for i, e in self._pedir_a_todas("estadisticas_precio").items() if e is not None}
+        if not parciales:
+            return None
+        total = sum(tamaños[i] for i in parciales)
+        return {"minimo": min(e["minimo"] for e in parciales.values()),
+                "maximo": max(e["maximo"] for e in parciales.values()),
+                "promedio": sum(e["promedio"] * tamaños[i] for i, e in parciales.items()) / total}
+
+    def flush(self):
+        return all(self._pedir_a_todas("flush").values())
+
+    def cerrar(self):
+        """🔒 Cada partición guarda lo pendiente y su proceso termina."""
+        if not self._procesos:
+            return
+        for i, conexion in enumerate(self._conexiones):
+            with self._candados[i]:
+                conexion.send(None)
+                self._respuesta(conexion)
+                conexion.close()
+        for proceso in self._procesos:
+            proceso.join()
+        self._conexiones, self._procesos = [], []
+
+
+def particionar(archivo_json, particiones, destino=None):
+    """
+    ✂️ Reparte un Inventario.json en N archivos de partición (leyéndolo por partes).
+    Devuelve cuántos productos quedaron en cada una.
+    """
+    destino = destino or archivo_json
+    archivos = [open(ruta_particion(destino, i), "w") for i in range(particiones)]
+    cuantos = [0] * particiones
+    try:
+        for f in archivos:
+            f.write("{")
+        with open(archivo_json, "r") as origen:
+            for pid, datos in leer_entradas_json(origen):
+                i = particion_de(pid, particiones)
+                archivos[i].write(f'{"," if cuantos[i] else ""}\n    {json.dumps(pid)}: {json.dumps(datos)}')
+                cuantos[i] += 1
+        for f in archivos:
+            f.write("\n}")
+    finally:
+        for f in archivos:
+            f.close()
+    return cuantos
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python inventario_particionado.py Inventario.json N")
+        sys.exit(1)
+    repartidos = particionar(sys.argv[1], int(sys.argv[2]))
+    print(f"✅ {sum(repartidos)} productos repartidos en {len(repartidos)} particiones: {repartidos}")
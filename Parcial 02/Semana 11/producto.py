@@ -0,0 +1,102 @@
+# 🎯 Producto del inventario y sus fechas (segundos epoch en memoria, texto al mostrar)
+# Está en su propio módulo para que Gestor_Inventario y los almacenes (columnar, mmap, sqlite) usen
+# la misma clase: si Gestor_Inventario.py corre como programa y un almacén lo importara, habría
+# dos clases Producto distintas y dos copias del estado del módulo.
+import sys            # 🔤 sys.intern para compartir los nombres repetidos
+import time           # 🕒 Para guardar las fechas como segundos (epoch) y mostrarlas en hora local
+
+# 🕒 Fechas: en memoria son segundos epoch (un int); el texto "AAAA-MM-DD HH:MM:SS" solo se arma al mostrar
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+_INICIO_HORA = {}   # "AAAA-MM-DD HH" -> epoch del inicio de esa hora (hora local)
+_SESENTA = {f"{i:02d}": i for i in range(60)}   # "00".."59" -> int: valida y convierte en una sola búsqueda
+
+
+def marca_actual():
+    return int(time.time())
+
+
+def marca_de_fecha(fecha):
+    """
+    Convierte "AAAA-MM-DD HH:MM:SS" (hora local) en segundos epoch.
+    Solo la primera fecha de cada hora pasa por strptime; las demás suman minutos y segundos.
+    Un texto con otro formato se conserva tal cual; un int ya es una marca.
+    """
+    if fecha is None or isinstance(fecha, int):
+        return fecha
+    minutos, segundos = _SESENTA.get(fecha[14:16]), _SESENTA.get(fecha[17:19])
+    if minutos is None or segundos is None or len(fecha) != 19 or fecha[13] != ":" or fecha[16] != ":":
+        return fecha
+    hora = fecha[:13]
+    inicio = _INICIO_HORA.get(hora)
+    if inicio is None:
+        try:
+            inicio = int(time.mktime(time.strptime(hora, "%Y-%m-%d %H")))
+        except (ValueError, OverflowError):
+            return fecha
+        if time.strftime("%Y-%m-%d %H", time.localtime(inicio)) != hora:
+            return fecha   # Hora que no existe o se repite por el cambio de horario: se guarda el texto
+        if len(_INICIO_HORA) > 100_000:
+            _INICIO_HORA.clear()
+        _INICIO_HORA[hora] = inicio
+    return inicio + minutos * 60 + segundos
+
+
+def marca_de_consulta(valor):
+    """Límite de una consulta por fecha: texto "AAAA-MM-DD HH:MM:SS", segundos epoch o None."""
+    marca = marca_de_fecha(valor)
+    if marca is not None and not isinstance(marca, int):
+        raise ValueError(f"Fecha inválida: {valor!r} (formato AAAA-MM-DD HH:MM:SS).")
+    return marca
+
+
+def texto_de_marca(marca):
+    """Segundos epoch -> "AAAA-MM-DD HH:MM:SS" en hora local (un texto guardado tal cual se devuelve igual)."""
+    if isinstance(marca, int):
+        return time.strftime(FORMATO_FECHA, time.localtime(marca))
+    return marca
+
+
+# 🎯 Clase Producto: representa un producto individual del inventario
+class Producto:
+    # 🪶 Sin __dict__ por instancia: en catálogos de millones de productos cada byte cuenta
+    __slots__ = ("id", "nombre", "cantidad", "precio", "marca")
+
+    def __init__(self, id_producto, nombre, cantidad, precio, fecha=None):
+        self.id = id_producto
+        # 🔤 Los nombres repetidos comparten un solo objeto str; sys.intern solo acepta str exactos,
+        # así que otro valor (p. ej. un nombre numérico en el JSON) se guarda tal cual
+        self.nombre = sys.intern(nombre) if type(nombre) is str else nombre
+        self.cantidad = cantidad
+        self.precio = precio
+        self.fecha = fecha or marca_actual()
+
+    @property
+    def fecha(self):
+        return texto_de_marca(self.marca)
+
+    @fecha.setter
+    def fecha(self, valor):
+        # Acepta el texto de siempre o directamente los segundos epoch
+        self.marca = marca_de_fecha(valor)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "nombre": self.nombre,
+            "cantidad": self.cantidad,
+            "precio": self.precio,
+            "fecha": self.fecha
+        }
+
+    @staticmethod
+    def from_dict(data):
+        return Producto(
+            data['id'],
+            data['nombre'],
+            data['cantidad'],
+            data['precio'],
+            data.get('fecha')
+        )
+
+    def __str__(self):
+        return f"🆔 {self.id} | 🛒 {self.nombre} | 📦 {self.cantidad} uds | 💲${self.precio:.2f} | 📅 {self.fecha}"
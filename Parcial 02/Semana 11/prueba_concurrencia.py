@@ -0,0 +1,87 @@
+# 🔨 Prueba de estrés: varios procesos, cada uno con varios hilos, sumando stock al mismo producto
+# Uso: python prueba_concurrencia.py [procesos] [hilos] [operaciones por hilo]   (por defecto 4 4 50)
+# Si no se pierde ninguna actualización, la cantidad final es procesos × hilos × operaciones.
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from Gestor_Inventario import Inventario, Producto
+
+MODOS = {
+    "json": {},
+    "bitácora": {"usar_bitacora": True},
+}
+
+
+def trabajador(ruta, opciones, hilos, operaciones, concurrente):
+    """🧵 Proceso hijo: comparte un Inventario entre sus hilos; uno de ellos solo consulta."""
+    inventario = Inventario(ruta, concurrente=concurrente, **opciones)
+    terminado = threading.Event()
+
+    def sumar():
+        for _ in range(operaciones):
+            inventario.ajustar_cantidad("X", 1)
+
+    def consultar():
+        # 🔎 Lecturas en paralelo con las escrituras: no deben fallar ni ver índices a medias
+        while not terminado.is_set():
+            assert len(inventario.buscar_por_nombre("contador")) == 1
+            inventario.valor_total()
+
+    lector = threading.Thread(target=consultar)
+    lector.start()
+    escritores = [threading.Thread(target=sumar) for _ in range(hilos)]
+    for hilo in escritores:
+        hilo.start()
+    for hilo in escritores:
+        hilo.join()
+    terminado.set()
+    lector.join()
+    inventario.cerrar()
+
+
+def ejecutar(carpeta, modo, procesos, hilos, operaciones, concurrente):
+    ruta = os.path.join(carpeta, f"{modo}_{'con' if concurrente else 'sin'}_bloqueo.json")
+    inicial = Inventario(ruta, **MODOS[modo])
+    inicial.productos["X"] = Producto("X", "Producto contador", 0, 1.0)
+    inicial.guardar_inventario()
+
+    inicio = time.perf_counter()
+    hijos = [multiprocessing.Process(target=trabajador,
+                                     args=(ruta, MODOS[modo], hilos, operaciones, concurrente))
+             for _ in range(procesos)]
+    for hijo in hijos:
+        hijo.start()
+    for hijo in hijos:
+        hijo.join()
+    segundos = time.perf_counter() - inicio
+    if any(hijo.exitcode for hijo in hijos):
+        raise SystemExit(f"❗ Un proceso de la prueba {modo} terminó con error.")
+
+    final = Inventario(ruta, **MODOS[modo]).productos["X"].cantidad
+    return final, segundos
+
+
+def main():
+    procesos, hilos, operaciones = ([int(x) for x in sys.argv[1:4]] + [4, 4, 50][len(sys.argv[1:4]):])
+    esperado = procesos * hilos * operaciones
+    print(f"🔨 {procesos} procesos × {hilos} hilos × {operaciones} operaciones = {esperado} sumas")
+    print(f"{'modo':<12}{'bloqueo':<10}{'cantidad final':>16}{'perdidas':>10}{'segundos':>10}")
+    fallo = False
+    with tempfile.TemporaryDirectory() as carpeta:
+        for modo in MODOS:
+            for concurrente in (False, True):
+                final, segundos = ejecutar(carpeta, modo, procesos, hilos, operaciones, concurrente)
+                print(f"{modo:<12}{'sí' if concurrente else 'no':<10}{final:>16}{esperado - final:>10}"
+                      f"{segundos:>10.2f}")
+                fallo |= concurrente and final != esperado
+    if fallo:
+        raise SystemExit("❌ Se perdieron actualizaciones en modo concurrente.")
+    print("✅ Modo concurrente: ninguna actualización perdida.")
+
+
+if __name__ == "__main__":
+    main()
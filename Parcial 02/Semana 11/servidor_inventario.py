@@ -0,0 +1,286 @@
+# 🌐 Servicio HTTP/JSON (solo biblioteca estándar, asyncio) sobre un Inventario compartido en memoria
+# Uso: python servidor_inventario.py [--inventario inventario.json] [--host 127.0.0.1] [--puerto 8080]
+#
+#   GET    /productos?desde=0&limite=100   📋 Listado por páginas
+#   GET    /productos/<id>                 🆔 Un producto
+#   GET    /buscar?nombre=leche            🔎 Búsqueda por nombre
+#   POST   /productos                      ➕ {"id", "nombre", "cantidad", "precio"}
+#   PATCH  /productos/<id>                 ✏️ {"nombre"?, "cantidad"?, "precio"?}  (también PUT)
+#   DELETE /productos/<id>                 🗑️ Elimina
+#   POST   /transacciones                  🧾 {"cambios": [{"id", "delta"?, "precio"?}, ...]}  (todo o nada)
+#   GET    /eventos?desde=0&limite=100     📣 Flujo de cambios desde un offset (con --eventos)
+#
+# Cada operación sobre el Inventario corre en un hilo del pool (los candados de Inventario
+# permiten consultas en paralelo) y el guardado a disco lo hace su hilo de guardado diferido,
+# así el bucle de eventos nunca espera a json.dump.
+# ⏳ Excepción: POST /transacciones responde después de guardar con fsync (todo o nada también en
+# disco), así que su latencia incluye la escritura y la sincronización. Corre en el pool, así que
+# no frena al bucle, pero ocupa un hilo mientras espera al disco.
+import argparse
+import asyncio
+import json
+import math
+import signal
+import sys
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from Gestor_Inventario import Inventario, Producto, SnapshotInvalido
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+def _numero(datos, campo, tipo, obligatorio):
+    if campo not in datos:
+        if obligatorio:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, f"Falta el campo '{campo}'.")
+        return None
+    valor = datos[campo]
+    error = ErrorHTTP(HTTPStatus.BAD_REQUEST, f"'{campo}' debe ser un número finito no negativo"
+                                              f"{' entero' if tipo is int else ''}.")
+    # bool es subclase de int: no se acepta true/false como cantidad; NaN e infinito (1e999) tampoco valen
+    if (isinstance(valor, bool) or not isinstance(valor, (int, float) if tipo is float else int)
+            or (isinstance(valor, float) and not math.isfinite(valor)) or valor < 0):
+        raise error
+    try:
+        return tipo(valor)
+    except OverflowError:   # Un entero enorme (10**400) no cabe en un float
+        raise error from None
+
+
+def _texto(datos, campo, obligatorio):
+    if campo not in datos:
+        if obligatorio:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, f"Falta el campo '{campo}'.")
+        return None
+    valor = datos[campo]
+    if not isinstance(valor, str) or not valor.strip():
+        raise ErrorHTTP(HTTPStatus.BAD_REQUEST, f"'{campo}' debe ser un texto no vacío.")
+    return valor.strip()
+
+
+class ServidorInventario:
+    """
+    🌐 Traduce peticiones HTTP a llamadas de Inventario.
+    Las conexiones son persistentes (keep-alive) para que un cliente no pague
+    una conexión TCP nueva por cada petición.
+    """
+    def __init__(self, inventario, hilos=8):
+        self.inventario = inventario
+        self.pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="inventario")
+
+    async def _en_pool(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, funcion, *args)
+
+    # 🧭 Rutas
+    async def despachar(self, metodo, ruta, consulta, cuerpo):
+        partes = [unquote(p) for p in ruta.strip("/").split("/")]
+        if partes == ["productos"]:
+            if metodo == "GET":
+                return HTTPStatus.OK, await self._en_pool(self._listar, consulta)
+            if metodo == "POST":
+                return await self._en_pool(self._agregar, self._json(cuerpo))
+        elif len(partes) == 2 and partes[0] == "productos":
+            if metodo == "GET":
+                producto = await self._en_pool(self.inventario.obtener_producto, partes[1])
+                if producto is None:
+                    raise ErrorHTTP(HTTPStatus.NOT_FOUND, "Producto no encontrado.")
+                return HTTPStatus.OK, producto.to_dict()
+            if metodo in ("PATCH", "PUT"):
+                return HTTPStatus.OK, await self._en_pool(self._actualizar, partes[1], self._json(cuerpo))
+            if metodo == "DELETE":
+                if not await self._en_pool(self.inventario.quitar_producto, partes[1]):
+                    raise ErrorHTTP(HTTPStatus.NOT_FOUND, "Producto no encontrado.")
+                return HTTPStatus.OK, {"eliminado": partes[1]}
+        elif partes == ["transacciones"] and metodo == "POST":
+            return await self._en_pool(self._transaccion, self._json(cuerpo))
+        elif partes == ["eventos"] and metodo == "GET":
+            return HTTPStatus.OK, await self._en_pool(self._eventos, consulta)
+        elif partes == ["buscar"] and metodo == "GET":
+            nombre = consulta.get("nombre", [""])[0]
+            if not nombre:
+                raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Falta el parámetro 'nombre'.")
+            return HTTPStatus.OK, await self._en_pool(self._buscar, nombre)
+        else:
+            raise ErrorHTTP(HTTPStatus.NOT_FOUND, "Ruta no encontrada.")
+        raise ErrorHTTP(HTTPStatus.METHOD_NOT_ALLOWED, f"Método {metodo} no permitido en {ruta}.")
+
+    @staticmethod
+    def _json(cuerpo):
+        try:
+            datos = json.loads(cuerpo or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "El cuerpo no es JSON válido.")
+        if not isinstance(datos, dict):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Se esperaba un objeto JSON.")
+        return datos
+
+    # 🧵 Estas funciones corren en el pool de hilos
+    def _listar(self, consulta):
+        try:
+            desde = int(consulta.get("desde", ["0"])[0])
+            limite = int(consulta.get("limite", ["100"])[0])
+        except ValueError:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "'desde' y 'limite' deben ser enteros.")
+        if desde < 0 or limite < 0:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "'desde' y 'limite' no pueden ser negativos.")
+        return {"total": len(self.inventario.productos),
+                "productos": self.inventario.listar_productos(desde, limite)}
+
+    def _eventos(self, consulta):
+        if self.inventario.archivo_eventos is None:
+            raise ErrorHTTP(HTTPStatus.NOT_FOUND, "El servidor no registra eventos (inícielo con --eventos).")
+        try:
+            desde = int(consulta.get("desde", ["0"])[0])
+            limite = int(consulta.get("limite", ["100"])[0])
+        except ValueError:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "'desde' y 'limite' deben ser enteros.")
+        if desde < 0 or limite < 0:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "'desde' y 'limite' no pueden ser negativos.")
+        eventos = list(islice(self.inventario.leer_eventos(desde), limite))
+        # "siguiente" es el offset con el que el cliente pide la próxima página
+        return {"eventos": eventos, "siguiente": eventos[-1]["offset"] + 1 if eventos else desde}
+
+    def _buscar(self, nombre):
+        return [p.to_dict() for p in self.inventario.buscar_por_nombre(nombre)]
+
+    def _agregar(self, datos):
+        producto = Producto(_texto(datos, "id", True), _texto(datos, "nombre", True),
+                            _numero(datos, "cantidad", int, True), _numero(datos, "precio", float, True))
+        if not self.inventario.agregar_producto(producto):
+            raise ErrorHTTP(HTTPStatus.CONFLICT, f"Ya existe un producto con ID {producto.id}.")
+        return HTTPStatus.CREATED, producto.to_dict()
+
+    def _actualizar(self, id_producto, datos):
+        if not self.inventario.modificar_producto(id_producto, _texto(datos, "nombre", False),
+                                                  _numero(datos, "cantidad", int, False),
+                                                  _numero(datos, "precio", float, False)):
+            raise ErrorHTTP(HTTPStatus.NOT_FOUND, "Producto no encontrado.")
+        producto = self.inventario.obtener_producto(id_producto)
+        if producto is None:   # Otra petición lo eliminó justo después
+            raise ErrorHTTP(HTTPStatus.NOT_FOUND, "Producto no encontrado.")
+        return producto.to_dict()
+
+    def _transaccion(self, datos):
+        # ⏳ aplicar_transaccion guarda con fsync antes de volver: la respuesta espera al disco
+        cambios = datos.get("cambios")
+        if not isinstance(cambios, list):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "'cambios' debe ser una lista.")
+        resultado = self.inventario.aplicar_transaccion(cambios)
+        if not resultado["aplicada"]:
+            # 409: la transacción no es aplicable al estado actual (stock insuficiente, id inexistente...)
+            return HTTPStatus.CONFLICT, {"error": "Transacción rechazada; no se modificó ningún producto.",
+                                         "errores": [{"posicion": p, "motivo": m} for p, m in resultado["errores"]]}
+        productos = (self.inventario.obtener_producto(c["id"]) for c in cambios)
+        return HTTPStatus.OK, {"productos": list({p.id: p.to_dict() for p in productos if p is not None}.values())}
+
+    # 🔌 Protocolo HTTP/1.1 mínimo
+    async def atender(self, lector, escritor):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, destino, version = linea.decode("latin-1").split()
+                except ValueError:
+                    await self._responder(escritor, HTTPStatus.BAD_REQUEST, {"error": "Petición mal formada."}, False)
+                    break
+                cabeceras = {}
+                while (linea := await lector.readline()) not in (b"\r\n", b"\n", b""):
+                    nombre, _, valor = linea.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                try:
+                    largo = int(cabeceras.get("content-length", 0) or 0)
+                    if largo < 0:
+                        raise ValueError
+                except ValueError:
+                    # Sin un largo válido no se sabe dónde termina el cuerpo: se responde y se cierra
+                    await self._responder(escritor, HTTPStatus.BAD_REQUEST,
+                                          {"error": "Content-Length debe ser un entero no negativo."}, False)
+                    break
+                cuerpo = await lector.readexactly(largo)
+                conexion = cabeceras.get("connection", "").lower()
+                seguir = conexion == "keep-alive" or (version == "HTTP/1.1" and conexion != "close")
+
+                url = urlsplit(destino)
+                try:
+                    estado, datos = await self.despachar(metodo, url.path, parse_qs(url.query), cuerpo)
+                except ErrorHTTP as e:
+                    estado, datos = e.estado, {"error": e.mensaje}
+                except Exception as e:
+                    estado, datos = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Error inesperado: {e}"}
+                await self._responder(escritor, estado, datos, seguir)
+                if not seguir:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass   # Servidor deteniéndose con la conexión abierta: se cierra sin más
+        finally:
+            escritor.close()
+
+    @staticmethod
+    async def _responder(escritor, estado, datos, seguir):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode()
+        escritor.write(f"HTTP/1.1 {estado.value} {estado.phrase}\r\n"
+                       f"Content-Type: application/json; charset=utf-8\r\n"
+                       f"Content-Length: {len(cuerpo)}\r\n"
+                       f"Connection: {'keep-alive' if seguir else 'close'}\r\n\r\n".encode() + cuerpo)
+        await escritor.drain()
+
+
+async def servir(inventario, host, puerto):
+    servidor_http = ServidorInventario(inventario)
+    servidor = await asyncio.start_server(servidor_http.atender, host, puerto)
+    puerto_real = servidor.sockets[0].getsockname()[1]
+    print(f"🌐 Inventario escuchando en http://{host}:{puerto_real} ({len(inventario.productos)} productos)",
+          flush=True)
+    # 🛑 SIGTERM (p. ej. al detener el servicio) termina igual que Ctrl+C: guardando lo pendiente
+    detener = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, detener.set)
+    except (NotImplementedError, AttributeError):   # Windows
+        pass
+    try:
+        async with servidor:
+            await detener.wait()
+    finally:
+        servidor_http.pool.shutdown()
+
+
+def main():
+    analizador = argparse.ArgumentParser(description="Servicio HTTP/JSON del inventario.")
+    analizador.add_argument("--inventario", default="inventario.json", help="archivo del inventario")
+    analizador.add_argument("--host", default="127.0.0.1")
+    analizador.add_argument("--puerto", type=int, default=8080, help="0 = cualquiera libre")
+    analizador.add_argument("--intervalo-ms", type=int, default=200,
+                            help="cada cuánto se guardan en disco los cambios pendientes")
+    analizador.add_argument("--bitacora", action="store_true", help="guardar cambios en la bitácora (.log)")
+    analizador.add_argument("--eventos", action="store_true", help="registrar el flujo de cambios (.eventos)")
+    args = analizador.parse_args()
+
+    # ⏳ Guardado diferido: las peticiones solo tocan memoria; un hilo aparte escribe el disco
+    try:
+        inventario = Inventario(args.inventario, usar_bitacora=args.bitacora, intervalo_ms=args.intervalo_ms,
+                                registrar_eventos=args.eventos)
+    except SnapshotInvalido:
+        sys.exit(1)   # 🛑 Mejor no arrancar que servir (y luego guardar) un inventario vacío
+    try:
+        asyncio.run(servir(inventario, args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        inventario.cerrar()
+        print("👋 Servidor detenido; cambios guardados.")
+
+
+if __name__ == "__main__":
+    main()
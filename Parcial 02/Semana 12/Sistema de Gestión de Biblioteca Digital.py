@@ -1,10 +1,51 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 from tkinter import ttk  # Para tablas más avanzadas
+import atexit
 import json
+import math
 import os
+import sys
+import time
 import unicodedata
 
+# Módulos compartidos entre semanas (carpeta Parcial 02/comun)
+_PARCIAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARCIAL not in sys.path:
+    sys.path.insert(0, _PARCIAL)
+from comun.metricas import registro
+
+# MÉTRICAS OPCIONALES DE CARGA Y GUARDADO (comun/metricas.py, las mismas del inventario)
+# Se activan con la variable de entorno BIBLIOTECA_METRICAS=1: cada llamada a cargar_datos y
+# guardar_datos registra su duración, los bytes de los archivos, los registros y el tiempo de cada
+# fase (leer/decodificar/construir al cargar; construir/serializar/escribir al guardar).
+# Con BIBLIOTECA_PERFIL=perfil.prof además se perfilan esas llamadas con cProfile; el perfil
+# se guarda al salir y se revisa con: python -m pstats perfil.prof
+# Apagadas, la carga y el guardado son el json.load / json.dump de siempre.
+METRICAS = registro("BIBLIOTECA")
+
+# GUARDADO SEGURO
+# Con BIBLIOTECA_VENTANA_GUARDADO=segundos los cambios hechos dentro de esa ventana se juntan en un
+# solo guardado (por defecto 0: se guarda en cada cambio). La ventana de la GUI guarda lo pendiente
+# cuando vence la ventana y al cerrarse.
+VENTANA_GUARDADO = float(os.environ.get("BIBLIOTECA_VENTANA_GUARDADO", "0") or 0)
+
+def escribir_atomico(ruta, datos, medicion):
+    # Se escribe el JSON en un temporal y se pone en lugar del original: si algo falla, el original queda intacto
+    temporal = ruta + ".tmp"
+    try:
+        with medicion.abrir(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=4)
+            f.flush()
+            with medicion.fase("escribir"):
+                os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+    except Exception:  # También si json.dump falla: no queda el temporal a medias
+        if os.path.isfile(temporal):
+            os.remove(temporal)
+        raise
+
+
 #  CLASES
 class Libro:
     def __init__(self, titulo, autor, categoria, isbn):
@@ -46,51 +87,116 @@ class Usuario:
         return usuario
 
 class Biblioteca:
-    def __init__(self, archivo_libros="libros.json", archivo_usuarios="usuarios.json"):
+    def __init__(self, archivo_libros="libros.json", archivo_usuarios="usuarios.json",
+                 ventana_guardado=VENTANA_GUARDADO):
         self.archivo_libros = archivo_libros
         self.archivo_usuarios = archivo_usuarios
         self.libros = {}
         self.usuarios_ids = set()
         self.usuarios = {}
+        # Índice inverso ISBN -> IDs de los usuarios que lo tienen. Como en los datos de siempre, un mismo
+        # ISBN puede estar prestado a varios usuarios a la vez
+        self.prestamos = {}
+        self.sucios = set()  # Archivos con cambios sin guardar: "libros" y/o "usuarios"
+        self.ventana_guardado = ventana_guardado
+        self.ultimo_guardado = -math.inf
         self.cargar_datos()
+        if ventana_guardado > 0:
+            atexit.register(self.cerrar)
 
     # Guardado y carga
-    def guardar_datos(self):
-        with open(self.archivo_libros, "w", encoding="utf-8") as f:
-            json.dump({isbn: libro.to_dict() for isbn, libro in self.libros.items()}, f, indent=4)
-        with open(self.archivo_usuarios, "w", encoding="utf-8") as f:
-            json.dump({uid: user.to_dict() for uid, user in self.usuarios.items()}, f, indent=4)
+    def guardar_datos(self, forzar=False):
+        # Solo se escriben los archivos sucios. Dentro de la ventana de guardado los cambios esperan
+        # al siguiente guardado; forzar=True guarda de inmediato. Devuelve True si no queda nada pendiente.
+        if not self.sucios:
+            return True
+        if not forzar and time.monotonic() - self.ultimo_guardado < self.ventana_guardado:
+            return False
+        self.ultimo_guardado = time.monotonic()
+        # Fases para las métricas: construir los diccionarios, escribir (disco) y serializar (el resto)
+        with METRICAS.medir("guardar_datos") as medicion:
+            registros = 0
+            for nombre, ruta in (("libros", self.archivo_libros), ("usuarios", self.archivo_usuarios)):
+                if nombre not in self.sucios:
+                    continue
+                with medicion.fase("construir"):
+                    if nombre == "libros":
+                        datos = {isbn: libro.to_dict() for isbn, libro in self.libros.items()}
+                    else:
+                        datos = {uid: user.to_dict() for uid, user in self.usuarios.items()}
+                try:
+                    escribir_atomico(ruta, datos, medicion)
+                except OSError as error:
+                    print(f"No se pudo guardar {ruta}: {error}")  # Sigue sucio: se reintenta después
+                    continue
+                medicion.tamaño_de(ruta)
+                registros += len(datos)
+                self.sucios.discard(nombre)
+            medicion.registros = registros
+            medicion.completar("serializar")
+        return not self.sucios
+
+    def cerrar(self):
+        return self.guardar_datos(forzar=True)
 
     def cargar_datos(self):
-        if os.path.exists(self.archivo_libros):
-            with open(self.archivo_libros, "r", encoding="utf-8") as f:
-                libros_json = json.load(f)
-                for isbn, lib_data in libros_json.items():
-                    self.libros[isbn] = Libro.from_dict(lib_data)
-        if os.path.exists(self.archivo_usuarios):
-            with open(self.archivo_usuarios, "r", encoding="utf-8") as f:
-                usuarios_json = json.load(f)
-                for uid, user_data in usuarios_json.items():
-                    usuario = Usuario.from_dict(user_data)
-                    self.usuarios[uid] = usuario
-                    self.usuarios_ids.add(uid)
+        # Fases para las métricas: leer el archivo (disco), construir los objetos y decodificar (el resto)
+        with METRICAS.medir("cargar_datos") as medicion:
+            registros = 0
+            for ruta, construir in ((self.archivo_libros, self._cargar_libros),
+                                    (self.archivo_usuarios, self._cargar_usuarios)):
+                if not os.path.exists(ruta):
+                    continue
+                medicion.tamaño_de(ruta)
+                with medicion.abrir(ruta, "r", encoding="utf-8") as f:
+                    datos = json.load(f)
+                with medicion.fase("construir"):
+                    construir(datos)
+                registros += len(datos)
+            medicion.registros = registros
+            medicion.completar("decodificar")
+
+    def _cargar_libros(self, libros_json):
+        for isbn, lib_data in libros_json.items():
+            self.libros[isbn] = Libro.from_dict(lib_data)
+
+    def _cargar_usuarios(self, usuarios_json):
+        for uid, user_data in usuarios_json.items():
+            usuario = Usuario.from_dict(user_data)
+            self.usuarios[uid] = usuario
+            self.usuarios_ids.add(uid)
+            for libro in usuario.libros_prestados:
+                self.prestamos.setdefault(libro.isbn, {})[uid] = None  # dict como conjunto ordenado
 
     # Funcionalidades básicas
     def añadir_libro(self, libro):
         if libro.isbn in self.libros:
             return False
         self.libros[libro.isbn] = libro
+        self.sucios.add("libros")  # Agregar un libro no reescribe usuarios.json
         self.guardar_datos()
         return True
 
-    def listar_todos_libros(self):
-        lista = []
+    def quien_tiene(self, isbn):
+        # Usuarios que tienen prestado ese ISBN (lista vacía si nadie lo tiene)
+        return [self.usuarios[uid] for uid in self.prestamos.get(isbn, {})]
+
+    def filas(self):
+        # Filas de la tabla con una clave estable: el ISBN si está disponible, ISBN@usuario si está prestado
+        # (ISBN@usuario#n para la copia n cuando el mismo usuario tiene el ISBN más de una vez)
         for libro in self.libros.values():
-            lista.append([libro.titulo_autor[0], libro.titulo_autor[1], libro.categoria, libro.isbn, "Disponible"])
-        for usuario in self.usuarios.values():
+            yield libro.isbn, (libro.titulo_autor[0], libro.titulo_autor[1], libro.categoria, libro.isbn, "Disponible")
+        # Los prestados en el mismo orden de siempre: usuario por usuario, en el orden de su lista
+        for uid, usuario in self.usuarios.items():
+            copias = {}
             for libro in usuario.libros_prestados:
-                lista.append([libro.titulo_autor[0], libro.titulo_autor[1], libro.categoria, libro.isbn, f"Prestado por {usuario.nombre}"])
-        return lista
+                copia = copias[libro.isbn] = copias.get(libro.isbn, -1) + 1
+                clave = f"{libro.isbn}@{uid}" + (f"#{copia}" if copia else "")
+                yield clave, (libro.titulo_autor[0], libro.titulo_autor[1], libro.categoria, libro.isbn,
+                              f"Prestado por {usuario.nombre}")
+
+    def listar_todos_libros(self):
+        return [list(fila) for _, fila in self.filas()]
 
 # ----- INTERFAZ GRÁFICA -----
 class BibliotecaGUI:
@@ -121,6 +227,7 @@ class BibliotecaGUI:
         tk.Button(root, text="Agregar libro", command=self.agregar_libro).pack(pady=5)
         tk.Button(root, text="Limpiar campos", command=self.limpiar_campos).pack(pady=5)
         tk.Button(root, text="Actualizar lista de libros", command=self.actualizar_tabla).pack(pady=5)
+        tk.Button(root, text="Ver métricas", command=self.ver_metricas).pack(pady=5)
 
         # Tabla para mostrar libros
         self.tabla = ttk.Treeview(root, columns=("Titulo", "Autor", "Categoria", "ISBN", "Estado"), show="headings")
@@ -128,7 +235,10 @@ class BibliotecaGUI:
             self.tabla.heading(col, text=col)
             self.tabla.column(col, width=130)
         self.tabla.pack(pady=10, fill="both", expand=True)
+        self.filas_mostradas = {}  # Clave de fila -> valores que muestra la tabla
         self.actualizar_tabla()
+        self.guardado_programado = None
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
 
     def agregar_libro(self):
         titulo = self.entry_titulo.get().strip()
@@ -141,22 +251,67 @@ class BibliotecaGUI:
         libro = Libro(titulo, autor, categoria, isbn)
         if self.biblio.añadir_libro(libro):
             messagebox.showinfo("Éxito", f"Libro '{titulo}' agregado correctamente.")
-            self.actualizar_tabla()
+            # Solo se inserta la fila nueva, al final de los disponibles
+            fila = (titulo, autor, categoria, isbn, "Disponible")
+            self.tabla.insert("", len(self.biblio.libros) - 1, iid=isbn, values=fila)
+            self.filas_mostradas[isbn] = fila
+            self.programar_guardado()
             self.limpiar_campos()
         else:
             messagebox.showerror("Error", "El ISBN ya existe.")
 
+    def programar_guardado(self):
+        # Si el guardado quedó esperando en la ventana, se hace cuando esta vence
+        # (sin ventana, lo único pendiente es un guardado que falló: se reintenta cada segundo)
+        if self.biblio.sucios and self.guardado_programado is None:
+            espera = self.biblio.ventana_guardado if self.biblio.ventana_guardado > 0 else 1
+            self.guardado_programado = self.root.after(int(espera * 1000) + 1, self.guardar_pendiente)
+
+    def guardar_pendiente(self):
+        self.guardado_programado = None
+        if not self.biblio.guardar_datos():
+            self.programar_guardado()
+
+    def cerrar(self):
+        if not self.biblio.cerrar():
+            if not messagebox.askyesno("Error", "No se pudieron guardar los cambios. ¿Cerrar de todos modos?"):
+                return
+        self.root.destroy()
+
     def limpiar_campos(self):
         self.entry_titulo.delete(0, tk.END)
         self.entry_autor.delete(0, tk.END)
         self.entry_categoria.delete(0, tk.END)
         self.entry_isbn.delete(0, tk.END)
 
+    def ver_metricas(self):
+        if not METRICAS.activo:
+            messagebox.showinfo("Métricas", "Las métricas están apagadas. Inicie el programa con "
+                                            "BIBLIOTECA_METRICAS=1 (y BIBLIOTECA_PERFIL=perfil.prof para cProfile).")
+            return
+        ventana = tk.Toplevel(self.root)
+        ventana.title("Métricas de carga y guardado")
+        texto = tk.Text(ventana, width=110, height=20, font=("Courier", 10))
+        texto.insert(tk.END, METRICAS.texto())
+        texto.config(state="disabled")
+        texto.pack(fill="both", expand=True)
+
     def actualizar_tabla(self):
-        for fila in self.tabla.get_children():
-            self.tabla.delete(fila)
-        for libro in self.biblio.listar_todos_libros():
-            self.tabla.insert("", tk.END, values=libro)
+        # Solo se tocan las filas que cambiaron: se borran las que ya no están, se actualizan
+        # las que cambiaron de valores y se insertan las nuevas en su posición
+        nuevas = dict(self.biblio.filas())
+        sobrantes = [iid for iid in self.filas_mostradas if iid not in nuevas]
+        if sobrantes:
+            self.tabla.delete(*sobrantes)
+            for iid in sobrantes:
+                del self.filas_mostradas[iid]
+        for posicion, (iid, fila) in enumerate(nuevas.items()):
+            anterior = self.filas_mostradas.get(iid)
+            if anterior is None:
+                self.tabla.insert("", posicion, iid=iid, values=fila)
+            elif anterior != fila:
+                self.tabla.item(iid, values=fila)
+            self.filas_mostradas[iid] = fila
 
 # ----- EJECUCIÓN -----
 if __name__ == "__main__":
@@ -1,7 +1,231 @@
+import atexit      # Para guardar lo pendiente al salir
+import functools
 import json
+import math
 import os
+import sys
+import threading  # Guardado diferido al final de la ventana
+import time        # Para la ventana de guardado y la fecha de los préstamos
 import unicodedata  # Para normalizar texto y eliminar tildes en las búsquedas
 
+# Módulos compartidos entre semanas (carpeta Parcial 02/comun)
+_PARCIAL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARCIAL not in sys.path:
+    sys.path.insert(0, _PARCIAL)
+from comun.metricas import registro
+
+
+# MÉTRICAS OPCIONALES DE CARGA Y GUARDADO (comun/metricas.py, las mismas del inventario)
+# Se activan con la variable de entorno BIBLIOTECA_METRICAS=1: cada llamada a cargar_datos y
+# guardar_datos registra su duración, los bytes de los archivos, los registros y el tiempo de cada
+# fase (leer/decodificar/construir al cargar; construir/serializar/escribir al guardar).
+# Con BIBLIOTECA_PERFIL=perfil.prof además se perfilan esas llamadas con cProfile; el perfil
+# se guarda al salir y se revisa con: python -m pstats perfil.prof
+# Apagadas, la carga y el guardado son el json.load / json.dump de siempre.
+
+METRICAS = registro("BIBLIOTECA")
+
+
+# GUARDADO SEGURO
+# Con BIBLIOTECA_VENTANA_GUARDADO=segundos los cambios hechos dentro de esa ventana se juntan en un
+# solo guardado (por defecto 0: se guarda en cada cambio). Un temporizador guarda lo pendiente
+# cuando termina la ventana, aunque no haya más cambios; lo que quede se guarda al salir.
+
+VENTANA_GUARDADO = float(os.environ.get("BIBLIOTECA_VENTANA_GUARDADO", "0") or 0)
+
+
+def con_candado(metodo):
+    """Ejecuta el método con el candado de la biblioteca: el guardado diferido corre en otro hilo"""
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._candado:
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+def escribir_atomico(ruta, datos, medicion):
+    """Escribe el JSON en un archivo temporal y lo pone en lugar del original: si algo falla, el original queda intacto"""
+    temporal = ruta + ".tmp"
+    try:
+        with medicion.abrir(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=4)
+            f.flush()
+            with medicion.fase("escribir"):
+                os.fsync(f.fileno()) # Que los datos estén en disco antes de reemplazar
+        os.replace(temporal, ruta)
+    except Exception:  # También si json.dump falla: no queda el temporal a medias
+        if os.path.isfile(temporal):
+            os.remove(temporal)
+        raise
+
+
+# NORMALIZACIÓN E ÍNDICES DE BÚSQUEDA
+
+def normalizar(texto):
+    """Pasa a minúsculas y quita las tildes, para comparar sin importar cómo se escribió"""
+    texto = texto.lower()
+    return ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+
+
+def trigramas(palabra):
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+
+def distancia_edicion(a, b):
+    """Distancia de Levenshtein: cuántas letras hay que insertar, borrar o cambiar para pasar de a a b"""
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, letra_a in enumerate(a, 1):
+        actual = [i]
+        for j, letra_b in enumerate(b, 1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (letra_a != letra_b)))
+        anterior = actual
+    return anterior[-1]
+
+
+def tolerancia(palabra):
+    """
+    Errores que se aceptan en una palabra de la búsqueda aproximada: ninguno hasta 2 letras, 1 hasta 5
+    y 2 desde 6. Un intercambio de letras vecinas cuenta como 2 ("Harrai" -> "Harari").
+    """
+    if len(palabra) <= 2:
+        return 0
+    return 1 if len(palabra) <= 5 else 2
+
+
+class ArbolBK:
+    """
+    Árbol BK de palabras: cada hijo cuelga de su padre según la distancia de edición entre ambos.
+    Por la desigualdad triangular, para buscar a distancia <= máximo solo hay que bajar por los hijos
+    cuya distancia al nodo esté en [d - máximo, d + máximo], sin comparar todo el vocabulario.
+    """
+    def __init__(self):
+        self.raiz = None       # Nodo: (palabra, {distancia: nodo hijo})
+        self.comparaciones = 0 # Distancias calculadas en las búsquedas (para el benchmark)
+
+    def agregar(self, palabra):
+        if self.raiz is None:
+            self.raiz = (palabra, {})
+            return
+        nodo = self.raiz
+        while True:
+            distancia = distancia_edicion(palabra, nodo[0])
+            if distancia == 0:
+                return # Ya estaba
+            hijo = nodo[1].get(distancia)
+            if hijo is None:
+                nodo[1][distancia] = (palabra, {})
+                return
+            nodo = hijo
+
+    def buscar(self, palabra, maximo):
+        """Palabras del árbol a distancia <= maximo, como diccionario palabra -> distancia"""
+        encontradas = {}
+        pendientes = [self.raiz] if self.raiz is not None else []
+        while pendientes:
+            texto, hijos = pendientes.pop()
+            distancia = distancia_edicion(palabra, texto)
+            self.comparaciones += 1
+            if distancia <= maximo:
+                encontradas[texto] = distancia
+            for distancia_hijo, hijo in hijos.items():
+                if distancia - maximo <= distancia_hijo <= distancia + maximo:
+                    pendientes.append(hijo)
+        return encontradas
+
+
+class IndiceLibros:
+    """Índices invertidos del catálogo: palabras de título y autor, y categorías"""
+    def __init__(self):
+        self.orden = {}       # ISBN -> número de llegada al catálogo (los resultados salen en ese orden)
+        self.contador = 0
+        self.palabras = {"titulo": {}, "autor": {}}   # palabra normalizada -> ISBNs que la contienen
+        self.trigramas = {"titulo": {}, "autor": {}}  # trigrama -> palabras del vocabulario que lo contienen
+        self.categorias = {}  # categoría normalizada -> ISBNs
+        self.arboles = {"titulo": None, "autor": None}  # Árbol BK del vocabulario, creado en la 1.ª búsqueda aproximada
+
+    def agregar(self, libro):
+        if libro.isbn not in self.orden:
+            self.contador += 1
+            self.orden[libro.isbn] = self.contador
+        for campo, texto in (("titulo", libro.titulo_norm), ("autor", libro.autor_norm)):
+            for palabra in set(texto.split()):
+                isbns = self.palabras[campo].setdefault(palabra, set())
+                if not isbns:  # Palabra nueva en el vocabulario
+                    for trigrama in trigramas(palabra):
+                        self.trigramas[campo].setdefault(trigrama, set()).add(palabra)
+                    if self.arboles[campo] is not None:
+                        self.arboles[campo].agregar(palabra)
+                isbns.add(libro.isbn)
+        self.categorias.setdefault(libro.categoria_norm, set()).add(libro.isbn)
+
+    def quitar(self, libro, conservar_orden=False):
+        # conservar_orden: el libro se reemplaza por otro con el mismo ISBN, que queda en su lugar
+        if not conservar_orden:
+            del self.orden[libro.isbn]
+        for campo, texto in (("titulo", libro.titulo_norm), ("autor", libro.autor_norm)):
+            for palabra in set(texto.split()):
+                isbns = self.palabras[campo][palabra]
+                isbns.discard(libro.isbn)
+                if not isbns:  # Nadie más la usa: sale del vocabulario
+                    del self.palabras[campo][palabra]
+                    for trigrama in trigramas(palabra):
+                        vocabulario = self.trigramas[campo][trigrama]
+                        vocabulario.discard(palabra)
+                        if not vocabulario:
+                            del self.trigramas[campo][trigrama]
+        categoria = self.categorias[libro.categoria_norm]
+        categoria.discard(libro.isbn)
+        if not categoria:
+            del self.categorias[libro.categoria_norm]
+
+    def candidatos(self, campo, valor_norm):
+        """
+        ISBNs que podrían contener valor_norm en el campo, en orden de llegada, o None si no se
+        puede acotar (consulta vacía). Cada trozo sin espacios de la consulta tiene que estar dentro
+        de alguna palabra del libro, así que basta con buscar el trozo más largo en el vocabulario.
+        """
+        trozos = valor_norm.split()
+        if not trozos:
+            return None
+        trozo = max(trozos, key=len)
+        if len(trozo) >= 3:
+            # Palabras del vocabulario que tienen todos los trigramas del trozo (empezando por el más raro)
+            listas = sorted((self.trigramas[campo].get(t, set()) for t in trigramas(trozo)), key=len)
+            palabras = set.intersection(*listas) if listas[0] else set()
+        else:
+            palabras = self.palabras[campo]  # Trozo de 1 o 2 letras: se revisa todo el vocabulario
+        isbns = set()
+        for palabra in palabras:
+            if trozo in palabra:
+                isbns |= self.palabras[campo][palabra]
+        return self.en_orden(isbns)
+
+    def en_orden(self, isbns):
+        return sorted(isbns, key=self.orden.__getitem__)
+
+    def arbol(self, campo):
+        # El árbol no borra palabras: las que salen del vocabulario se ignoran al buscar
+        if self.arboles[campo] is None:
+            self.arboles[campo] = ArbolBK()
+            for palabra in self.palabras[campo]:
+                self.arboles[campo].agregar(palabra)
+        return self.arboles[campo]
+
+    def aproximados(self, campo, palabra, maximo):
+        """ISBN -> menor distancia entre palabra y alguna palabra del libro en el campo (solo las <= maximo)"""
+        if maximo == 0:
+            encontradas = {palabra: 0} if palabra in self.palabras[campo] else {}
+        else:
+            encontradas = self.arbol(campo).buscar(palabra, maximo)
+        distancias = {}
+        for encontrada, distancia in encontradas.items():
+            for isbn in self.palabras[campo].get(encontrada, ()):
+                if distancia < distancias.get(isbn, maximo + 1):
+                    distancias[isbn] = distancia
+        return distancias
+
 
 # CLASES
 
@@ -12,6 +236,10 @@ class Libro:
         self.titulo_autor = (titulo, autor)
         self.categoria = categoria
         self.isbn = isbn # ISBN único que identifica al libro
+        # Claves de búsqueda normalizadas una sola vez (no en cada consulta)
+        self.titulo_norm = normalizar(titulo)
+        self.autor_norm = normalizar(autor)
+        self.categoria_norm = normalizar(categoria)
 
     def __str__(self):
         # Representación legible del libro
@@ -37,80 +265,218 @@ class Usuario:
     def __init__(self, nombre, id_usuario):
         self.nombre = nombre
         self.id_usuario = id_usuario # ID único
-        self.libros_prestados = [] # Lista de libros actualmente prestados
+        self.libros_prestados = {} # ISBN -> Libro de los libros prestados, en el orden del préstamo
 
     def __str__(self):
         return f"Usuario: {self.nombre}, ID: {self.id_usuario}"
 
     def to_dict(self):
-        # Convierte el objeto Usuario a diccionario, incluyendo libros prestados
+        # Convierte el objeto Usuario a diccionario; sus préstamos se guardan en la tabla de préstamos
         return {
             "nombre": self.nombre,
-            "id_usuario": self.id_usuario,
-            "libros_prestados": [libro.to_dict() for libro in self.libros_prestados]
+            "id_usuario": self.id_usuario
         }
 
     @staticmethod
     def from_dict(data):
-        # Crea un objeto Usuario a partir de un diccionario
-        usuario = Usuario(data["nombre"], data["id_usuario"])
-        usuario.libros_prestados = [Libro.from_dict(lib) for lib in data.get("libros_prestados", [])]
-        return usuario
+        # Crea un objeto Usuario a partir de un diccionario (los libros prestados se enlazan al cargar)
+        return Usuario(data["nombre"], data["id_usuario"])
 
 # CLASE BIBLIOTECA
 
+# Tablas que se guardan en disco, cada una en su archivo JSON, en este orden: si una migración
+# se interrumpe, usuarios.json (que todavía trae los préstamos viejos) es lo último que se reescribe
+TABLAS = ("libros", "prestamos", "usuarios")
+
+
 class Biblioteca:
-    def __init__(self, archivo_libros="libros.json", archivo_usuarios="usuarios.json"):
-        # Archivos JSON para persistir datos
+    def __init__(self, archivo_libros="libros.json", archivo_usuarios="usuarios.json",
+                 archivo_prestamos="prestamos.json", ventana_guardado=VENTANA_GUARDADO):
+        # Archivos JSON para persistir datos, uno por tabla:
+        #   libros.json    -> todos los libros (disponibles y prestados), ISBN -> datos del libro
+        #   usuarios.json  -> ID -> nombre e ID, sin copias de libros
+        #   prestamos.json -> ISBN -> {"id_usuario", "fecha"}; un libro está disponible si no aparece aquí
         self.archivo_libros = archivo_libros
         self.archivo_usuarios = archivo_usuarios
+        self.archivo_prestamos = archivo_prestamos
         self.libros = {}          # Diccionario ISBN -> Libro
         self.usuarios_ids = set() # Conjunto de IDs únicos
         self.usuarios = {}        # Diccionario ID -> Usuario
+        self.prestamos = {}       # Tabla de préstamos ISBN -> {"id_usuario", "fecha"}, en orden de préstamo
+        self.indice = IndiceLibros()  # Índices de búsqueda de los libros disponibles
+        self.sucias = set()       # Tablas con cambios sin guardar
+        self.ventana_guardado = ventana_guardado # Segundos en los que se juntan varios cambios en un guardado
+        self.ultimo_guardado = -math.inf
+        self._candado = threading.RLock() # Cambios y guardados, también los del temporizador
+        self._temporizador = None # Guardado diferido pendiente (threading.Timer)
         self.cargar_datos() # Carga la información guardada en JSON al iniciar
+        if ventana_guardado > 0:
+            atexit.register(self.cerrar) # Lo que quede pendiente se guarda al salir
 
 
     # GUARDADO Y CARGA
 
-    def guardar_datos(self):
-        with open(self.archivo_libros, "w", encoding="utf-8") as f:
-            json.dump({isbn: libro.to_dict() for isbn, libro in self.libros.items()}, f, indent=4)
-        with open(self.archivo_usuarios, "w", encoding="utf-8") as f:
-            json.dump({uid: user.to_dict() for uid, user in self.usuarios.items()}, f, indent=4)
+    @con_candado
+    def guardar_datos(self, forzar=False):
+        """
+        Guarda solo las tablas marcadas como sucias: un préstamo escribe solo prestamos.json.
+        Si el último guardado fue hace menos de ventana_guardado segundos, los cambios esperan a un
+        temporizador que los guarda al terminar la ventana (o a cerrar()); forzar=True guarda de inmediato.
+        """
+        if not self.sucias:
+            return
+        restante = self.ventana_guardado - (time.monotonic() - self.ultimo_guardado)
+        if not forzar and restante > 0:
+            if self._temporizador is None:
+                self._temporizador = threading.Timer(restante, self._guardar_pendiente)
+                self._temporizador.daemon = True # No impide salir: atexit llama a cerrar()
+                self._temporizador.start()
+            return
+        self._cancelar_temporizador()
+        self.ultimo_guardado = time.monotonic()
+        # Fases para las métricas: construir los diccionarios, escribir (disco) y serializar (el resto)
+        with METRICAS.medir("guardar_datos") as medicion:
+            registros = 0
+            for tabla in TABLAS:
+                if tabla not in self.sucias:
+                    continue
+                ruta = getattr(self, "archivo_" + tabla)
+                with medicion.fase("construir"):
+                    datos = self._tabla(tabla)
+                try:
+                    escribir_atomico(ruta, datos, medicion)
+                except OSError as error:
+                    # La tabla sigue sucia: se vuelve a intentar en el próximo guardado
+                    print(f"⚠ No se pudo guardar {tabla}: {error}")
+                    continue
+                medicion.tamaño_de(ruta)
+                registros += len(datos)
+                self.sucias.discard(tabla)
+            medicion.registros = registros
+            medicion.completar("serializar")
+
+    @con_candado
+    def _guardar_pendiente(self):
+        # Lo llama el temporizador al terminar la ventana
+        self._temporizador = None
+        self.guardar_datos(forzar=True)
+
+    def _cancelar_temporizador(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+
+    def cerrar(self):
+        """Guarda los cambios que estén esperando en la ventana de guardado"""
+        self.guardar_datos(forzar=True)
+
+    def _tabla(self, tabla):
+        # Contenido de una tabla listo para JSON
+        if tabla == "libros":
+            libros = {isbn: libro.to_dict() for isbn, libro in self.libros.items()}
+            for isbn, prestamo in self.prestamos.items():
+                libros[isbn] = self.usuarios[prestamo["id_usuario"]].libros_prestados[isbn].to_dict()
+            return libros
+        if tabla == "usuarios":
+            return {uid: user.to_dict() for uid, user in self.usuarios.items()}
+        return dict(self.prestamos)
 
     def cargar_datos(self):
-        if os.path.exists(self.archivo_libros):
-            with open(self.archivo_libros, "r", encoding="utf-8") as f:
-                libros_json = json.load(f)
-                for isbn, lib_data in libros_json.items():
-                    self.libros[isbn] = Libro.from_dict(lib_data)
-        if os.path.exists(self.archivo_usuarios):
-            with open(self.archivo_usuarios, "r", encoding="utf-8") as f:
-                usuarios_json = json.load(f)
-                for uid, user_data in usuarios_json.items():
-                    usuario = Usuario.from_dict(user_data)
-                    self.usuarios[uid] = usuario
-                    self.usuarios_ids.add(uid)
+        # Fases para las métricas: leer el archivo (disco), construir los objetos y decodificar (el resto)
+        # Orden: usuarios y préstamos primero, para saber al leer cada libro si está prestado
+        with METRICAS.medir("cargar_datos") as medicion:
+            registros = 0
+            for ruta, construir in ((self.archivo_usuarios, self._cargar_usuarios),
+                                    (self.archivo_prestamos, self._cargar_prestamos),
+                                    (self.archivo_libros, self._cargar_libros)):
+                if not os.path.exists(ruta):
+                    continue
+                medicion.tamaño_de(ruta)
+                with medicion.abrir(ruta, "r", encoding="utf-8") as f:
+                    datos = json.load(f)
+                with medicion.fase("construir"):
+                    construir(datos)
+                registros += len(datos)
+            # Préstamos cuyo libro no está en ninguna tabla: se descartan
+            for isbn in [isbn for isbn, p in self.prestamos.items()
+                         if self.usuarios[p["id_usuario"]].libros_prestados.get(isbn) is None]:
+                del self.usuarios[self.prestamos.pop(isbn)["id_usuario"]].libros_prestados[isbn]
+                self.sucias.add("prestamos")
+            medicion.registros = registros
+            medicion.completar("decodificar")
+        if self.sucias:
+            self.guardar_datos(forzar=True) # Termina la migración o la limpieza de inmediato
+
+    def _cargar_usuarios(self, usuarios_json):
+        for uid, user_data in usuarios_json.items():
+            usuario = Usuario.from_dict(user_data)
+            self.usuarios[uid] = usuario
+            self.usuarios_ids.add(uid)
+            # Formato anterior: cada usuario traía copias completas de sus libros prestados.
+            # Se migran a la tabla de préstamos (sin fecha, que no se conocía) y a la de libros.
+            if "libros_prestados" in user_data:
+                for lib in user_data["libros_prestados"]:
+                    usuario.libros_prestados[lib["isbn"]] = Libro.from_dict(lib)
+                    self.prestamos[lib["isbn"]] = {"id_usuario": uid, "fecha": None}
+                self.sucias.update(TABLAS)
+
+    def _cargar_prestamos(self, prestamos_json):
+        for isbn, prestamo in prestamos_json.items():
+            usuario = self.usuarios.get(prestamo["id_usuario"])
+            if usuario is None:
+                self.sucias.add("prestamos") # Préstamo de un usuario que ya no existe
+                continue
+            self.prestamos[isbn] = prestamo
+            usuario.libros_prestados.setdefault(isbn, None) # Reserva su lugar; el libro llega con la tabla de libros
+
+    def _cargar_libros(self, libros_json):
+        for isbn, lib_data in libros_json.items():
+            libro = Libro.from_dict(lib_data)
+            prestamo = self.prestamos.get(isbn)
+            if prestamo is None:
+                self._poner_en_catalogo(libro)
+            else:
+                self.usuarios[prestamo["id_usuario"]].libros_prestados[isbn] = libro
+
+
+    # CATÁLOGO E ÍNDICES (todo cambio en self.libros pasa por aquí)
+
+    def _poner_en_catalogo(self, libro):
+        anterior = self.libros.get(libro.isbn)
+        if anterior is not None:
+            self.indice.quitar(anterior, conservar_orden=True)
+        self.libros[libro.isbn] = libro
+        self.indice.agregar(libro)
+
+    def _sacar_del_catalogo(self, isbn):
+        libro = self.libros.pop(isbn)
+        self.indice.quitar(libro)
+        return libro
 
 
     # FUNCIONALIDADES
 
+    @con_candado
     def añadir_libro(self, libro):
-        if libro.isbn in self.libros:
+        if libro.isbn in self.libros or libro.isbn in self.prestamos:
             print("⚠ El libro ya existe en la biblioteca (mismo ISBN).")
         else:
-            self.libros[libro.isbn] = libro
+            self._poner_en_catalogo(libro)
             print(f"Libro añadido: {libro}")
+            self.sucias.add("libros")
             self.guardar_datos()
 
+    @con_candado
     def quitar_libro(self, isbn):
         if isbn in self.libros:
             print(f"Libro eliminado: {self.libros[isbn]}")
-            del self.libros[isbn]
+            self._sacar_del_catalogo(isbn)
+            self.sucias.add("libros")
             self.guardar_datos()
         else:
             print("No se encontró el libro con ese ISBN.")
 
+    @con_candado
     def registrar_usuario(self, usuario):
         if usuario.id_usuario in self.usuarios_ids:
             print("⚠ El ID de usuario ya existe.")
@@ -118,17 +484,25 @@ class Biblioteca:
             self.usuarios_ids.add(usuario.id_usuario)
             self.usuarios[usuario.id_usuario] = usuario
             print(f"Usuario registrado: {usuario}")
+            self.sucias.add("usuarios")
             self.guardar_datos()
 
+    @con_candado
     def dar_baja_usuario(self, id_usuario):
         if id_usuario in self.usuarios_ids:
             print(f"Usuario dado de baja: {self.usuarios[id_usuario]}")
             self.usuarios_ids.remove(id_usuario)
-            del self.usuarios[id_usuario]
+            self.sucias.add("usuarios")
+            # Como antes de separar las tablas, los libros que tenía prestados se van con el usuario
+            # (no vuelven al catálogo): se borran sus préstamos y esos libros de libros.json
+            for isbn in self.usuarios.pop(id_usuario).libros_prestados:
+                del self.prestamos[isbn]
+                self.sucias.update(("prestamos", "libros"))
             self.guardar_datos()
         else:
             print("No se encontró el usuario.")
 
+    @con_candado
     def prestar_libro(self, isbn, id_usuario):
         if isbn not in self.libros:
             print("El libro no existe.")
@@ -138,48 +512,55 @@ class Biblioteca:
             return
         libro = self.libros[isbn]
         usuario = self.usuarios[id_usuario]
-        usuario.libros_prestados.append(libro) # Se añade a la lista de libros prestados del usuario
-        del self.libros[isbn] # Se quita del catálogo disponible
+        usuario.libros_prestados[isbn] = libro # Se añade a los libros prestados del usuario
+        self.prestamos[isbn] = {"id_usuario": id_usuario, "fecha": time.strftime("%Y-%m-%d %H:%M:%S")}
+        self._sacar_del_catalogo(isbn) # Se quita del catálogo disponible
         print(f"Libro prestado: {libro} a {usuario}")
+        self.sucias.add("prestamos") # La tabla de libros no cambia: un préstamo solo escribe prestamos.json
         self.guardar_datos()
 
+    @con_candado
     def devolver_libro(self, isbn, id_usuario):
         if id_usuario not in self.usuarios_ids:
             print("El usuario no está registrado.")
             return
         usuario = self.usuarios[id_usuario]
-        for libro in usuario.libros_prestados:
-            if libro.isbn == isbn:
-                usuario.libros_prestados.remove(libro)
-                self.libros[isbn] = libro
-                print(f"Libro devuelto: {libro} por {usuario}")
-                self.guardar_datos()
-                return
-        print("El usuario no tiene ese libro prestado.")
+        libro = usuario.libros_prestados.pop(isbn, None) # Búsqueda directa por ISBN, sin recorrer la lista
+        if libro is None:
+            print("El usuario no tiene ese libro prestado.")
+            return
+        del self.prestamos[isbn]
+        self._poner_en_catalogo(libro)
+        print(f"Libro devuelto: {libro} por {usuario}")
+        self.sucias.add("prestamos")
+        self.guardar_datos()
 
+    def quien_tiene(self, isbn):
+        """Devuelve el usuario que tiene prestado el libro, o None si nadie lo tiene"""
+        prestamo = self.prestamos.get(isbn)
+        return None if prestamo is None else self.usuarios[prestamo["id_usuario"]]
 
-    # BÚSQUEDA FLEXIBLE
 
-    def buscar_libros(self, criterio, valor):
-        """Busca libros por título, autor, categoría o ISBN ignorando mayúsculas, minúsculas y tildes."""
-        def normalizar(texto):
-            texto = texto.lower()
-            return ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+    # BÚSQUEDA FLEXIBLE
 
+    def encontrar_libros(self, criterio, valor):
+        """Libros disponibles que coinciden con la búsqueda, en el orden del catálogo (sin imprimir)"""
+        if criterio == "isbn":
+            return [self.libros[valor]] if valor in self.libros else []
         valor_norm = normalizar(valor)
-        resultados = []
+        if criterio == "categoria":
+            return [self.libros[isbn] for isbn in self.indice.en_orden(self.indice.categorias.get(valor_norm, ()))]
+        if criterio not in ("titulo", "autor"):
+            return []
+        # El índice da los candidatos; la comparación final es la misma de siempre: el texto contenido
+        candidatos = self.indice.candidatos(criterio, valor_norm)
+        libros = self.libros.values() if candidatos is None else (self.libros[isbn] for isbn in candidatos)
+        atributo = criterio + "_norm"
+        return [libro for libro in libros if valor_norm in getattr(libro, atributo)]
 
-        if criterio == "isbn":
-            if valor in self.libros:
-                resultados.append(self.libros[valor])
-        else:
-            for libro in self.libros.values():
-                if criterio == "titulo" and valor_norm in normalizar(libro.titulo_autor[0]):
-                    resultados.append(libro)
-                elif criterio == "autor" and valor_norm in normalizar(libro.titulo_autor[1]):
-                    resultados.append(libro)
-                elif criterio == "categoria" and valor_norm == normalizar(libro.categoria):
-                    resultados.append(libro)
+    def buscar_libros(self, criterio, valor):
+        """Busca libros por título, autor, categoría o ISBN ignorando mayúsculas, minúsculas y tildes."""
+        resultados = self.encontrar_libros(criterio, valor)
 
         if resultados:
             print("Resultados de la búsqueda:")
@@ -189,6 +570,46 @@ class Biblioteca:
             print("No se encontraron libros que coincidan con la búsqueda.")
 
 
+    # BÚSQUEDA APROXIMADA (tolera errores de escritura)
+
+    def encontrar_aproximados(self, criterio, valor, maximo=None):
+        """
+        Libros disponibles cuyo título o autor tiene, para cada palabra buscada, una palabra parecida
+        (a lo sumo tolerancia(palabra) errores, o maximo si se indica). Devuelve (libro, errores) del
+        más al menos parecido; a igual cantidad de errores, en el orden del catálogo.
+        """
+        if criterio not in ("titulo", "autor"):
+            return []
+        palabras = normalizar(valor).split()
+        if not palabras:
+            return []
+        errores = None
+        for palabra in palabras:
+            distancias = self.indice.aproximados(criterio, palabra, tolerancia(palabra) if maximo is None else maximo)
+            if errores is None:
+                errores = distancias
+            else:
+                errores = {isbn: total + distancias[isbn] for isbn, total in errores.items() if isbn in distancias}
+            if not errores:
+                return []
+        orden = self.indice.orden
+        return [(self.libros[isbn], total)
+                for isbn, total in sorted(errores.items(), key=lambda par: (par[1], orden[par[0]]))]
+
+    def buscar_aproximado(self, criterio, valor):
+        """Búsqueda tolerante a errores de escritura por título o autor, ordenada por parecido."""
+        if criterio not in ("titulo", "autor"):
+            print("La búsqueda aproximada es por titulo o autor.")
+            return
+        resultados = self.encontrar_aproximados(criterio, valor)
+        if resultados:
+            print("Resultados aproximados (del más al menos parecido):")
+            for libro, errores in resultados:
+                print(f"{libro} - {'coincidencia exacta' if errores == 0 else f'{errores} letra(s) de diferencia'}")
+        else:
+            print("No se encontraron libros parecidos a la búsqueda.")
+
+
     # LISTAR LIBROS PRESTADOS DE UN USUARIO
 
     def listar_libros_prestados(self, id_usuario):
@@ -198,7 +619,7 @@ class Biblioteca:
         usuario = self.usuarios[id_usuario]
         if usuario.libros_prestados:
             print(f"Libros prestados por {usuario.nombre}:")
-            for libro in usuario.libros_prestados:
+            for libro in usuario.libros_prestados.values():
                 print(libro)
         else:
             print(f"{usuario.nombre} no tiene libros prestados.")
@@ -208,7 +629,7 @@ class Biblioteca:
 
     def listar_todos_libros(self):
         """Muestra todos los libros con estado: Disponible o Prestado"""
-        if not self.libros and not any(u.libros_prestados for u in self.usuarios.values()):
+        if not self.libros and not self.prestamos:
             print("No hay libros en la biblioteca.")
             return
 
@@ -216,10 +637,10 @@ class Biblioteca:
         # Libros disponibles
         for libro in self.libros.values():
             print(f"{libro} - Estado: Disponible")
-        # Libros prestados
-        for usuario in self.usuarios.values():
-            for libro in usuario.libros_prestados:
-                print(f"{libro} - Estado: Prestado por {usuario.nombre} (ID: {usuario.id_usuario})")
+        # Libros prestados: solo se recorren los préstamos, no todos los usuarios
+        for isbn, prestamo in self.prestamos.items():
+            usuario = self.usuarios[prestamo["id_usuario"]]
+            print(f"{usuario.libros_prestados[isbn]} - Estado: Prestado por {usuario.nombre} (ID: {usuario.id_usuario})")
 
 
 
@@ -240,6 +661,8 @@ def menu():
         print("8. Listar libros prestados de un usuario")
         print("9. Salir")
         print("10. Ver todos los libros con su estado")
+        print("11. Ver métricas de carga y guardado")
+        print("12. ¿Quién tiene un libro?")
         opcion = input("Selecciona una opción: ")
 
         if opcion == "1":             # Crear y añadir libro
@@ -278,7 +701,12 @@ def menu():
             print("Buscar por: titulo (nombre del libro), autor, categoria, isbn (identificador único)")
             criterio = input("Criterio de búsqueda: ").lower()
             valor = input("Valor a buscar: ")
-            biblioteca.buscar_libros(criterio, valor)
+            # La búsqueda aproximada solo existe para título y autor: con otro criterio no se pregunta
+            if criterio in ("titulo", "autor") and \
+                    input("¿Búsqueda aproximada, tolerante a errores de escritura? (s/n): ").strip().lower() == "s":
+                biblioteca.buscar_aproximado(criterio, valor)
+            else:
+                biblioteca.buscar_libros(criterio, valor)
 
         elif opcion == "8":
             id_usuario = input("ID del usuario: ")
@@ -287,7 +715,25 @@ def menu():
         elif opcion == "10":
             biblioteca.listar_todos_libros()
 
+        elif opcion == "11":
+            if METRICAS.activo:
+                print(METRICAS.texto())
+            else:
+                print("Las métricas están apagadas. Inicia el programa con BIBLIOTECA_METRICAS=1 "
+                      "(y BIBLIOTECA_PERFIL=perfil.prof para perfilar con cProfile).")
+
+        elif opcion == "12":
+            isbn = input("ISBN del libro: ")
+            usuario = biblioteca.quien_tiene(isbn)
+            if usuario is not None:
+                print(f"Lo tiene prestado {usuario}")
+            elif isbn in biblioteca.libros:
+                print("El libro está disponible.")
+            else:
+                print("El libro no existe.")
+
         elif opcion == "9":
+            biblioteca.cerrar()
             print("Saliendo del sistema...")
             break
 
@@ -0,0 +1,109 @@
+# Benchmark de la búsqueda aproximada: distancia de edición contra cada libro del catálogo (fuerza bruta)
+# frente al árbol BK del vocabulario (versión actual)
+# Uso: python benchmark_aproximada.py [cantidad de libros] [consultas por criterio]   (por defecto 100000 200)
+# Las consultas son títulos y autores reales del catálogo con errores de escritura inventados.
+# Además de los tiempos, comprueba que las dos versiones devuelven los mismos libros en el mismo orden.
+# La fuerza bruta se mide con una de cada veinte consultas (es muy lenta); la columna resultados
+# promedia en las dos versiones solo esas consultas, para comparar lo mismo.
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmark_busqueda import cargar_programa, generar_libros, percentil
+
+LETRAS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def con_errores(texto, azar, programa):
+    # Un error (cambiar, borrar, insertar o intercambiar letras) en una o dos palabras que lo toleran
+    palabras = texto.split()
+    largas = [i for i, palabra in enumerate(palabras) if programa.tolerancia(programa.normalizar(palabra)) > 0]
+    for i in azar.sample(largas, min(len(largas), azar.randint(1, 2))):
+        letras = list(palabras[i])
+        posicion = azar.randrange(len(letras) - 1)
+        cambio = azar.choice(("cambiar", "borrar", "insertar", "intercambiar"))
+        if cambio == "cambiar":
+            letras[posicion] = azar.choice(LETRAS)
+        elif cambio == "borrar":
+            del letras[posicion]
+        elif cambio == "insertar":
+            letras.insert(posicion, azar.choice(LETRAS))
+        else:
+            letras[posicion], letras[posicion + 1] = letras[posicion + 1], letras[posicion]
+        palabras[i] = "".join(letras)
+    return " ".join(palabras)
+
+
+def buscar_fuerza_bruta(biblioteca, programa, criterio, valor):
+    # Misma regla que encontrar_aproximados, pero calculando la distancia contra todas las palabras de cada libro
+    palabras = programa.normalizar(valor).split()
+    resultados = []
+    for libro in biblioteca.libros.values():
+        del_libro = set(getattr(libro, criterio + "_norm").split())
+        total = 0
+        for palabra in palabras:
+            maximo = programa.tolerancia(palabra)
+            mejor = min(programa.distancia_edicion(palabra, otra) for otra in del_libro)
+            if mejor > maximo:
+                break
+            total += mejor
+        else:
+            resultados.append((libro, total))
+    resultados.sort(key=lambda par: par[1])   # Orden estable: a igual distancia, el del catálogo
+    return resultados
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    por_criterio = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    programa = cargar_programa()
+    azar = random.Random(11)
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "libros.json")
+        generar_libros(ruta, n)
+        biblioteca = programa.Biblioteca(ruta, os.path.join(carpeta, "usuarios.json"),
+                                         os.path.join(carpeta, "prestamos.json"))
+    libros = list(biblioteca.libros.values())
+    print(f"\n{n:,} libros")
+    for criterio in ("titulo", "autor"):
+        inicio = time.perf_counter()
+        arbol = biblioteca.indice.arbol(criterio)
+        print(f"Árbol BK de {criterio}: {len(biblioteca.indice.palabras[criterio]):,} palabras, "
+              f"construido en {time.perf_counter() - inicio:.2f} s")
+    print(f"{'criterio':<12}{'versión':<14}{'p50 ms':>10}{'p99 ms':>10}{'promedio ms':>13}"
+          f"{'distancias':>12}{'resultados':>12}")
+
+    for criterio in ("titulo", "autor"):
+        indice = 0 if criterio == "titulo" else 1
+        valores = [con_errores(azar.choice(libros).titulo_autor[indice], azar, programa) for _ in range(por_criterio)]
+        lentas = valores[:max(1, por_criterio // 20)]   # La fuerza bruta es muy lenta: menos consultas
+        arbol = biblioteca.indice.arbol(criterio)
+        for version, buscar, lista in (
+                ("fuerza bruta", lambda v: buscar_fuerza_bruta(biblioteca, programa, criterio, v), lentas),
+                ("árbol BK", lambda v: biblioteca.encontrar_aproximados(criterio, v), valores)):
+            tiempos, total = [], 0
+            arbol.comparaciones = 0
+            for i, valor in enumerate(lista):
+                inicio = time.perf_counter()
+                resultado = buscar(valor)
+                tiempos.append(time.perf_counter() - inicio)
+                if i < len(lentas):   # Resultados promediados sobre las mismas consultas en las dos versiones
+                    total += len(resultado)
+            # Distancias calculadas por consulta: en la fuerza bruta, una por palabra buscada y palabra de cada libro
+            if version == "fuerza bruta":
+                distancias = sum(len(programa.normalizar(v).split()) for v in lista) / len(lista) * sum(
+                    len(set(getattr(libro, criterio + "_norm").split())) for libro in libros)
+            else:
+                distancias = arbol.comparaciones / len(lista)
+            print(f"{criterio:<12}{version:<14}{percentil(tiempos, 50):>10.3f}{percentil(tiempos, 99):>10.3f}"
+                  f"{sum(tiempos) / len(tiempos) * 1000:>13.3f}{distancias:>12,.0f}{total / len(lentas):>12.1f}")
+        for valor in lentas:
+            if buscar_fuerza_bruta(biblioteca, programa, criterio, valor) != biblioteca.encontrar_aproximados(criterio, valor):
+                raise SystemExit(f"Resultados distintos para {criterio}={valor!r}")
+    print("Las dos versiones devuelven los mismos libros en el mismo orden.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# Benchmark de buscar_libros: recorrido completo normalizando cada libro (versión anterior)
+# frente a claves normalizadas al cargar + índices invertidos (versión actual)
+# Uso: python benchmark_busqueda.py [cantidad de libros] [consultas por criterio]   (por defecto 100000 200)
+# Además de los tiempos, comprueba que las dos versiones devuelven los mismos libros en el mismo orden.
+# La versión anterior se mide con una de cada diez consultas (es lenta); la columna resultados
+# promedia en las dos versiones solo esas consultas, para comparar lo mismo.
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import unicodedata
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+PROGRAMA = os.path.join(CARPETA, "GUI-Sistema de Gestión de Biblioteca Digital.py")
+
+PALABRAS = ["amor", "guerra", "ciencia", "historia", "sombra", "corazón", "río", "jardín", "océano", "música",
+            "tiempo", "camino", "ciudad", "memoria", "silencio", "fuego", "invierno", "canción", "árbol", "león"]
+NOMBRES = ["José", "María", "Andrés", "Sofía", "Gabriel", "Lucía", "Martín", "Inés", "Tomás", "Julián"]
+APELLIDOS = ["García", "Pérez", "Muñoz", "Hernández", "López", "Ramírez", "Núñez", "Gómez", "Díaz", "Sánchez"]
+CATEGORIAS = ["Novela", "Novela romántica", "Historia", "Ciencia", "Poesía", "Ensayo", "Biografía",
+              "Educación / Biología", "Filosofía", "Infantil"]
+
+
+def cargar_programa():
+    spec = importlib.util.spec_from_file_location("biblioteca_semana13", PROGRAMA)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def generar_libros(ruta, n, semilla=2525):
+    azar = random.Random(semilla)
+    libros = {}
+    for i in range(n):
+        isbn = f"978-{i:010d}"
+        titulo = " ".join(azar.sample(PALABRAS, azar.randint(2, 4))).capitalize() + f" {azar.randint(1, 5000)}"
+        autor = f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}{azar.randint(1, 300)}"
+        libros[isbn] = {"titulo": titulo, "autor": autor, "categoria": azar.choice(CATEGORIAS), "isbn": isbn}
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(libros, f, indent=4)
+
+
+def buscar_lineal(libros, criterio, valor):
+    # Copia del buscar_libros anterior: normaliza el valor y cada libro del catálogo en cada consulta
+    def normalizar(texto):
+        texto = texto.lower()
+        return ''.join(c for c in unicodedata.normalize('NFD', texto) if unicodedata.category(c) != 'Mn')
+
+    valor_norm = normalizar(valor)
+    resultados = []
+    if criterio == "isbn":
+        if valor in libros:
+            resultados.append(libros[valor])
+    else:
+        for libro in libros.values():
+            if criterio == "titulo" and valor_norm in normalizar(libro.titulo_autor[0]):
+                resultados.append(libro)
+            elif criterio == "autor" and valor_norm in normalizar(libro.titulo_autor[1]):
+                resultados.append(libro)
+            elif criterio == "categoria" and valor_norm == normalizar(libro.categoria):
+                resultados.append(libro)
+    return resultados
+
+
+def consultas(criterio, cantidad, azar):
+    if criterio == "titulo":
+        opciones = [lambda: azar.choice(PALABRAS), lambda: azar.choice(PALABRAS)[1:4].upper(),
+                    lambda: f"{azar.choice(PALABRAS)} {azar.choice(PALABRAS)}", lambda: f"{azar.choice(PALABRAS)} 12"]
+    elif criterio == "autor":
+        opciones = [lambda: azar.choice(APELLIDOS), lambda: f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)}",
+                    lambda: f"{azar.choice(APELLIDOS).lower()}{azar.randint(1, 300)}", lambda: "ez"]
+    else:
+        opciones = [lambda: azar.choice(CATEGORIAS).upper(), lambda: "novela romantica"]
+    return [azar.choice(opciones)() for _ in range(cantidad)]
+
+
+def percentil(tiempos, p):
+    ordenados = sorted(tiempos)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))] * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    por_criterio = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    programa = cargar_programa()
+    azar = random.Random(7)
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "libros.json")
+        generar_libros(ruta, n)
+        inicio = time.perf_counter()
+        biblioteca = programa.Biblioteca(ruta, os.path.join(carpeta, "usuarios.json"),
+                                         os.path.join(carpeta, "prestamos.json"))
+        carga = time.perf_counter() - inicio
+    print(f"\n{n:,} libros — carga con claves normalizadas e índices: {carga:.2f} s")
+    print(f"{'criterio':<12}{'versión':<10}{'p50 ms':>10}{'p99 ms':>10}{'promedio ms':>13}{'resultados':>12}")
+
+    for criterio in ("titulo", "autor", "categoria"):
+        valores = consultas(criterio, por_criterio, azar)
+        lineales = valores[:max(1, por_criterio // 10)]   # El recorrido completo es lento: menos consultas
+        for version, buscar, lista in (("anterior", lambda v: buscar_lineal(biblioteca.libros, criterio, v), lineales),
+                                       ("índices", lambda v: biblioteca.encontrar_libros(criterio, v), valores)):
+            tiempos, total = [], 0
+            for i, valor in enumerate(lista):
+                inicio = time.perf_counter()
+                resultado = buscar(valor)
+                tiempos.append(time.perf_counter() - inicio)
+                if i < len(lineales):   # Resultados promediados sobre las mismas consultas en las dos versiones
+                    total += len(resultado)
+            print(f"{criterio:<12}{version:<10}{percentil(tiempos, 50):>10.3f}{percentil(tiempos, 99):>10.3f}"
+                  f"{sum(tiempos) / len(tiempos) * 1000:>13.3f}{total / len(lineales):>12.1f}")
+        for valor in lineales:
+            if buscar_lineal(biblioteca.libros, criterio, valor) != biblioteca.encontrar_libros(criterio, valor):
+                raise SystemExit(f"Resultados distintos para {criterio}={valor!r}")
+    print("Las dos versiones devuelven los mismos libros en el mismo orden.")
+
+
+if __name__ == "__main__":
+    main()
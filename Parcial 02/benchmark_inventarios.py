@@ -0,0 +1,218 @@
+# ⏱️ Benchmark de los tres inventarios (Semana 09, 10 y 11) con las mismas operaciones y datos
+# Uso: python benchmark_inventarios.py [--productos 10000 100000] [--operaciones 1000] [--repeticiones 3]
+#                                     [--salida resultados.json] [--comparar resultados_anteriores.json]
+#
+# Para cada versión y tamaño mide cargar, guardar, agregar, actualizar, eliminar, buscar por nombre
+# y listar: operaciones por segundo, latencias p50/p90/p99 y pico de memoria (RSS) del proceso.
+# Cada versión corre en un proceso aparte (sus módulos se llaman igual y la memoria no se mezcla).
+# Los resultados se guardan en JSON; con --comparar se marcan las operaciones que empeoraron.
+# La Semana 09 vive solo en memoria: cargar y guardar no aplican y sus productos se agregan sin medir.
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+VERSIONES = {
+    "semana09": os.path.join(CARPETA, "Semana 09", "9.1. Estructura de Datos.py"),
+    "semana10": os.path.join(CARPETA, "Semana 10", "Gestor_Inventario.py"),
+    "semana11": os.path.join(CARPETA, "Semana 11", "Gestor_Inventario.py"),
+}
+PALABRAS = ["Leche", "Arroz", "Café", "Queso", "Atún", "Aceite", "Harina", "Yogur"]
+UMBRAL_REGRESION = 0.8   # Menos del 80 % de las operaciones/s de la corrida anterior = regresión
+
+
+def generar_catalogo(ruta, n, semilla=2525):
+    """🏭 Inventario.json sintético con el formato de guardar_inventario (Semanas 10 y 11)."""
+    azar = random.Random(semilla)
+    with open(ruta, "w") as f:
+        f.write("{")
+        for i in range(n):
+            pid = f"{i:07d}"
+            datos = {"id": pid, "nombre": f"{azar.choice(PALABRAS)} {azar.randint(1, 50_000)}",
+                     "cantidad": azar.randint(0, 100), "precio": round(azar.uniform(0.5, 20), 2),
+                     "fecha": "2025-08-31 10:30:00"}
+            f.write(f'{"," if i else ""}\n    {json.dumps(pid)}: {json.dumps(datos)}')
+        f.write("\n}")
+
+
+def pico_rss_mb():
+    # VmHWM (pico de RSS) en Linux; si no existe, ru_maxrss (KB en Linux, bytes en macOS)
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 2**20 if sys.platform == "darwin" else pico / 1024
+
+
+def resumir(latencias):
+    """📊 Operaciones por segundo y percentiles (ms) de una lista de latencias en segundos."""
+    if not latencias:
+        return None
+    ordenadas = sorted(latencias)
+
+    def percentil(p):
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))] * 1000
+
+    return {"n": len(ordenadas), "ops_s": len(ordenadas) / sum(ordenadas) if sum(ordenadas) else None,
+            "p50_ms": percentil(50), "p90_ms": percentil(90), "p99_ms": percentil(99)}
+
+
+# 🔌 Cada versión tiene métodos algo distintos: estas funciones los igualan
+def preparar(version, ruta):
+    """Importa la versión (desde su carpeta, como la usa su propio menú) y devuelve (módulo, crear_inventario)."""
+    sys.path.insert(0, os.path.dirname(VERSIONES[version]))
+    spec = importlib.util.spec_from_file_location("Gestor_Inventario" if version != "semana09" else "estructura_datos",
+                                                  VERSIONES[version])
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = modulo   # Los módulos vecinos de la Semana 11 lo importan por nombre
+    spec.loader.exec_module(modulo)
+    if version == "semana09":
+        def crear():
+            inventario = modulo.Inventario()
+            with open(ruta) as f:
+                for pid, d in json.load(f).items():
+                    inventario.añadir_nuevo_producto(modulo.Producto(pid, d["nombre"], d["cantidad"], d["precio"]))
+            return inventario
+    else:
+        # Sin guardar en cada operación: así se mide la operación en sí; el guardado se mide aparte
+        def crear():
+            return modulo.Inventario(ruta, guardar_cada=0)
+    return modulo, crear
+
+
+def medir_version(version, ruta, operaciones, repeticiones, semilla=2525):
+    """🔬 Se ejecuta en el proceso hijo: todas las mediciones de una versión."""
+    azar = random.Random(semilla)
+    sumidero = open(os.devnull, "w")   # Los mensajes y listados van a ninguna parte
+    resultados = {}
+
+    def cronometrar(nombre, funcion, argumentos):
+        latencias = []
+        with contextlib.redirect_stdout(sumidero):
+            for args in argumentos:
+                inicio = time.perf_counter()
+                funcion(*args)
+                latencias.append(time.perf_counter() - inicio)
+        resultados[nombre] = resumir(latencias)
+
+    with contextlib.redirect_stdout(sumidero):
+        modulo, crear = preparar(version, ruta)
+        inventario = crear()
+    ids = list(inventario.productos)
+    n = len(ids)
+
+    if version == "semana09":
+        resultados["cargar"] = resultados["guardar"] = None
+    else:
+        cargas = []
+        for _ in range(repeticiones):
+            del inventario
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(sumidero):
+                inventario = crear()
+            cargas.append(time.perf_counter() - inicio)
+        resultados["cargar"] = resumir(cargas)
+        cronometrar("guardar", inventario.guardar_inventario, [()] * repeticiones)
+
+    nuevos = [modulo.Producto(f"N{i:07d}", f"{azar.choice(PALABRAS)} nuevo {i}", 5, 1.0) for i in range(operaciones)]
+    cronometrar("agregar", inventario.añadir_nuevo_producto, [(p,) for p in nuevos])
+    # Por nombre de parámetro: la Semana 11 también acepta un nuevo nombre antes de la cantidad
+    cronometrar("actualizar", lambda pid, cantidad: inventario.actualizar_producto(pid, nueva_cantidad=cantidad),
+                [(azar.choice(ids), azar.randint(0, 100)) for _ in range(operaciones)])
+    # La primera búsqueda de las Semanas 10 y 11 construye el índice: se reporta aparte
+    cronometrar("primera_busqueda", inventario.buscar_por_nombre, [(azar.choice(PALABRAS),)])
+    cronometrar("buscar", inventario.buscar_por_nombre,
+                [(f"{azar.choice(PALABRAS)} {azar.randint(1, 5_000)}",) for _ in range(operaciones)])
+    cronometrar("listar", inventario.mostrar_productos, [()] * repeticiones)
+    cronometrar("eliminar", inventario.eliminar_producto, [(pid,) for pid in azar.sample(ids, min(operaciones, n))])
+
+    if hasattr(inventario, "cerrar"):
+        with contextlib.redirect_stdout(sumidero):
+            inventario.cerrar()   # Guarda lo pendiente, ya fuera de las mediciones
+    return {"operaciones": resultados, "pico_mb": pico_rss_mb()}
+
+
+def commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=CARPETA, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def mostrar(tamaño, version, medicion, anterior=None):
+    print(f"\n📦 {version} — {tamaño:,} productos — pico de memoria {medicion['pico_mb']:.0f} MB")
+    print(f"{'operación':<18}{'ops/s':>12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'vs anterior':>14}")
+    for nombre, r in medicion["operaciones"].items():
+        if r is None:
+            print(f"{nombre:<18}{'no aplica':>12}")
+            continue
+        comparacion = ""
+        previo = (anterior or {}).get(nombre)
+        if previo and previo.get("ops_s") and r["ops_s"]:
+            razon = r["ops_s"] / previo["ops_s"]
+            comparacion = f"{razon:.2f}x" + (" ⚠️" if razon < UMBRAL_REGRESION else "")
+        print(f"{nombre:<18}{r['ops_s'] or 0:>12,.0f}{r['p50_ms']:>10.3f}{r['p90_ms']:>10.3f}"
+              f"{r['p99_ms']:>10.3f}{comparacion:>14}")
+
+
+def main():
+    if len(sys.argv) == 6 and sys.argv[1] == "--medir":
+        _, _, version, ruta, operaciones, repeticiones = sys.argv
+        print(json.dumps(medir_version(version, ruta, int(operaciones), int(repeticiones))))
+        return
+
+    analizador = argparse.ArgumentParser(description="Benchmark de los inventarios de las Semanas 09, 10 y 11.")
+    analizador.add_argument("--productos", type=int, nargs="+", default=[10_000, 100_000])
+    analizador.add_argument("--operaciones", type=int, default=1_000, help="agregar/actualizar/eliminar/buscar")
+    analizador.add_argument("--repeticiones", type=int, default=3, help="cargar/guardar/listar")
+    analizador.add_argument("--versiones", nargs="+", choices=sorted(VERSIONES), default=sorted(VERSIONES))
+    analizador.add_argument("--salida", default=f"benchmark_inventarios_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    analizador.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = analizador.parse_args()
+
+    anterior = {}
+    if args.comparar:
+        with open(args.comparar) as f:
+            anterior = json.load(f)["resultados"]
+
+    informe = {"fecha": time.strftime("%Y-%m-%d %H:%M:%S"), "commit": commit_actual(),
+               "python": platform.python_version(), "plataforma": platform.platform(),
+               "operaciones": args.operaciones, "repeticiones": args.repeticiones, "resultados": {}}
+    with tempfile.TemporaryDirectory() as carpeta:
+        for tamaño in args.productos:
+            original = os.path.join(carpeta, f"catalogo_{tamaño}.json")
+            generar_catalogo(original, tamaño)
+            for version in args.versiones:
+                # Cada versión trabaja sobre su propia copia: las otras no ven sus cambios
+                ruta = os.path.join(carpeta, f"{version}_{tamaño}.json")
+                with open(original, "rb") as origen, open(ruta, "wb") as destino:
+                    destino.write(origen.read())
+                salida = subprocess.run([sys.executable, __file__, "--medir", version, ruta,
+                                         str(args.operaciones), str(args.repeticiones)],
+                                        capture_output=True, text=True, check=True, cwd=carpeta)
+                medicion = json.loads(salida.stdout.strip().splitlines()[-1])
+                clave = f"{version}/{tamaño}"
+                informe["resultados"][clave] = medicion
+                mostrar(tamaño, version, medicion, anterior.get(clave, {}).get("operaciones"))
+
+    with open(args.salida, "w") as f:
+        json.dump(informe, f, indent=4, ensure_ascii=False)
+    print(f"\n💾 Resultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
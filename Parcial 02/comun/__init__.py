@@ -0,0 +1,2 @@
+# 🧩 Módulos compartidos por los programas de las distintas semanas del Parcial 02.
+# Cada programa agrega la carpeta "Parcial 02" a sys.path y los importa como comun.<módulo>.
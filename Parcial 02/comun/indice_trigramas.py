@@ -0,0 +1,71 @@
+# 🔎 Índice de trigramas: acelera la búsqueda por subcadena en los nombres de productos
+# Lo usan los inventarios de las Semanas 09, 10 y 11.
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido trigrama -> claves sobre los nombres en minúsculas.
+    Una consulta de 3 o más caracteres solo revisa las claves que contienen
+    todos sus trigramas; el resultado conserva el orden de inserción.
+    """
+    def __init__(self):
+        self.nombres = {}      # clave -> nombre en minúsculas
+        self.trigramas = {}    # trigrama -> conjunto de claves
+        self.orden = {}        # clave -> número de inserción
+        self._siguiente = 0
+
+    @staticmethod
+    def _trigramas_de(texto):
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+    def agregar(self, clave, nombre):
+        """Indexa (o reindexa si cambió) el nombre asociado a una clave."""
+        nombre = nombre.lower()
+        anterior = self.nombres.get(clave)
+        if anterior == nombre:
+            return
+        if anterior is None:
+            self.orden[clave] = self._siguiente
+            self._siguiente += 1
+        else:
+            self._quitar_trigramas(clave, anterior)  # ✏️ Cambio de nombre
+        self.nombres[clave] = nombre
+        for t in self._trigramas_de(nombre):
+            self.trigramas.setdefault(t, set()).add(clave)
+
+    def quitar(self, clave):
+        """Elimina una clave del índice."""
+        nombre = self.nombres.pop(clave, None)
+        if nombre is None:
+            return
+        del self.orden[clave]
+        self._quitar_trigramas(clave, nombre)
+
+    def _quitar_trigramas(self, clave, nombre):
+        for t in self._trigramas_de(nombre):
+            claves = self.trigramas[t]
+            claves.discard(clave)
+            if not claves:
+                del self.trigramas[t]
+
+    def buscar(self, texto):
+        """Devuelve, en orden de inserción, las claves cuyo nombre contiene `texto` (sin distinguir mayúsculas)."""
+        consulta = texto.lower()
+        if len(consulta) < 3:
+            # Consultas muy cortas: no hay trigramas, se revisan los nombres ya normalizados
+            return [c for c, nombre in self.nombres.items() if consulta in nombre]
+
+        listas = []
+        for t in self._trigramas_de(consulta):
+            claves = self.trigramas.get(t)
+            if not claves:
+                return []
+            listas.append(claves)
+        listas.sort(key=len)
+        if len(listas[0]) * 4 > len(self.nombres):
+            # Consulta poco selectiva: recorrer en orden sale más barato que ordenar los candidatos
+            return [c for c, nombre in self.nombres.items() if consulta in nombre]
+        candidatos = listas[0].intersection(*listas[1:])
+        encontrados = [c for c in candidatos if consulta in self.nombres[c]]
+        encontrados.sort(key=self.orden.__getitem__)
+        return encontrados
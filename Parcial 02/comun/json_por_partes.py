@@ -0,0 +1,63 @@
+# 🌊 Lectura incremental de JSON: recorre un objeto {clave: valor} entrada por entrada.
+# Es más lenta que json.load (~2x) pero no necesita el documento completo en memoria.
+# La usan los inventarios de las Semanas 10 y 11 y la conversión a instantánea binaria.
+import json
+import re
+
+_DECODIFICADOR = json.JSONDecoder()
+_ESPACIOS = re.compile(r"[ \t\n\r]*")
+
+
+def leer_entradas_json(f, tam_bloque=1 << 16, crudo=False):
+    """
+    Produce (clave, valor) por cada entrada del objeto JSON de nivel superior
+    leyendo el archivo por bloques, sin tener el documento completo en memoria.
+    Con crudo=True el valor se entrega como texto JSON sin convertir.
+    """
+    buffer, pos, agotado = "", 0, False
+
+    def leer_mas():
+        nonlocal buffer, pos, agotado
+        bloque = f.read(max(tam_bloque, len(buffer) - pos))
+        buffer, pos, agotado = buffer[pos:] + bloque, 0, not bloque
+
+    def siguiente_caracter():
+        nonlocal pos
+        while True:
+            pos = _ESPACIOS.match(buffer, pos).end()
+            if pos < len(buffer) or agotado:
+                return buffer[pos:pos + 1]
+            leer_mas()
+
+    def decodificar(como_texto=False):
+        nonlocal pos
+        while True:
+            try:
+                valor, fin = _DECODIFICADOR.raw_decode(buffer, pos)
+                # Un valor que toca el final del bloque podría seguir en el próximo
+                if fin < len(buffer) or agotado:
+                    texto, pos = buffer[pos:fin], fin
+                    return texto if como_texto else valor
+            except json.JSONDecodeError:
+                if agotado:
+                    raise
+            leer_mas()
+
+    def esperar(caracter):
+        nonlocal pos
+        if siguiente_caracter() != caracter:
+            raise json.JSONDecodeError(f"Se esperaba '{caracter}'", buffer, pos)
+        pos += 1
+
+    esperar("{")
+    if siguiente_caracter() == "}":
+        return
+    while True:
+        siguiente_caracter()
+        clave = decodificar()
+        esperar(":")
+        siguiente_caracter()
+        yield clave, decodificar(como_texto=crudo)
+        if siguiente_caracter() == "}":
+            return
+        esperar(",")
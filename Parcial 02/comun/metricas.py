@@ -0,0 +1,268 @@
+# 📏 Métricas de E/S opcionales: duración, bytes y registros de cada carga y guardado
+# Las usan los inventarios de las Semanas 10 y 11 (prefijo INVENTARIO) y la biblioteca de las
+# Semanas 12 y 13 (prefijo BIBLIOTECA); cada programa pide su registro con registro("PREFIJO").
+# Se activan con la variable de entorno PREFIJO_METRICAS=1 (o METRICAS.activo = True).
+# Cada llamada medida se divide en fases (construir, serializar, leer, escribir...) para saber
+# si el tiempo se va en armar los objetos, en el JSON o en el disco.
+# Con PREFIJO_PERFIL=perfil.prof además se perfila con cProfile cada llamada medida; el perfil
+# se guarda al salir y se lee con:  python -m pstats perfil.prof
+# Apagadas, medir() entrega una medición nula y abrir() es el open() de siempre: la E/S no cambia.
+import atexit
+import cProfile
+import io
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Histograma:
+    """
+    📊 Distribución de valores en cubetas por potencias de 2 (cada valor cuenta en la menor 2**k
+    que lo cubre), más total, suma, mínimo y máximo. Sirve igual para segundos, bytes o registros.
+    """
+    def __init__(self):
+        self.cubetas = {}   # exponente k -> cuántos valores cayeron en (2**(k-1), 2**k]; None para el 0
+        self.total = 0
+        self.suma = 0
+        self.minimo = None
+        self.maximo = None
+
+    def observar(self, valor):
+        exponente = math.frexp(valor)[1] if valor > 0 else None   # valor = m·2**k con 0.5 <= m < 1
+        self.cubetas[exponente] = self.cubetas.get(exponente, 0) + 1
+        self.total += 1
+        self.suma += valor
+        self.minimo = valor if self.minimo is None else min(self.minimo, valor)
+        self.maximo = valor if self.maximo is None else max(self.maximo, valor)
+
+    def percentil(self, p):
+        """Cota superior aproximada del percentil p: el límite de la cubeta donde cae."""
+        if not self.total:
+            return None
+        objetivo, acumulado = self.total * p / 100, 0
+        for exponente in sorted(self.cubetas, key=lambda k: -math.inf if k is None else k):
+            acumulado += self.cubetas[exponente]
+            if acumulado >= objetivo:
+                return 0 if exponente is None else min(2.0 ** exponente, self.maximo)
+        return self.maximo
+
+    def resumen(self):
+        orden = sorted(self.cubetas, key=lambda k: -math.inf if k is None else k)
+        return {"llamadas": self.total, "suma": self.suma, "minimo": self.minimo, "maximo": self.maximo,
+                "promedio": self.suma / self.total if self.total else None,
+                "p50": self.percentil(50), "p90": self.percentil(90), "p99": self.percentil(99),
+                "cubetas": {("0" if k is None else f"{2.0 ** k:g}"): self.cubetas[k] for k in orden}}
+
+
+class Medicion:
+    """⏱️ Lo que se mide dentro de una llamada: tiempo por fase, bytes y registros."""
+    activa = True
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.fases = {}
+        self.bytes = 0
+        self.registros = None
+
+    def sumar(self, fase, segundos):
+        self.fases[fase] = self.fases.get(fase, 0.0) + segundos
+
+    @contextmanager
+    def fase(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sumar(nombre, time.perf_counter() - inicio)
+
+    def completar(self, fase):
+        """Asigna a `fase` el tiempo transcurrido que no cayó en ninguna otra (p. ej. serializar)."""
+        self.sumar(fase, max(time.perf_counter() - self.inicio - sum(self.fases.values()), 0.0))
+
+    def tamaño_de(self, ruta):
+        self.bytes += os.path.getsize(ruta)
+
+    def abrir(self, ruta, modo="r", encoding=None):
+        """
+        Abre un archivo ("r", "w", "rb" o "wb") cuyo tiempo de disco se cuenta en las fases
+        "leer"/"escribir". El búfer de 1 MB va por encima de la medición: json.dump escribe
+        trocitos y solo se cronometra cada bloque que de verdad llega al disco.
+        """
+        crudo = ArchivoMedido(io.FileIO(ruta, modo.replace("b", "")), self)
+        bufer = (io.BufferedReader if "r" in modo else io.BufferedWriter)(crudo, 1 << 20)
+        return bufer if "b" in modo else io.TextIOWrapper(bufer, encoding=encoding)
+
+
+class _MedicionNula:
+    """Medición desactivada: mismas operaciones, sin costo."""
+    activa = False
+    bytes = 0
+    registros = None
+
+    def fase(self, nombre):
+        return _NADA
+
+    def completar(self, fase):
+        pass
+
+    def tamaño_de(self, ruta):
+        pass
+
+    def abrir(self, ruta, modo="r", encoding=None):
+        return open(ruta, modo, encoding=encoding)
+
+
+class _Nada:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+_NADA = _Nada()
+_MEDICION_NULA = _MedicionNula()
+
+
+class ArchivoMedido(io.RawIOBase):
+    """📁 Archivo crudo (sin búfer) que cronometra cada lectura y escritura que llega al disco."""
+    def __init__(self, crudo, medicion):
+        self.crudo = crudo
+        self.medicion = medicion
+
+    def readable(self):
+        return self.crudo.readable()
+
+    def writable(self):
+        return self.crudo.writable()
+
+    def fileno(self):   # Para os.fsync
+        return self.crudo.fileno()
+
+    def readinto(self, destino):
+        inicio = time.perf_counter()
+        leidos = self.crudo.readinto(destino)
+        self.medicion.sumar("leer", time.perf_counter() - inicio)
+        return leidos
+
+    def write(self, datos):
+        inicio = time.perf_counter()
+        escritos = self.crudo.write(datos)
+        self.medicion.sumar("escribir", time.perf_counter() - inicio)
+        return escritos
+
+    def close(self):
+        if not self.closed:
+            self.crudo.close()
+        super().close()
+
+
+class RegistroMetricas:
+    """
+    📚 Registro de métricas del proceso: un Histograma por nombre ("guardar_inventario.segundos",
+    "guardar_inventario.escribir.segundos", "cargar_inventario.bytes"...).
+    """
+    def __init__(self, activo=False, archivo_perfil=None):
+        self.activo = activo
+        self.histogramas = {}
+        self._candado = threading.Lock()
+        self.archivo_perfil = archivo_perfil
+        self._perfil = cProfile.Profile() if archivo_perfil else None
+        self._perfilando = False
+        if self._perfil is not None:
+            atexit.register(self.guardar_perfil)
+
+    def observar(self, nombre, valor):
+        with self._candado:
+            histograma = self.histogramas.get(nombre)
+            if histograma is None:
+                histograma = self.histogramas[nombre] = Histograma()
+            histograma.observar(valor)
+
+    @contextmanager
+    def medir(self, operacion):
+        """
+        ⏱️ Mide una llamada completa. Uso:
+            with METRICAS.medir("guardar_inventario") as medicion:
+                with medicion.fase("construir"): ...
+                medicion.registros = n
+        Desactivado, entrega una medición nula que no cuesta nada.
+        """
+        if not self.activo and self._perfil is None:
+            yield _MEDICION_NULA
+            return
+        medicion = Medicion() if self.activo else _MEDICION_NULA
+        perfilando = self._empezar_perfil()
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        finally:
+            duracion = time.perf_counter() - inicio
+            if perfilando:
+                self._perfil.disable()
+                self._perfilando = False
+            if self.activo:
+                self.observar(f"{operacion}.segundos", duracion)
+                for fase, segundos in medicion.fases.items():
+                    self.observar(f"{operacion}.{fase}.segundos", segundos)
+                self.observar(f"{operacion}.bytes", medicion.bytes)
+                if medicion.registros is not None:
+                    self.observar(f"{operacion}.registros", medicion.registros)
+
+    def _empezar_perfil(self):
+        # Un solo perfil activo a la vez: las llamadas anidadas o de otros hilos quedan dentro o fuera
+        if self._perfil is None:
+            return False
+        with self._candado:
+            if self._perfilando:
+                return False
+            self._perfilando = True
+        self._perfil.enable()
+        return True
+
+    def guardar_perfil(self):
+        if self._perfil is not None:
+            self._perfil.dump_stats(self.archivo_perfil)
+
+    def resumen(self):
+        with self._candado:
+            return {nombre: h.resumen() for nombre, h in sorted(self.histogramas.items())}
+
+    def texto(self):
+        """📋 Tabla legible: tiempos en milisegundos, tamaños en KB y registros tal cual."""
+        resumen = self.resumen()
+        if not resumen:
+            return "📭 Todavía no hay mediciones."
+        unidades = {".segundos": (1000, " ms"), ".bytes": (1 / 1024, " KB"), ".registros": (1, "")}
+        lineas = [f"{'métrica':<40}{'llamadas':>9}" + "".join(
+            f"{campo:>13}" for campo in ("promedio", "p50", "p90", "p99", "máximo"))]
+        for nombre, r in resumen.items():
+            sufijo = "." + nombre.rsplit(".", 1)[-1]
+            escala, unidad = unidades.get(sufijo, (1, ""))
+            etiqueta = (nombre.removesuffix(sufijo) if sufijo == ".segundos" else nombre) + unidad
+            lineas.append(f"{etiqueta:<40}{r['llamadas']:>9}" + "".join(
+                f"{r[campo] * escala:>13,.1f}" for campo in ("promedio", "p50", "p90", "p99", "maximo")))
+        return "\n".join(lineas)
+
+    def guardar_json(self, ruta):
+        with open(ruta, "w") as f:
+            json.dump(self.resumen(), f, indent=4)
+
+
+_REGISTROS = {}
+
+
+def registro(prefijo):
+    """
+    🌍 Registro único del proceso para un programa: PREFIJO_METRICAS decide si empieza activo
+    y PREFIJO_PERFIL dónde se guarda el perfil. Todos los módulos que piden el mismo prefijo
+    comparten el mismo registro.
+    """
+    if prefijo not in _REGISTROS:
+        _REGISTROS[prefijo] = RegistroMetricas(
+            activo=os.environ.get(f"{prefijo}_METRICAS", "") not in ("", "0"),
+            archivo_perfil=os.environ.get(f"{prefijo}_PERFIL") or None)
+    return _REGISTROS[prefijo]
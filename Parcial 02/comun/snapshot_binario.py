@@ -0,0 +1,172 @@
+# 📦 Instantánea binaria del inventario: arranque casi inmediato sin analizar JSON
+# La comparten los inventarios de las Semanas 10 y 11 (un archivo escrito por una lo lee la otra).
+# Se activa con Inventario(..., formato_snapshot="binario"); al cargar, el formato se detecta por la cabecera.
+# Conversión:  python Gestor_Inventario.py a-binario Inventario.json inventario.bin
+#              python Gestor_Inventario.py a-json inventario.bin Inventario.json
+#
+# Estructura del archivo (columnas en el orden de bytes indicado en la cabecera):
+#   cabecera    "INVB", versión, 1 si es little-endian, n productos
+#   cadenas     cuántas, bytes UTF-8 totales, largo de cada una (array 'I') y el texto concatenado
+#   columnas    id, nombre y fecha como índices a la tabla de cadenas (array 'I'),
+#               cantidad (array 'q') y precio (array 'd')
+# Los textos repetidos (fechas, nombres iguales) se guardan una sola vez en la tabla.
+#
+# Versión 1: cada semana tenía su propio módulo y ambas escribían "INVB" v1, la Semana 10 sin la
+# columna fecha. Esos archivos se siguen leyendo: el tamaño de las columnas dice si la fecha está.
+import json
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from comun.json_por_partes import leer_entradas_json
+
+MAGICO = b"INVB"
+VERSION = 2
+CABECERA = struct.Struct("<4sBBxxQ")
+TABLA = struct.Struct("<IQ")
+SIN_FECHA = 0xFFFFFFFF
+
+assert array("I").itemsize == 4 and array("q").itemsize == 8 and array("d").itemsize == 8
+
+
+class SnapshotInvalido(ValueError):
+    """La instantánea binaria está dañada o es de una versión que este programa no sabe leer."""
+
+
+def es_snapshot_binario(ruta):
+    """🔍 True si el archivo empieza con la cabecera de la instantánea binaria."""
+    try:
+        with open(ruta, "rb") as f:
+            return f.read(len(MAGICO)) == MAGICO
+    except OSError:
+        return False
+
+
+def escribir_snapshot(ruta, registros, sincronizar=False):
+    """
+    💾 Escribe los pares (id, dict) en formato binario (con fsync si se pide).
+    Devuelve cuántos productos se escribieron.
+    """
+    tabla = {}
+
+    def indice(cadena):
+        i = tabla.get(cadena)
+        if i is None:
+            i = tabla[cadena] = len(tabla)
+        return i
+
+    ids, nombres, fechas = array("I"), array("I"), array("I")
+    cantidades, precios = array("q"), array("d")
+    for pid, datos in registros:
+        ids.append(indice(pid))
+        nombres.append(indice(datos["nombre"]))
+        fecha = datos.get("fecha")
+        fechas.append(SIN_FECHA if fecha is None else indice(fecha))
+        cantidades.append(datos["cantidad"])
+        precios.append(datos["precio"])
+
+    cadenas = list(tabla)   # El orden del dict es el orden de los índices
+    texto = "".join(cadenas).encode("utf-8", "surrogatepass")
+    with open(ruta, "wb") as f:
+        f.write(CABECERA.pack(MAGICO, VERSION, sys.byteorder == "little", len(ids)))
+        f.write(TABLA.pack(len(cadenas), len(texto)))
+        array("I", map(len, cadenas)).tofile(f)
+        f.write(texto)
+        for columna in (ids, nombres, fechas, cantidades, precios):
+            columna.tofile(f)
+        if sincronizar:
+            f.flush()
+            os.fsync(f.fileno())
+    return len(ids)
+
+
+def leer_snapshot(ruta):
+    """
+    📖 Lee la instantánea completa en una sola pasada.
+    Devuelve (ids, nombres, fechas, cantidades, precios): tres listas de texto
+    (fecha None si no tenía) y dos arrays numéricos listos para usar.
+    Lanza SnapshotInvalido si el archivo no es una instantánea válida o está incompleto.
+    """
+    with open(ruta, "rb") as f:
+        datos = memoryview(f.read())
+    if len(datos) < CABECERA.size + TABLA.size:
+        raise SnapshotInvalido("La instantánea binaria está incompleta.")
+    magico, version, little, n = CABECERA.unpack_from(datos, 0)
+    if magico != MAGICO or version not in (1, VERSION):
+        raise SnapshotInvalido(f"{ruta} no es una instantánea binaria de inventario compatible "
+                               f"(versión {version}; se admiten 1 y {VERSION}).")
+    invertir = bool(little) != (sys.byteorder == "little")
+    pos = CABECERA.size
+    total_cadenas, bytes_texto = TABLA.unpack_from(datos, pos)
+    pos += TABLA.size
+
+    def columna(tipo, cuantos):
+        nonlocal pos
+        valores = array(tipo)
+        fin = pos + cuantos * valores.itemsize
+        if fin > len(datos):
+            raise SnapshotInvalido("La instantánea binaria está incompleta.")
+        valores.frombytes(datos[pos:fin])
+        if invertir:
+            valores.byteswap()
+        pos = fin
+        return valores
+
+    largos = columna("I", total_cadenas)
+    if pos + bytes_texto > len(datos):
+        raise SnapshotInvalido("La instantánea binaria está incompleta.")
+    texto = str(datos[pos:pos + bytes_texto], "utf-8", "surrogatepass")
+    pos += bytes_texto
+    # Un solo decode para todo el texto; cada cadena es un corte por posición
+    limites = list(accumulate(largos, initial=0))
+    cadenas = [texto[a:b] for a, b in zip(limites, limites[1:])]
+
+    # En la versión 1 sin fechas (Semana 10) las columnas ocupan 24 bytes por producto en vez de 28
+    con_fecha = True
+    if version == 1:
+        restante = len(datos) - pos
+        if restante not in (24 * n, 28 * n):
+            raise SnapshotInvalido("La instantánea binaria (versión 1) está incompleta o tiene datos de más.")
+        con_fecha = restante == 28 * n
+    try:
+        ids = [cadenas[i] for i in columna("I", n)]
+        nombres = [cadenas[i] for i in columna("I", n)]
+        if con_fecha:
+            fechas = [None if i == SIN_FECHA else cadenas[i] for i in columna("I", n)]
+        else:
+            fechas = [None] * n
+    except IndexError:
+        raise SnapshotInvalido("La instantánea binaria apunta a textos que no existen.") from None
+    cantidades, precios = columna("q", n), columna("d", n)
+    if pos != len(datos):
+        raise SnapshotInvalido("La instantánea binaria tiene datos de más.")
+    return ids, nombres, fechas, cantidades, precios
+
+
+def registros_snapshot(ruta):
+    """
+    📤 (id, dict) por producto, con el mismo formato que Producto.to_dict().
+    Un producto sin fecha (los de Semana 10) no lleva la clave "fecha", como en su JSON.
+    """
+    ids, nombres, fechas, cantidades, precios = leer_snapshot(ruta)
+    for pid, nombre, cantidad, precio, fecha in zip(ids, nombres, cantidades, precios, fechas):
+        datos = {"id": pid, "nombre": nombre, "cantidad": cantidad, "precio": precio}
+        if fecha is not None:
+            datos["fecha"] = fecha
+        yield pid, datos
+
+
+def convertir_a_binario(ruta_json, ruta_bin):
+    """🔁 Inventario.json -> instantánea binaria (leyendo el JSON por partes)."""
+    with open(ruta_json, "r") as f:
+        return escribir_snapshot(ruta_bin, leer_entradas_json(f))
+
+
+def convertir_a_json(ruta_bin, ruta_json):
+    """🔁 Instantánea binaria -> Inventario.json con el mismo formato que guardar_inventario."""
+    datos = dict(registros_snapshot(ruta_bin))
+    with open(ruta_json, "w") as f:
+        json.dump(datos, f, indent=4)
+    return len(datos)